@@ -0,0 +1,234 @@
+"""
+Deterministic end-to-end benchmark.
+
+LLM, image and storage calls are replaced by FakeBackends (configurable
+latency and failure rates). Playwright rendering and python-pptx assembly are
+real. Runs Orchestrator.run_workflow and/or POST /generate-ppt (served by an
+in-process uvicorn) across deck sizes and concurrency levels, and prints JSON:
+p50/p95 latency, decks per minute, failures, peak RSS and Chromium process count.
+
+    python -m benchmarks.e2e_benchmark --deck-sizes 3,10 --concurrency 1,4 --output bench.json
+"""
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import platform
+
+import requests
+import uvicorn
+from src.orchestrator import Orchestrator
+from src.services.browser_service import BrowserService
+from src.services.fake_providers import FakeBackends
+
+CHROMIUM_NAMES = ("chrome", "chromium", "headless_shell")
+
+
+def percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def chromium_processes():
+    """(count, total RSS bytes) of Chromium processes on this host (Linux /proc)."""
+    count, rss = 0, 0
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    for pid in os.listdir("/proc"):
+        if not pid.isdigit():
+            continue
+        try:
+            with open(f"/proc/{pid}/comm") as f:
+                name = f.read().strip().lower()
+            if not name.startswith(CHROMIUM_NAMES):
+                continue
+            with open(f"/proc/{pid}/statm") as f:
+                rss += int(f.read().split()[1]) * page_size
+            count += 1
+        except (FileNotFoundError, ProcessLookupError, PermissionError):
+            continue
+    return count, rss
+
+
+def process_rss() -> int:
+    """Current RSS of this process in bytes (Linux /proc; 0 elsewhere)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except FileNotFoundError:
+        pass
+    return 0
+
+
+class ResourceSampler:
+    """
+    Samples this process's RSS and the Chromium process count / RSS in the
+    background. Peaks are per sampler, i.e. per run (ru_maxrss would be the
+    peak over the whole process lifetime).
+    """
+
+    def __init__(self, interval: float = 0.2):
+        self.interval = interval
+        self.peak_rss = 0
+        self.peak_chromium_processes = 0
+        self.peak_chromium_rss = 0
+        self._task = None
+
+    def _sample_self(self):
+        self.peak_rss = max(self.peak_rss, process_rss())
+
+    async def _run(self):
+        while True:
+            self._sample_self()
+            count, rss = await asyncio.to_thread(chromium_processes)
+            self.peak_chromium_processes = max(self.peak_chromium_processes, count)
+            self.peak_chromium_rss = max(self.peak_chromium_rss, rss)
+            await asyncio.sleep(self.interval)
+
+    def __enter__(self):
+        self._sample_self()
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    def __exit__(self, *exc):
+        self._task.cancel()
+        self._sample_self()
+
+
+async def run_batch(make_call, deck_size: int, concurrency: int, decks: int) -> dict:
+    """Runs `decks` decks with at most `concurrency` in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, failures = [], 0
+    prompt = f"Benchmark presentation about distributed systems. {deck_size} slides."
+
+    async def one():
+        nonlocal failures
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await make_call(prompt)
+                latencies.append(time.perf_counter() - start)
+            except Exception as e:
+                failures += 1
+                print(f"⚠️ Benchmark deck failed: {e}", file=sys.stderr)
+
+    with ResourceSampler() as sampler:
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(decks)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "deck_size": deck_size,
+        "concurrency": concurrency,
+        "decks": decks,
+        "failures": failures,
+        "elapsed_seconds": round(elapsed, 3),
+        "latency_p50_seconds": round(percentile(latencies, 50), 3),
+        "latency_p95_seconds": round(percentile(latencies, 95), 3),
+        "decks_per_minute": round(len(latencies) / elapsed * 60, 2) if elapsed else 0.0,
+        "peak_chromium_processes": sampler.peak_chromium_processes,
+        "peak_chromium_rss_mb": round(sampler.peak_chromium_rss / 1024 / 1024, 1),
+        "peak_rss_mb": round(sampler.peak_rss / 1024 / 1024, 1),
+    }
+
+
+async def workflow_call(prompt: str):
+    await Orchestrator().run_workflow(prompt)
+
+
+class EndpointServer:
+    """Serves server.app with uvicorn on a free local port (lifespan included)."""
+
+    def __init__(self):
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            self.port = s.getsockname()[1]
+        self.server = uvicorn.Server(uvicorn.Config("server:app", host="127.0.0.1", port=self.port, log_level="warning"))
+        self._task = None
+
+    async def __aenter__(self):
+        self._task = asyncio.create_task(self.server.serve())
+        while not self.server.started:
+            await asyncio.sleep(0.05)
+        return self
+
+    async def __aexit__(self, *exc):
+        self.server.should_exit = True
+        await self._task
+
+    async def call(self, prompt: str):
+        def post():
+            response = requests.post(f"http://127.0.0.1:{self.port}/generate-ppt", json={"prompt": prompt}, timeout=600)
+            response.raise_for_status()
+        await asyncio.to_thread(post)
+
+
+async def main(args) -> dict:
+    fakes = FakeBackends(
+        chat_latency=args.chat_latency,
+        code_latency=args.code_latency,
+        image_latency=args.image_latency,
+        upload_latency=args.upload_latency,
+        jitter=args.jitter,
+        failure_rate=args.failure_rate,
+        seed=args.seed,
+    )
+    fakes.install()
+    runs = []
+    try:
+        combos = [(size, conc) for size in args.deck_sizes for conc in args.concurrency]
+        if args.target in ("workflow", "both"):
+            await BrowserService.start()
+            for size, conc in combos:
+                result = await run_batch(workflow_call, size, conc, args.decks_per_level or conc * 2)
+                runs.append({"target": "workflow", **result})
+            await BrowserService.shutdown()
+        if args.target in ("endpoint", "both"):
+            async with EndpointServer() as server:
+                for size, conc in combos:
+                    result = await run_batch(server.call, size, conc, args.decks_per_level or conc * 2)
+                    runs.append({"target": "endpoint", **result})
+    finally:
+        fakes.uninstall()
+
+    return {
+        "python": platform.python_version(),
+        "config": {k: v for k, v in vars(args).items() if k != "output"},
+        "providers": fakes.stats(),
+        "runs": runs,
+    }
+
+
+def int_list(value: str):
+    return [int(v) for v in value.split(",") if v]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", choices=["workflow", "endpoint", "both"], default="workflow")
+    parser.add_argument("--deck-sizes", type=int_list, default=[3, 10])
+    parser.add_argument("--concurrency", type=int_list, default=[1, 4])
+    parser.add_argument("--decks-per-level", type=int, default=0, help="Decks per (size, concurrency); default 2x concurrency")
+    parser.add_argument("--chat-latency", type=float, default=1.5)
+    parser.add_argument("--code-latency", type=float, default=6.0)
+    parser.add_argument("--image-latency", type=float, default=8.0)
+    parser.add_argument("--upload-latency", type=float, default=0.5)
+    parser.add_argument("--jitter", type=float, default=0.25, help="Latency stddev as a fraction of the mean")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Write the JSON report here as well as stdout")
+    args = parser.parse_args()
+
+    report = asyncio.run(main(args))
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
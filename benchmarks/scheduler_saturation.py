@@ -0,0 +1,84 @@
+"""
+Offline load test for the global scheduler.
+
+Simulates many concurrent decks, each fanning out the same provider calls as
+the real workflow (3 Gemini designs + 1 image + 1 judge + 1 render per slide),
+against FakeProviders. Prints peak in-flight calls per provider (must never
+exceed the configured limit), queue depths, and per-deck latency to show fairness.
+
+    python -m benchmarks.scheduler_saturation --decks 20 --slides 8
+"""
+import json
+import time
+import asyncio
+import argparse
+
+from src.services.scheduler import Scheduler
+from src.services.fake_providers import FakeProvider
+
+
+async def run(decks: int, slides: int, latency_scale: float) -> dict:
+    scheduler = Scheduler()
+    providers = {
+        "gemini": FakeProvider("gemini", latency=8.0 * latency_scale, seed=1),
+        "openai_images": FakeProvider("openai_images", latency=12.0 * latency_scale, seed=2),
+        "openai_chat": FakeProvider("openai_chat", latency=2.0 * latency_scale, seed=3),
+        "browser": FakeProvider("browser", latency=1.0 * latency_scale, seed=4),
+    }
+    peak_queued = {name: 0 for name in providers}
+
+    async def call(resource: str):
+        async with scheduler.slot(resource):
+            await providers[resource].call()
+
+    async def slide():
+        await asyncio.gather(call("openai_images"), *(call("gemini") for _ in range(3)))
+        await call("openai_chat")
+        await call("browser")
+
+    async def deck(index: int) -> float:
+        start = time.perf_counter()
+        with Scheduler.request_scope(f"deck_{index}"):
+            await call("openai_chat")  # planner
+            await asyncio.gather(*(slide() for _ in range(slides)))
+        return time.perf_counter() - start
+
+    async def sample_queues():
+        while True:
+            for name, limiter in scheduler.limiters.items():
+                peak_queued[name] = max(peak_queued[name], limiter.queued())
+            await asyncio.sleep(0.01)
+
+    sampler = asyncio.create_task(sample_queues())
+    started = time.perf_counter()
+    latencies = sorted(await asyncio.gather(*(deck(i) for i in range(decks))))
+    elapsed = time.perf_counter() - started
+    sampler.cancel()
+
+    return {
+        "decks": decks,
+        "slides_per_deck": slides,
+        "elapsed_seconds": round(elapsed, 3),
+        "deck_latency_seconds": {
+            "min": round(latencies[0], 3),
+            "p50": round(latencies[len(latencies) // 2], 3),
+            "max": round(latencies[-1], 3),
+        },
+        "providers": {
+            name: {
+                "limit": scheduler.limiters[name].concurrency,
+                "peak_queued": peak_queued[name],
+                **provider.stats(),
+            }
+            for name, provider in providers.items()
+        },
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--decks", type=int, default=10)
+    parser.add_argument("--slides", type=int, default=6)
+    parser.add_argument("--latency-scale", type=float, default=0.01, help="Multiplier on realistic provider latencies")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.decks, args.slides, args.latency_scale)), indent=2))
@@ -0,0 +1,120 @@
+"""
+Worker startup benchmark.
+
+Measures, each in a fresh interpreter so nothing is already imported:
+- import time of the `server` module (plus the slowest modules from -X importtime)
+- time to first request: `uvicorn server:app` is launched and GET /stats is
+  polled until it answers; covers imports, the lifespan (client registry,
+  browser pool unless BROWSER_EAGER_START=0) and the first response.
+
+Prints JSON with the median of each measurement.
+
+    python -m benchmarks.startup_benchmark --repeat 5
+    python -m benchmarks.startup_benchmark --eager-browser   # include the Chromium launch
+"""
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import platform
+import statistics
+import subprocess
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure_import(top: int) -> dict:
+    """Wall time of `import server` in a new interpreter, and its slowest imports."""
+    code = "import time; t = time.perf_counter(); import server; print(time.perf_counter() - t)"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    # -X importtime lines: "import time: self [us] | cumulative | imported package"
+    modules = []
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].strip()
+        if "." not in name:  # top-level packages only
+            modules.append((int(parts[1]) / 1e6, name))
+    modules.sort(reverse=True)
+    return {
+        "seconds": float(result.stdout.strip().splitlines()[-1]),
+        "slowest": {name: round(seconds, 3) for seconds, name in modules[:top]},
+    }
+
+
+def measure_first_request(eager_browser: bool, timeout: float) -> float:
+    """Seconds from spawning uvicorn to the first 200 from GET /stats."""
+    port = free_port()
+    env = dict(os.environ, BROWSER_EAGER_START="1" if eager_browser else "0")
+    # The lifespan builds the provider clients (no calls are made): any key will do
+    env.setdefault("OPENAI_API_KEY", "startup-benchmark")
+    env.setdefault("GOOGLE_API_KEY", "startup-benchmark")
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"server exited with code {process.returncode}")
+            try:
+                if requests.get(f"http://127.0.0.1:{port}/stats", timeout=1).status_code == 200:
+                    return time.perf_counter() - started
+            except requests.RequestException:
+                pass
+            time.sleep(0.02)
+        raise TimeoutError(f"no response within {timeout:g}s")
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main(args) -> dict:
+    imports = [measure_import(args.top) for _ in range(args.repeat)]
+    first_requests = [measure_first_request(args.eager_browser, args.timeout) for _ in range(args.repeat)]
+    return {
+        "python": platform.python_version(),
+        "config": {k: v for k, v in vars(args).items() if k != "output"},
+        "import_seconds": round(statistics.median(r["seconds"] for r in imports), 3),
+        "slowest_imports": imports[-1]["slowest"],
+        "first_request_seconds": round(statistics.median(first_requests), 3),
+        "samples": {
+            "import_seconds": [round(r["seconds"], 3) for r in imports],
+            "first_request_seconds": [round(s, 3) for s in first_requests],
+        },
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="How many of the slowest imported packages to list")
+    parser.add_argument("--eager-browser", action="store_true", help="Launch Chromium in the lifespan (BROWSER_EAGER_START=1)")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--output", help="Write the JSON report here as well as stdout")
+    args = parser.parse_args()
+
+    report = main(args)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
@@ -1,9 +1,21 @@
 import asyncio
+import uuid
 from src.orchestrator import Orchestrator
+from src.services.browser_service import BrowserService
+from src.services.ppt_service import PPTService
+from src.services.storage_service import LocalStorage
+
+async def main(prompt: str):
+    orchestrator = Orchestrator()
+    try:
+        ppt_data = await orchestrator.run_workflow(prompt)
+        await LocalStorage("temp").upload_ppt(ppt_data, f"presentation_{uuid.uuid4().hex}")
+    finally:
+        await BrowserService.shutdown()
+        PPTService.shutdown()
 
 if __name__ == "__main__":
     # Example Input
     prompt = "Create a dark, futuristic presentation about AI Agents replacing traditional software. 3 slides."
     
-    orchestrator = Orchestrator()
-    asyncio.run(orchestrator.run_workflow(prompt))
\ No newline at end of file
+    asyncio.run(main(prompt))
\ No newline at end of file
@@ -1,53 +1,272 @@
-import uvicorn
 import os
+import json
+import time
 import uuid
+import inspect
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 from src.orchestrator import Orchestrator
-from src.models.schemas import UserProvidedImage
-from src.services.cloudinary_service import CloudinaryService
-
-app = FastAPI(title="Invincible PPT Agent")
+from src.agents.template_designer import template_cache
+from src.services.batch_service import BATCH_MAX_ITEMS, SlideDeduper, expand_prompts, run_batch
+from src.models.schemas import PresentationPlan, UserProvidedImage
+from src.services.browser_service import BrowserService
+from src.services.clients import clients
+from src.services.image_service import ImageService
+from src.services.job_service import JobManager, JobQueueFull
+from src.services.llm_service import LLMService
+from src.services.manifest_service import InvalidDeckRequest, UnknownDeck, manifest_store
+from src.services.ppt_service import PPTService
+from src.services import resilience
+from src.services.scheduler import scheduler
+from src.services.scratch_service import ScratchQuotaExceeded, scratch
+from src.services.storage_service import StorageService
+from src.utils.telemetry import registry
 
 class PPTRequest(BaseModel):
     prompt: str
     images: list[UserProvidedImage] = [] 
 
+class PrewarmRequest(BaseModel):
+    prompts: list[str]
+
+class BatchRequest(BaseModel):
+    prompts: list[str] = []
+    template: str | None = None  # e.g. "Sales deck for $client in $industry. 8 slides."
+    items: list[dict[str, str]] = []  # variables for `template`, one deck per item
+    images: list[UserProvidedImage] = []
+    concurrency: int | None = None  # decks in flight (default BATCH_CONCURRENCY)
+
+class RegenerateRequest(BaseModel):
+    plan: PresentationPlan | None = None  # edited plan; defaults to the saved one
+    slide_ids: list[int] = []  # slides to redesign even if unchanged
+
+async def build_presentation(request: PPTRequest, progress=None, orchestrator: Orchestrator = None) -> dict:
+    """
+    Runs the workflow, uploads the deck and returns the result with timings.
+    Shared by the synchronous endpoint, the job workers and batches.
+    """
+    started = time.perf_counter()
+    orchestrator = orchestrator or Orchestrator()
+    
+    # 1. RUN WORKFLOW (PPTX is built in memory)
+    ppt_data = await orchestrator.run_workflow(request.prompt, request.images, progress=progress)
+    return await upload_presentation(orchestrator.deck_id, ppt_data, started, progress)
+
+async def regenerate_presentation(deck_id: str, request: RegenerateRequest, progress=None) -> dict:
+    """Re-runs only the changed slides of a saved deck, then uploads it like a new build."""
+    started = time.perf_counter()
+    orchestrator = Orchestrator()
+    ppt_data = await orchestrator.regenerate(deck_id, request.plan, request.slide_ids, progress=progress)
+    return await upload_presentation(deck_id, ppt_data, started, progress)
+
+async def upload_presentation(deck_id: str, ppt_data: bytes, started: float, progress=None) -> dict:
+    workflow_done = time.perf_counter()
+    
+    # 2. UPLOAD (off the event loop, straight from memory)
+    if progress:
+        result = progress("uploading", {})
+        if inspect.isawaitable(result):
+            await result
+    unique_id = f"ppt_{uuid.uuid4().hex[:8]}"
+    ppt_url = await StorageService.upload_ppt(ppt_data, unique_id)
+    finished = time.perf_counter()
+    
+    return {
+        "ppt_url": ppt_url,
+        "deck_id": deck_id,
+        "timings": {
+            "workflow_seconds": round(workflow_done - started, 3),
+            "upload_seconds": round(finished - workflow_done, 3),
+            "total_seconds": round(finished - started, 3)
+        }
+    }
+
+job_manager = JobManager(build_presentation)
+
+# BROWSER_EAGER_START=0 launches Chromium on the first render instead of at startup
+BROWSER_EAGER_START = os.getenv("BROWSER_EAGER_START", "1") != "0"
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Provider clients and Chromium are created once per worker and shared by every request
+    await clients.start()
+    if BROWSER_EAGER_START:
+        await BrowserService.start()
+    await scratch.start()
+    await job_manager.start()
+    yield
+    await job_manager.stop()
+    await scratch.stop()
+    await BrowserService.shutdown()
+    await clients.close()
+    PPTService.shutdown()
+
+app = FastAPI(title="Invincible PPT Agent", lifespan=lifespan)
+
 @app.post("/generate-ppt")
 async def generate_ppt(request: PPTRequest):
     """
     Triggers the AI Agent to build a presentation.
-    Uploads result to Cloudinary and returns the URL.
+    Uploads result to storage (Cloudinary by default) and returns the URL.
+    Holds the connection for the whole run; prefer POST /jobs for long decks.
     """
-    file_path = ""
     try:
-        orchestrator = Orchestrator()
-        
-        # 1. RUN WORKFLOW (Generates local .pptx in temp/)
-        file_path = await orchestrator.run_workflow(request.prompt, request.images)
-        
-        # 2. UPLOAD TO CLOUDINARY
-        unique_id = f"ppt_{uuid.uuid4().hex[:8]}"
-        cloudinary_url = CloudinaryService.upload_ppt(file_path, unique_id)
-        
-        # 3. FINAL CLEANUP
-        # Orchestrator cleans images, but we must clean the final PPT here
-        if os.path.exists(file_path):
-            os.remove(file_path)
-            print(f"✨ Final PPT cleanup: Deleted {file_path}")
-            
-        # 4. RETURN URL
+        result = await build_presentation(request)
         return {
             "status": "success",
             "message": "Presentation generated successfully",
-            "ppt_url": cloudinary_url
+            **result
         }
         
+    except ScratchQuotaExceeded as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
-        # Emergency cleanup
-        if file_path and os.path.exists(file_path):
-            os.remove(file_path)
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/batch")
+async def generate_batch(request: BatchRequest):
+    """
+    Builds many decks in one call: `prompts`, and/or `template` filled in per
+    entry of `items`. All decks share one set of stage pools, and identical
+    slides (or identical prompts) are only built once. Streams one JSON line
+    per finished deck (in completion order), then a summary with throughput.
+    """
+    prompts = expand_prompts(request.prompts, request.template, request.items)
+    if not prompts:
+        raise HTTPException(status_code=400, detail="Provide prompts or a template")
+    if len(prompts) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Batch too large ({len(prompts)} > {BATCH_MAX_ITEMS} decks)")
+
+    stages = Orchestrator.make_stages()
+    deduper = SlideDeduper()
+
+    async def build(prompt: str) -> dict:
+        orchestrator = Orchestrator(stages=stages, slide_deduper=deduper)
+        return await build_presentation(PPTRequest(prompt=prompt, images=request.images), orchestrator=orchestrator)
+
+    async def lines():
+        try:
+            async for result in run_batch(prompts, build, request.concurrency):
+                if result["type"] == "summary":
+                    result["slides_deduped"] = deduper.hits
+                yield json.dumps(result) + "\n"
+        finally:
+            deduper.cancel()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+@app.get("/decks/{deck_id}")
+async def get_deck(deck_id: str):
+    """Saved plan of a deck and, per slide, the hash / revision used for regeneration."""
+    try:
+        manifest = await manifest_store.load(deck_id)
+    except InvalidDeckRequest as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if manifest is None:
+        raise HTTPException(status_code=404, detail="Deck not found")
+    return manifest.model_dump(exclude={"slides": {"__all__": {"html"}}})
+
+@app.post("/decks/{deck_id}/regenerate")
+async def regenerate_deck(deck_id: str, request: RegenerateRequest):
+    """
+    Rebuilds a deck made by /generate-ppt after an edit: only slides whose
+    plan changed (or listed in `slide_ids`) are re-designed and re-rendered,
+    the rest reuse their saved renders.
+    """
+    try:
+        result = await regenerate_presentation(deck_id, request)
+    except UnknownDeck:
+        raise HTTPException(status_code=404, detail="Deck not found")
+    except InvalidDeckRequest as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ScratchQuotaExceeded as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {
+        "status": "success",
+        "message": "Presentation regenerated successfully",
+        **result
+    }
+
+@app.post("/jobs", status_code=202)
+async def submit_job(request: PPTRequest):
+    """Queues a presentation build and returns its job id immediately."""
+    try:
+        job = await job_manager.submit(request)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/jobs/{job.id}",
+        "events_url": f"/jobs/{job.id}/events"
+    }
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Current phase, slide progress, result and per-phase timings of a job."""
+    job = await job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """Server-Sent Events stream of a job's progress, ending when it finishes."""
+    if await job_manager.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def event_source():
+        async for event in job_manager.stream_events(job_id):
+            if event is None:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"id: {event.seq}\nevent: {event.phase}\ndata: {event.model_dump_json()}\n\n"
+
+    return StreamingResponse(event_source(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@app.get("/stats")
+async def stats():
+    """Runtime counters used to tune the worker (browser pool, caches)."""
+    return {
+        "browser_pool": BrowserService.stats(),
+        "render_assets": BrowserService.asset_stats(),
+        "llm_cache": LLMService.cache_stats(),
+        "gemini": LLMService.gemini_stats(),
+        "image_cache": ImageService.cache_stats(),
+        "template_cache": template_cache.stats(),
+        "deck_manifests": manifest_store.cache.stats(),
+        "jobs": job_manager.stats(),
+        "scheduler": scheduler.stats(),
+        "circuit_breakers": resilience.stats(),
+        "clients": clients.stats(),
+        "scratch": scratch.stats()
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus scrape endpoint: per-stage latency histograms and in-flight gauges."""
+    pool = BrowserService.stats()
+    registry.gauge("ppt_browser_pages_in_use", "Browser pool pages currently rendering").set(pool["in_use"])
+    registry.gauge("ppt_browser_waiting", "Renders waiting for a browser page").set(pool["waiting"])
+    for resource, limiter in scheduler.stats().items():
+        registry.gauge("ppt_scheduler_active", "Provider calls in flight").set(limiter["active"], resource=resource)
+        registry.gauge("ppt_scheduler_queued", "Provider calls waiting for a slot").set(limiter["queued"], resource=resource)
+    jobs = job_manager.stats()
+    registry.gauge("ppt_jobs_running", "Jobs being processed").set(jobs["running"])
+    registry.gauge("ppt_jobs_queued", "Jobs waiting for a worker").set(jobs["queued"])
+    registry.gauge("ppt_scratch_waiting", "Requests waiting for scratch space").set(scratch.stats()["waiting"])
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.post("/cache/images/prewarm")
+async def prewarm_images(request: PrewarmRequest):
+    """Generates and caches images for common prompts ahead of time."""
+    summary = await ImageService.prewarm(request.prompts)
+    return {"status": "success", **summary}
+
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run("server:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
@@ -0,0 +1,4 @@
+# .env is loaded before any module reads its settings at import time
+from src.config import load_env
+
+load_env()
@@ -1,11 +1,26 @@
+import os
 import asyncio
-from typing import List
+from typing import List, Optional
 from src.models.schemas import SlidePlan, PresentationPlan
 from src.services.llm_service import LLMService
+from src.services.browser_service import ASSET_URL_PREFIX
+from src.services.native_pptx import NATIVE_LAYOUT_RULE
 
 class DesignerAgent:
-    def __init__(self):
-        self.base_system_prompt = """
+    def __init__(self, variants: int = None, first_k: int = None, deadline: Optional[float] = None,
+                 native: bool = False):
+        # Variant strategy: spawn `variants` workers, keep the first `first_k`
+        # usable ones and cancel the rest. After `deadline` seconds the judge
+        # gets whatever has arrived (as long as there is at least one).
+        self.variants = variants if variants is not None else int(os.getenv("DESIGNER_VARIANTS", "3"))
+        if self.variants < 1:
+            raise ValueError(f"Designer variants (DESIGNER_VARIANTS) must be at least 1, got {self.variants}")
+        self.first_k = min(first_k or int(os.getenv("DESIGNER_FIRST_K", "0")) or self.variants, self.variants)
+        self.deadline = deadline if deadline is not None else (float(os.getenv("DESIGNER_DEADLINE", "0")) or None)
+        # Native output (OUTPUT_MODE=native): only markup the PPTX translator can rebuild as shapes
+        layout_rule = NATIVE_LAYOUT_RULE if native else "Use modern CSS (Flexbox/Grid, gradients, box-shadows)."
+
+        self.base_system_prompt = f"""
         You are an expert Frontend Developer specializing in High-Impact Slides.
         Your task is to write a single HTML file containing the slide.
         
@@ -13,23 +28,24 @@ class DesignerAgent:
         1. Use the provided Color Palette and Fonts STRICTLY.
         2. The output must be pure HTML/CSS (in <style> tags). No external CSS files.
         3. Make it RESPONSIVE (16:9 aspect ratio).
-        4. Use modern CSS (Flexbox/Grid, gradients, box-shadows).
+        4. {layout_rule}
         5. Return ONLY the HTML code. No markdown backticks.
         6. IMPORTANT: If an image path/url is provided, you MUST use it.
         """
 
-    async def _generate_single_variant(self, slide: SlidePlan, master_plan: PresentationPlan, variant_id: int) -> str:
+    async def _generate_single_variant(self, slide: SlidePlan, master_plan: PresentationPlan, variant_id: int,
+                                       feedback: Optional[str] = None) -> str:
         """
         Worker function to generate 1 HTML variant.
         """
         
         image_instruction = ""
         
-        # CASE A: Local Generated Image
-        if slide.image_prompt and slide.image_prompt.startswith("./"):
+        # CASE A: Generated Image (served from memory at render time)
+        if slide.image_prompt and slide.image_prompt.startswith(ASSET_URL_PREFIX):
             image_instruction = f"""
             IMAGE ASSETS:
-            - Use the local background image: "{slide.image_prompt}"
+            - Use the background image: "{slide.image_prompt}"
             - Example: <div style="background-image: url('{slide.image_prompt}')">
             """
             
@@ -63,6 +79,11 @@ class DesignerAgent:
         
         Make this Variant #{variant_id} unique and creative.
         """
+        if feedback:
+            prompt += f"""
+        FIX FROM PREVIOUS ATTEMPT:
+        {feedback}
+        """
         
         # Call Claude (via generate_code)
         html_code = await LLMService.generate_code(prompt, self.base_system_prompt)
@@ -71,14 +92,47 @@ class DesignerAgent:
         clean_code = html_code.replace("```html", "").replace("```", "").strip()
         return clean_code
 
-    async def generate_slide_variants(self, slide: SlidePlan, master_plan: PresentationPlan) -> List[str]:
-        print(f"--- 🎨 Designer: Spawning 3 workers for Slide {slide.id} ---")
-        
-        tasks = [
-            self._generate_single_variant(slide, master_plan, 1),
-            self._generate_single_variant(slide, master_plan, 2),
-            self._generate_single_variant(slide, master_plan, 3)
-        ]
+    @staticmethod
+    def is_usable(html: str) -> bool:
+        return bool(html) and "<" in html
+
+    async def generate_slide_variants(self, slide: SlidePlan, master_plan: PresentationPlan,
+                                      feedback: Optional[str] = None) -> List[str]:
+        """`feedback` (e.g. a render problem) is added to every variant's prompt."""
+        print(f"--- 🎨 Designer: Spawning {self.variants} workers for Slide {slide.id} (keeping first {self.first_k}) ---")
         
-        results = await asyncio.gather(*tasks)
-        return results
\ No newline at end of file
+        tasks = {
+            asyncio.create_task(self._generate_single_variant(slide, master_plan, variant_id, feedback)): variant_id
+            for variant_id in range(1, self.variants + 1)
+        }
+        loop = asyncio.get_running_loop()
+        deadline_at = loop.time() + self.deadline if self.deadline else None
+
+        usable = {}
+        unusable = {}
+        errors = []
+        pending = set(tasks)
+        try:
+            while pending and len(usable) < self.first_k:
+                # The deadline only applies once there is something to judge
+                timeout = max(0.0, deadline_at - loop.time()) if (deadline_at and usable) else None
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    print(f"   -- ⏱️ Designer deadline hit for Slide {slide.id}, judging {len(usable)} variant(s)")
+                    break
+                for task in done:
+                    if task.exception() is not None:
+                        errors.append(task.exception())
+                    elif self.is_usable(task.result()):
+                        usable[tasks[task]] = task.result()
+                    else:
+                        unusable[tasks[task]] = task.result()
+        finally:
+            # Cancel stragglers once we have enough
+            for task in pending:
+                task.cancel()
+
+        results = usable or unusable
+        if not results:
+            raise errors[0]
+        return [results[variant_id] for variant_id in sorted(results)]
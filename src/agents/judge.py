@@ -1,44 +1,234 @@
-from typing import List
-from src.models.schemas import SlidePlan, PresentationPlan
+import os
+import asyncio
+from typing import List, Optional
+from src.agents.prescreen import HtmlPreScreen
+from src.models.schemas import DeckJudgement, SlidePlan, PresentationPlan
 from src.services.llm_service import LLMService
+from src.utils.telemetry import registry
+
+judge_decisions = registry.counter("ppt_judge_decisions_total", "How the judge picked a variant")
+
+class DeckJudgeBatcher:
+    """
+    Collects the slides of one deck that need the LLM judge and reviews them
+    in a single structured-output call, so it can also weigh cross-slide
+    consistency. Slides are registered with expect() when they are
+    dispatched, and leave() as soon as they take a route that skips the
+    judge; a streamed plan holds the batch open with expect(PLANNING) until
+    the last slide is dispatched. A batch is sent once every registered
+    slide has reached the judge (or left), when `max_slides` are waiting,
+    or `window` seconds after the first one arrived. Slides missing from
+    the batched answer (or a failed call) fall back to per-slide judging.
+    """
+
+    # Registered while the plan is still streaming (more slides may follow)
+    PLANNING = "planning"
+
+    def __init__(self, judge: "JudgeAgent", window: float = None, max_slides: int = None):
+        self.judge = judge
+        self.window = window if window is not None else float(os.getenv("JUDGE_BATCH_WINDOW", "3"))
+        self.max_slides = max_slides or int(os.getenv("JUDGE_BATCH_MAX_SLIDES", "12"))
+        self._expected = set()
+        self._pending = []  # (future, candidates, slide)
+        self._timer: Optional[asyncio.Task] = None
+        # Reviews in flight (the event loop only keeps weak references to tasks)
+        self._reviews = set()
+
+    def expect(self, slide_id: int):
+        self._expected.add(slide_id)
+
+    def leave(self, slide_id: int):
+        """The slide won't reach the judge (resolved locally, or failed earlier)."""
+        self._expected.discard(slide_id)
+        self._maybe_flush()
+
+    async def submit(self, candidates: List[str], slide: SlidePlan, master_plan: PresentationPlan) -> str:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((future, candidates, slide, master_plan))
+        self._expected.discard(slide.id)
+        if self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+        self._maybe_flush()
+        return await future
+
+    def _maybe_flush(self):
+        if self._pending and (not self._expected or len(self._pending) >= self.max_slides):
+            self._flush()
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.window)
+        self._timer = None
+        self._flush()
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = [r for r in self._pending if not r[0].done()], []
+        if batch:
+            task = asyncio.create_task(self._review(batch))
+            self._reviews.add(task)
+            task.add_done_callback(self._reviews.discard)
+
+    async def _review(self, batch):
+        try:
+            picks = await self.judge.select_deck([(candidates, slide) for _, candidates, slide, _ in batch], batch[0][3])
+        except Exception as e:
+            print(f"   -- ⚠️ Deck judge failed ({e}), judging slides one by one")
+            picks = {}
+
+        async def resolve(future, candidates, slide, master_plan):
+            if future.done():
+                return
+            try:
+                if slide.id in picks:
+                    html = candidates[picks[slide.id]]
+                else:
+                    html = await self.judge._llm_select(candidates, slide, master_plan)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+                return
+            if not future.done():
+                future.set_result(html)
+
+        # Slides the deck call didn't cover are judged one by one, concurrently
+        await asyncio.gather(*(resolve(*entry) for entry in batch))
+
 
 class JudgeAgent:
     def __init__(self):
+        self.prescreen = HtmlPreScreen()
+        # Deck-level judging (JUDGE_MODE=deck): set per workflow by the orchestrator
+        self.batcher: Optional[DeckJudgeBatcher] = None
+        self.deck_system_prompt = """
+        You are a Senior UI/UX Designer reviewing a whole presentation at once.
+        For every slide you receive one or more HTML variants, numbered from 0.
+        
+        Your task, per slide:
+        1. Check for CSS/HTML errors (broken tags, missing styles).
+        2. Evaluate design quality (Does it match the requested style?).
+        3. Check legibility (Contrast, font sizes).
+        Across slides:
+        4. Prefer choices that look like one deck: consistent typography,
+           palette usage, spacing and header placement.
+        
+        Return exactly one choice per slide.
+        """
         self.system_prompt = """
         You are a Senior UI/UX Designer and Code Quality QA.
-        You will receive 3 HTML variants for a presentation slide.
+        You will receive one or more HTML variants for a presentation slide, numbered from 0.
         
         Your task:
         1. Check for CSS/HTML errors (broken tags, missing styles).
         2. Evaluate design quality (Does it match the requested style?).
         3. Check legibility (Contrast, font sizes).
         
-        Return ONLY the integer index (0, 1, or 2) of the best variant. 
+        Return ONLY the integer index of the best variant. 
         Do not add any explanation. Just the number.
         """
 
     async def select_best_variant(self, variants: List[str], slide: SlidePlan, master_plan: PresentationPlan) -> str:
         """
-        Sends the 3 variants to the LLM and asks it to pick the winner.
+        Pre-screens the variants locally, then sends the valid ones to the LLM
+        to pick the winner. The LLM call is skipped when only one variant is
+        valid or one clearly scores best.
+        """
+        reports = self.prescreen.screen(variants, slide, master_plan)
+        valid = [r for r in reports if r.valid]
+        for report in reports:
+            if not report.valid:
+                print(f"   -- 🚫 Pre-screen rejected Variant {report.index} of Slide {slide.id}: {', '.join(report.problems)}")
+
+        if not valid:
+            judge_decisions.inc(decision="none_valid")
+            print(f"--- ⚖️ Judge: No variant passed the pre-screen for Slide {slide.id}, keeping the best-scored one ---")
+            return self._resolved_locally(slide, variants[reports[0].index])
+        if len(valid) == 1:
+            judge_decisions.inc(decision="single")
+            print(f"--- ⚖️ Judge: Only 1 valid variant for Slide {slide.id}, skipping review ---")
+            return self._resolved_locally(slide, variants[valid[0].index])
+        if valid[0].score - valid[1].score >= self.prescreen.margin:
+            judge_decisions.inc(decision="prescreen")
+            print(f"--- ⚖️ Judge: Variant {valid[0].index} clearly best for Slide {slide.id} "
+                  f"({valid[0].score:.2f} vs {valid[1].score:.2f}), skipping review ---")
+            return self._resolved_locally(slide, variants[valid[0].index])
+
+        # Only valid variants reach the judge, in their original order
+        candidates = [variants[r.index] for r in sorted(valid, key=lambda r: r.index)]
+        if self.batcher is not None:
+            judge_decisions.inc(decision="llm_deck")
+            return await self.batcher.submit(candidates, slide, master_plan)
+        judge_decisions.inc(decision="llm")
+        return await self._llm_select(candidates, slide, master_plan)
+
+    def _resolved_locally(self, slide: SlidePlan, html: str) -> str:
+        if self.batcher is not None:
+            self.batcher.leave(slide.id)
+        return html
+
+    async def select_deck(self, slides: List[tuple], master_plan: PresentationPlan) -> dict:
+        """
+        One structured-output call for several slides: `slides` is a list of
+        (variants, slide). Returns {slide_id: variant index} for every slide
+        the answer covers with a valid index.
+        """
+        blocks = []
+        for variants, slide in slides:
+            variant_blocks = "\n".join(
+                f"""
+            --- VARIANT {i} ---
+            {html[:1000]}... (truncated for brevity)
+            """
+                for i, html in enumerate(variants)
+            )
+            blocks.append(f"""
+        === SLIDE {slide.id}: {slide.title} ({slide.type}) — {len(variants)} variants ===
+        {variant_blocks}
+        """)
+        prompt = f"""
+        STYLE GOAL: {master_plan.visual_style}
+        COLORS: {master_plan.color_palette_hex}
+        FONTS: {master_plan.font_pairing}
+        {"".join(blocks)}
+        Pick the best variant for each of these slides: {[slide.id for _, slide in slides]}.
+        """
+
+        print(f"--- ⚖️ Judge: Reviewing {len(slides)} slides in one deck-level call... ---")
+        judgement = await LLMService.generate_json(prompt, self.deck_system_prompt, DeckJudgement)
+
+        limits = {slide.id: len(variants) for variants, slide in slides}
+        picks = {
+            choice.slide_id: choice.variant
+            for choice in judgement.choices
+            if choice.slide_id in limits and 0 <= choice.variant < limits[choice.slide_id]
+        }
+        missing = set(limits) - set(picks)
+        if missing:
+            print(f"   -- ⚠️ Deck judge gave no valid choice for slides {sorted(missing)}, judging them one by one")
+        print(f"   -- 🏆 Deck judge selected {picks}")
+        return picks
+
+    async def _llm_select(self, variants: List[str], slide: SlidePlan, master_plan: PresentationPlan) -> str:
+        """
+        Sends the variants to the LLM and asks it to pick the winner.
         """
         # Prepare the context for the Judge
+        variant_blocks = "\n".join(
+            f"""
+        --- VARIANT {i} ---
+        {html[:1000]}... (truncated for brevity)
+        """
+            for i, html in enumerate(variants)
+        )
         prompt = f"""
         SLIDE CONTEXT: {slide.title} ({slide.type})
         STYLE GOAL: {master_plan.visual_style}
-        
-        --- VARIANT 0 ---
-        {variants[0][:1000]}... (truncated for brevity)
-        
-        --- VARIANT 1 ---
-        {variants[1][:1000]}...
-        
-        --- VARIANT 2 ---
-        {variants[2][:1000]}...
-        
-        Which variant is the best code? Return 0, 1, or 2.
+        {variant_blocks}
+        Which variant is the best code? Return a single index from 0 to {len(variants) - 1}.
         """
         
-        print(f"--- ⚖️ Judge: Reviewing 3 variants for Slide {slide.id}... ---")
+        print(f"--- ⚖️ Judge: Reviewing {len(variants)} variants for Slide {slide.id}... ---")
         
         try:
             # We treat this as a text generation task expecting a single digit
@@ -46,7 +236,7 @@ class JudgeAgent:
             best_index = int(response.strip())
             
             # Safety check
-            if best_index not in [0, 1, 2]:
+            if not 0 <= best_index < len(variants):
                 raise ValueError("Judge returned invalid index")
                 
             print(f"   -- 🏆 Judge selected Variant {best_index}")
@@ -54,4 +244,4 @@ class JudgeAgent:
             
         except Exception as e:
             print(f"   -- ⚠️ Judge failed ({e}), defaulting to Variant 0")
-            return variants[0]
\ No newline at end of file
+            return variants[0]
@@ -1,6 +1,7 @@
-from typing import List
-from src.models.schemas import PresentationPlan, UserProvidedImage
+from typing import AsyncIterable, AsyncIterator, List, Union
+from src.models.schemas import PresentationPlan, SlidePlan, UserProvidedImage
 from src.services.llm_service import LLMService
+from src.utils.json_stream import IncrementalObjectParser
 
 class PlannerAgent:
     def __init__(self):
@@ -18,14 +19,13 @@ class PlannerAgent:
           
         """
 
-    async def create_plan(self, user_prompt: str, available_images: List[UserProvidedImage] = []) -> PresentationPlan:
-        
+    def _build_message(self, user_prompt: str, available_images: List[UserProvidedImage]) -> str:
         # Format the image list for the prompt
         img_list_str = "NO USER IMAGES PROVIDED"
         if available_images:
             img_list_str = "\n".join([f"- URL: {img.url} | DESC: {img.description}" for img in available_images])
 
-        user_message = f"""
+        return f"""
         USER REQUEST: "{user_prompt}"
         
         ### AVAILABLE USER IMAGES:
@@ -34,6 +34,10 @@ class PlannerAgent:
         Please generate the full Presentation Plan structure.
         """
 
+    async def create_plan(self, user_prompt: str, available_images: List[UserProvidedImage] = []) -> PresentationPlan:
+        
+        user_message = self._build_message(user_prompt, available_images)
+
         print(f"--- 🧠 Planner: Analyzing request with {len(available_images)} provided images ---")
         
         plan = await LLMService.generate_json(
@@ -43,4 +47,43 @@ class PlannerAgent:
         )
         
         return plan
+
+    async def stream_plan(self, user_prompt: str, available_images: List[UserProvidedImage] = []) -> AsyncIterator[Union[PresentationPlan, SlidePlan]]:
+        """
+        Streaming variant of create_plan: yields the PresentationPlan as soon as
+        the deck-level fields (palette, fonts, style...) are in, then each
+        SlidePlan as soon as it is complete. Slides are also appended to the plan.
+        """
+        user_message = self._build_message(user_prompt, available_images)
+
+        print(f"--- 🧠 Planner (streaming): Analyzing request with {len(available_images)} provided images ---")
+
+        chunks = LLMService.stream_json(
+            prompt=user_message,
+            system_prompt=self.system_prompt,
+            response_model=PresentationPlan
+        )
+        async for item in self.parse_plan_stream(chunks):
+            yield item
+
+    @staticmethod
+    async def parse_plan_stream(chunks: AsyncIterable[str]) -> AsyncIterator[Union[PresentationPlan, SlidePlan]]:
+        """
+        Turns a token stream of PresentationPlan JSON into plan/slide objects.
+        Raises ValueError if the stream ends before the plan is complete.
+        """
+        parser = IncrementalObjectParser("slides")
+        plan = None
+        async for chunk in chunks:
+            for kind, value in parser.feed(chunk):
+                if kind == "header":
+                    plan = PresentationPlan(**value, slides=[])
+                    yield plan
+                else:
+                    slide = SlidePlan(**value)
+                    plan.slides.append(slide)
+                    yield slide
+        if not parser.complete:
+            slides = len(plan.slides) if plan is not None else 0
+            raise ValueError(f"Plan stream ended early ({slides} slide(s) received)")
     #og
@@ -0,0 +1,171 @@
+import os
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional
+from src.models.schemas import SlidePlan, PresentationPlan
+from src.services.browser_service import ASSET_URL_PREFIX, VIEWPORT
+
+HEX_COLOR = re.compile(r"#(?:[0-9a-fA-F]{6}|[0-9a-fA-F]{3})\b")
+CSS_DECLARATION = re.compile(r"(?<![-\w])(color|background-color|background)\s*:\s*([^;}\"]+)", re.IGNORECASE)
+FONT_SIZE_PX = re.compile(r"font-size\s*:\s*(\d+(?:\.\d+)?)px", re.IGNORECASE)
+FIXED_SIZE_PX = re.compile(r"(?<![-\w])(width|height|min-width|min-height)\s*:\s*(\d+(?:\.\d+)?)px", re.IGNORECASE)
+# Tags whose open/close counts must balance (unclosed ones usually mean a truncated response)
+BALANCED_TAGS = ("html", "body", "style", "div", "section", "ul", "table")
+
+# WCAG AA for normal text
+MIN_CONTRAST = 4.5
+
+
+@dataclass
+class VariantReport:
+    index: int
+    problems: List[str] = field(default_factory=list)
+    score: float = 0.0
+    contrast: Optional[float] = None
+    palette_match: Optional[float] = None
+    estimated_height: Optional[float] = None
+
+    @property
+    def valid(self) -> bool:
+        return not self.problems
+
+
+def _rgb(hex_color: str):
+    value = hex_color.lstrip("#")
+    if len(value) == 3:
+        value = "".join(c * 2 for c in value)
+    return tuple(int(value[i:i + 2], 16) for i in (0, 2, 4))
+
+
+def _luminance(rgb) -> float:
+    def channel(c):
+        c = c / 255
+        return c / 12.92 if c <= 0.03928 else ((c + 0.055) / 1.055) ** 2.4
+    r, g, b = (channel(c) for c in rgb)
+    return 0.2126 * r + 0.7152 * g + 0.0722 * b
+
+
+def contrast_ratio(a: str, b: str) -> float:
+    la, lb = sorted((_luminance(_rgb(a)), _luminance(_rgb(b))), reverse=True)
+    return (la + 0.05) / (lb + 0.05)
+
+
+def _distance(a: str, b: str) -> float:
+    return sum((x - y) ** 2 for x, y in zip(_rgb(a), _rgb(b))) ** 0.5
+
+
+class HtmlPreScreen:
+    """
+    Local, LLM-free checks of designer HTML, run before the judge.
+
+    Hard failures (the variant is dropped): markup that doesn't parse or is
+    truncated, a required image URL that isn't used, a missing slide title,
+    and content estimated to overflow the 16:9 frame.
+    Soft score (0-1): text contrast, use of the deck palette and how much
+    vertical room is left.
+
+    The overflow estimate is static (text volume x font sizes, fixed pixel
+    sizes); the real layout check happens at render time.
+    """
+
+    def __init__(self, margin: float = None):
+        # Score lead that makes a variant a clear winner (judge is skipped)
+        self.margin = margin if margin is not None else float(os.getenv("PRESCREEN_MARGIN", "0.15"))
+
+    @staticmethod
+    def required_image(slide: SlidePlan) -> Optional[str]:
+        if slide.image_prompt and slide.image_prompt.startswith(ASSET_URL_PREFIX):
+            return slide.image_prompt
+        if slide.image_action == 'use_provided' and slide.image_url:
+            return slide.image_url
+        return None
+
+    def evaluate(self, index: int, html: str, slide: SlidePlan, master_plan: PresentationPlan) -> VariantReport:
+        from bs4 import BeautifulSoup
+
+        report = VariantReport(index=index)
+        try:
+            soup = BeautifulSoup(html, "html.parser")
+        except Exception as e:
+            report.problems.append(f"unparseable markup ({e})")
+            return report
+
+        if soup.find() is None:
+            report.problems.append("no HTML elements")
+            return report
+
+        lowered = html.lower()
+        for tag in BALANCED_TAGS:
+            opened = len(re.findall(rf"<{tag}[\s>]", lowered))
+            closed = lowered.count(f"</{tag}>")
+            if opened > closed:
+                report.problems.append(f"unclosed <{tag}> ({opened} opened, {closed} closed)")
+                break
+
+        image_url = self.required_image(slide)
+        if image_url and image_url not in html:
+            report.problems.append("required image URL not used")
+
+        text = " ".join(soup.get_text(" ").lower().split())
+        title_words = [w for w in re.findall(r"\w+", slide.title.lower()) if len(w) > 2]
+        if title_words and sum(w in text for w in title_words) / len(title_words) < 0.6:
+            report.problems.append("slide title missing")
+
+        css = " ".join(tag.get_text() for tag in soup.find_all("style"))
+        css += " " + " ".join(tag.get("style", "") for tag in soup.find_all(style=True))
+
+        report.estimated_height = self._estimate_height(text, css, len(soup.find_all(["p", "li", "h1", "h2", "h3", "h4", "div"])))
+        if report.estimated_height > VIEWPORT["height"] * 1.15:
+            report.problems.append(f"likely overflow (~{report.estimated_height:.0f}px of content)")
+
+        report.contrast = self._contrast(css)
+        report.palette_match = self._palette_match(css, master_plan.color_palette_hex)
+        report.score = self._score(report)
+        return report
+
+    @staticmethod
+    def _estimate_height(text: str, css: str, blocks: int) -> float:
+        sizes = [float(s) for s in FONT_SIZE_PX.findall(css)] or [24.0]
+        body_size = sorted(sizes)[len(sizes) // 2]
+        fixed = [float(v) for name, v in FIXED_SIZE_PX.findall(css) if "height" in name.lower()]
+        # ~0.5em per character, 80% of the slide width usable, 1.4 line height
+        chars_per_line = max(1.0, VIEWPORT["width"] * 0.8 / (body_size * 0.5))
+        lines = len(text) / chars_per_line + blocks * 0.5
+        return max([lines * body_size * 1.4] + fixed)
+
+    @staticmethod
+    def _contrast(css: str) -> Optional[float]:
+        text_colors, backgrounds = [], []
+        for prop, value in CSS_DECLARATION.findall(css):
+            colors = HEX_COLOR.findall(value)
+            (text_colors if prop.lower() == "color" else backgrounds).extend(colors)
+        if not text_colors or not backgrounds:
+            return None
+        # Main background is the first one declared (html/body come first in practice)
+        return min(contrast_ratio(color, backgrounds[0]) for color in text_colors)
+
+    @staticmethod
+    def _palette_match(css: str, palette: List[str]) -> Optional[float]:
+        palette = [c for c in palette if HEX_COLOR.fullmatch(c.strip())]
+        used = set(c.lower() for c in HEX_COLOR.findall(css))
+        if not used or not palette:
+            return None
+        close = sum(1 for c in used if min(_distance(c, p) for p in palette) < 40)
+        return close / len(used)
+
+    @staticmethod
+    def _score(report: VariantReport) -> float:
+        if report.contrast is None:
+            contrast = 0.5
+        elif report.contrast < MIN_CONTRAST:
+            contrast = report.contrast / MIN_CONTRAST * 0.3  # illegible text: heavy penalty
+        else:
+            contrast = min(report.contrast / 7.0, 1.0)
+        palette = 0.5 if report.palette_match is None else report.palette_match
+        room = max(0.0, 1.0 - (report.estimated_height or 0) / VIEWPORT["height"])
+        return round(0.5 * contrast + 0.3 * palette + 0.2 * min(room * 2, 1.0), 3)
+
+    def screen(self, variants: List[str], slide: SlidePlan, master_plan: PresentationPlan) -> List[VariantReport]:
+        """Reports for every variant: valid ones first, then fewest problems, then best score."""
+        reports = [self.evaluate(i, html, slide, master_plan) for i, html in enumerate(variants)]
+        return sorted(reports, key=lambda r: (r.valid, -len(r.problems), r.score), reverse=True)
@@ -0,0 +1,176 @@
+import os
+import html
+import json
+import asyncio
+import hashlib
+from string import Template
+from typing import Dict, Optional
+from urllib.parse import quote
+from src.agents.prescreen import HtmlPreScreen
+from src.models.schemas import SlidePlan, PresentationPlan
+from src.services.browser_service import VIEWPORT
+from src.services.llm_service import LLMService
+from src.services.manifest_service import DESIGN_FIELDS
+from src.services.native_pptx import NATIVE_LAYOUT_RULE
+from src.services.resilience import ProviderError
+from src.utils.disk_cache import DiskCache
+from src.utils.telemetry import registry
+
+# Layout templates, shared across decks with the same style signature (TEMPLATE_CACHE_DIR="" disables it)
+template_cache = DiskCache(
+    directory=os.getenv("TEMPLATE_CACHE_DIR", "cache/templates"),
+    max_bytes=int(os.getenv("TEMPLATE_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    suffix=".html",
+)
+# Template designs in flight, by style signature: concurrent slides (of any deck) wait on the same call
+_inflight: Dict[str, asyncio.Task] = {}
+
+# Placeholders every template must contain ($image_url only for slides with an image)
+REQUIRED_PLACEHOLDERS = ("$title", "$points")
+# Templates are designed to hold this many points without overflowing
+TEMPLATE_MAX_POINTS = int(os.getenv("TEMPLATE_MAX_POINTS", "6"))
+
+template_fills = registry.counter("ppt_template_fills_total", "Slides designed from a layout template, by outcome")
+
+
+class TemplateDesigner:
+    """
+    Fast design path (DESIGN_MODE=template): one layout template per slide
+    type (with or without an image) is designed once per style signature,
+    then every slide of that type is filled in locally with string.Template.
+    No LLM call per slide, and no judge: a deck costs one design call per
+    slide type instead of `variants` calls per slide.
+
+    Templates are cached on disk (shared across decks and workers) and
+    concurrent slides, across all decks of the worker, wait on the same
+    design call.
+    """
+
+    def __init__(self, native: bool = False):
+        # Native output (OUTPUT_MODE=native): templates the PPTX translator can rebuild as shapes
+        self.native = native
+        layout_rule = NATIVE_LAYOUT_RULE if native else "Use modern CSS (Flexbox/Grid, gradients, box-shadows)."
+        self.system_prompt = f"""
+        You are an expert Frontend Developer specializing in High-Impact Slides.
+        Your task is to write a REUSABLE slide layout template as a single HTML file.
+
+        RULES:
+        1. Use the provided Color Palette and Fonts STRICTLY.
+        2. The output must be pure HTML/CSS (in <style> tags). No external CSS files.
+        3. The slide is exactly {VIEWPORT['width']}x{VIEWPORT['height']} pixels; everything must fit without scrolling.
+        4. {layout_rule}
+        5. Do NOT write any real content. Use these placeholders, exactly as written:
+           - $title : the slide headline (plain text)
+           - $points : a sequence of <li> elements; put it inside a <ul> or <ol>
+           - $image_url : the image URL, only when the slide has an image
+        6. Never use the $ character anywhere else.
+        7. Return ONLY the HTML code. No markdown backticks.
+        """
+
+    @staticmethod
+    def image_url(slide: SlidePlan) -> Optional[str]:
+        return HtmlPreScreen.required_image(slide)
+
+    @staticmethod
+    def signature(slide: SlidePlan, master_plan: PresentationPlan, native: bool = False) -> str:
+        """Style signature: deck design specs + slide type + whether there is an image (+ native layouts)."""
+        design = master_plan.model_dump(include=set(DESIGN_FIELDS))
+        spec = {"design": design, "type": slide.type, "image": TemplateDesigner.image_url(slide) is not None}
+        if native:
+            spec["native"] = True  # a different prompt: never share templates with image decks
+        payload = json.dumps(spec, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def missing_placeholders(template: str, with_image: bool) -> list:
+        required = REQUIRED_PLACEHOLDERS + (("$image_url",) if with_image else ())
+        return [name for name in required if name not in template]
+
+    async def _design(self, slide: SlidePlan, master_plan: PresentationPlan) -> Optional[str]:
+        """One template for this slide's type. None if no usable template came back."""
+        with_image = self.image_url(slide) is not None
+        image_instruction = (
+            "The slide has an image: use $image_url (as a background-image or an <img> src)."
+            if with_image else "The slide has no image."
+        )
+        prompt = f"""
+        Create a layout TEMPLATE for slides of type: {slide.type}
+
+        {image_instruction}
+        It must hold a title of up to 80 characters and up to {TEMPLATE_MAX_POINTS} points
+        of up to 120 characters each.
+
+        DESIGN SPECS:
+        Style: {master_plan.visual_style}
+        Colors: {master_plan.color_palette_hex}
+        Fonts: {master_plan.font_pairing}
+        """
+        print(f"--- 🧩 Template Designer: Designing the '{slide.type}' layout ---")
+        for _ in range(2):
+            template = await LLMService.generate_code(prompt, self.system_prompt)
+            template = template.replace("```html", "").replace("```", "").strip()
+            missing = self.missing_placeholders(template, with_image)
+            if not missing:
+                return template
+            print(f"   -- ⚠️ '{slide.type}' template is missing {missing}")
+            prompt += f"""
+        FIX FROM PREVIOUS ATTEMPT:
+        The template did not contain {", ".join(missing)}. Every placeholder must appear exactly as written.
+        """
+        return None
+
+    async def _load_or_design(self, key: str, slide: SlidePlan, master_plan: PresentationPlan) -> Optional[str]:
+        cached = await asyncio.to_thread(template_cache.get, key)
+        if cached is not None:
+            return cached.decode("utf-8")
+        template = await self._design(slide, master_plan)
+        if template is not None:
+            try:
+                await asyncio.to_thread(template_cache.put, key, template.encode("utf-8"))
+            except OSError as e:
+                print(f"   -- ⚠️ Template cache write failed: {e}")
+        return template
+
+    async def template_for(self, slide: SlidePlan, master_plan: PresentationPlan) -> Optional[str]:
+        key = self.signature(slide, master_plan, self.native)
+        task = _inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._load_or_design(key, slide, master_plan))
+            _inflight[key] = task
+            # Later slides read the finished template from template_cache
+            task.add_done_callback(lambda done: _inflight.pop(key) if _inflight.get(key) is done else None)
+        return await asyncio.shield(task)
+
+    @staticmethod
+    def fill(template: str, slide: SlidePlan) -> str:
+        """
+        Slide content into the template. Text is HTML-escaped; in the image URL,
+        quotes, brackets and spaces are percent-encoded so it is safe both in an
+        attribute and in a CSS url() inside <style>.
+        """
+        points = "".join(f"<li>{html.escape(point)}</li>" for point in slide.content_points)
+        return Template(template).safe_substitute(
+            title=html.escape(slide.title),
+            points=points,
+            image_url=quote(TemplateDesigner.image_url(slide) or "", safe=":/?#[]@!$&*+,;=%~-._"),
+        )
+
+    async def design_slide(self, slide: SlidePlan, master_plan: PresentationPlan) -> Optional[str]:
+        """
+        The slide's HTML from its type's template, or None when there is no
+        usable template (the caller falls back to the creative designer).
+        """
+        if len(slide.content_points) > TEMPLATE_MAX_POINTS:
+            template_fills.inc(outcome="too_many_points")
+            return None
+        try:
+            template = await self.template_for(slide, master_plan)
+        except ProviderError as e:
+            print(f"   -- ⚠️ No '{slide.type}' template ({e})")
+            template = None
+        if template is None:
+            template_fills.inc(outcome="no_template")
+            return None
+        template_fills.inc(outcome="filled")
+        print(f"   -- 🧩 Slide {slide.id} filled from the '{slide.type}' template")
+        return self.fill(template, slide)
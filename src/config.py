@@ -0,0 +1,38 @@
+import os
+
+_env_loaded = False
+
+
+def load_env():
+    """Loads .env into the process environment, once per process."""
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
+
+
+class Settings:
+    """
+    Provider credentials, read from the environment when first needed.
+    Tuning knobs stay next to the code they tune (os.getenv with a default).
+    """
+
+    @property
+    def openai_api_key(self):
+        return os.getenv("OPENAI_API_KEY")
+
+    @property
+    def google_api_key(self):
+        return os.getenv("GOOGLE_API_KEY")
+
+    @property
+    def cloudinary(self) -> dict:
+        return {
+            "cloud_name": os.getenv("CLOUDINARY_CLOUD_NAME"),
+            "api_key": os.getenv("CLOUDINARY_API_KEY"),
+            "api_secret": os.getenv("CLOUDINARY_API_SECRET"),
+        }
+
+
+settings = Settings()
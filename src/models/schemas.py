@@ -1,4 +1,4 @@
-from typing import List, Optional, Literal
+from typing import Any, Dict, List, Optional, Literal
 from pydantic import BaseModel, Field
 
 # --- NEW: Structure for the images you send in the CURL ---
@@ -27,4 +27,49 @@ class PresentationPlan(BaseModel):
     visual_style: str = Field(..., description="Design keywords (e.g., 'Minimalist', 'Cyberpunk', 'Corporate')")
     color_palette_hex: List[str] = Field(..., description="List of 3-5 Hex codes")
     font_pairing: str = Field(..., description="Primary and Secondary fonts (e.g., 'Roboto / Open Sans')")
-    slides: List[SlidePlan]
\ No newline at end of file
+    slides: List[SlidePlan]
+
+# --- Async Job API ---
+class JobEvent(BaseModel):
+    seq: int
+    phase: str = Field(..., description="Workflow phase or progress event (e.g. 'planning', 'slide_done')")
+    data: Dict[str, Any] = {}
+    at: float
+
+class Job(BaseModel):
+    id: str
+    status: Literal['queued', 'running', 'succeeded', 'failed'] = 'queued'
+    phase: str = 'queued'
+    slides_total: int = 0
+    slides_done: int = 0
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    timings: Dict[str, float] = Field({}, description="Seconds spent per phase, plus 'queued' and 'total'")
+
+# --- Deck Manifests (incremental regeneration) ---
+class SlideRecord(BaseModel):
+    slide_id: int
+    content_hash: str = Field(..., description="Hash of the slide plan plus the deck's design specs")
+    html: str = Field(..., description="The HTML that was rendered")
+    asset_name: Optional[str] = Field(None, description="Name the generated image is served under at render time")
+    image_prompt: Optional[str] = Field(None, description="Prompt of the generated image (re-fetched from the image cache)")
+    render_key: Optional[str] = Field(None, description="Render cache key of the rendered slide")
+    revision: int = 0
+
+class DeckManifest(BaseModel):
+    deck_id: str
+    plan: PresentationPlan
+    slides: List[SlideRecord]
+    created_at: float
+    updated_at: float
+
+# --- Deck-level Judging ---
+class SlideChoice(BaseModel):
+    slide_id: int
+    variant: int = Field(..., description="Index of the chosen variant for this slide, from 0")
+
+class DeckJudgement(BaseModel):
+    choices: List[SlideChoice] = Field(..., description="Exactly one choice per slide under review")
@@ -1,95 +1,393 @@
 import asyncio
+import inspect
 import os
+import time
 import uuid
+from typing import Optional, Union
 from src.agents.planner import PlannerAgent
 from src.agents.designer import DesignerAgent
-from src.agents.judge import JudgeAgent
-from src.services.browser_service import BrowserService
-from src.services.ppt_service import PPTService
+from src.agents.judge import DeckJudgeBatcher, JudgeAgent
+from src.agents.template_designer import TemplateDesigner
+from src.services.browser_service import BrowserService, VIEWPORT
+from src.services.ppt_service import DeckBuilder
 from src.services.image_service import ImageService
-from src.models.schemas import UserProvidedImage
+from src.services.manifest_service import InvalidDeckRequest, UnknownDeck, manifest_store, slide_hash
+from src.services.native_pptx import NativeSlide, translate_html
+from src.services.resilience import ProviderError
+from src.services.scheduler import Scheduler
+from src.services.scratch_service import scratch
+from src.models.schemas import DeckManifest, PresentationPlan, SlideRecord, UserProvidedImage
+from src.utils.telemetry import span
+
+# Pipeline stages and their default worker counts (per request).
+# Override with PIPELINE_<STAGE>_WORKERS, e.g. PIPELINE_RENDER_WORKERS=4.
+STAGE_WORKERS = {
+    "image": 4,
+    "design": 4,
+    "judge": 4,
+    "render": 2,
+}
 
 class Orchestrator:
-    def __init__(self):
+    def __init__(self, stage_workers: dict = None, stream_plan: bool = None, overflow_redesigns: int = None,
+                 stages: dict = None, slide_deduper=None, design_mode: str = None, output_mode: str = None,
+                 judge_mode: str = None):
+        # "image": every slide is a full-screen render
+        # "native": editable text and shapes, rendering only slides that can't be translated
+        self.output_mode = output_mode or os.getenv("OUTPUT_MODE", "image")
+        native = self.output_mode == "native"
         self.planner = PlannerAgent()
-        self.designer = DesignerAgent()
+        # Native decks ask for markup the PPTX translator can rebuild (otherwise nearly every slide renders)
+        self.designer = DesignerAgent(native=native)
         self.judge = JudgeAgent()
-        self.semaphore = asyncio.Semaphore(2)
-        # TRACKER: Keep a list of every temporary file created
-        self.temp_files = []
-
-    def register_temp_file(self, path: str):
-        """Adds a file to the death row (to be deleted later)."""
-        if path and path not in self.temp_files:
-            self.temp_files.append(path)
-
-    async def process_slide(self, slide, plan) -> str:
-        async with self.semaphore:
-            print(f"🚀 Processing Slide {slide.id}: {slide.type}")
-            
-            image_task = None
-            
-            # CASE 1: GENERATE NEW IMAGE
-            if slide.image_action == 'generate' and slide.image_prompt:
-                # Add UUID to prevent collision
-                local_image_filename = f"slide_{slide.id}_{uuid.uuid4().hex[:6]}.png"
-                local_image_path = os.path.join("temp", local_image_filename)
-                
-                image_task = asyncio.create_task(
-                    ImageService.generate_and_save_image(slide.image_prompt, local_image_path)
-                )
-                slide.image_prompt = f"./{local_image_filename}"
-                self.register_temp_file(local_image_path) # Mark for cleanup
-            
-            # CASE 2: USE PROVIDED IMAGE
-            elif slide.image_action == 'use_provided' and slide.image_url:
-                print(f"   -- 📎 Using provided image: {slide.image_url[:30]}...")
+        self.templates = TemplateDesigner(native=native)
+        # One bounded worker pool per stage: a slide only holds a slot of the
+        # stage it is in, so a slide waiting on its image doesn't block design.
+        # Batches pass one shared set of pools to all their orchestrators.
+        self.stages = stages or self.make_stages(stage_workers)
+        # Batches: identical slides across decks are processed once (SlideDeduper)
+        self.slide_deduper = slide_deduper
+        # "slide": one judge call per slide; "deck": the deck's slides are judged together
+        self.judge_mode = judge_mode or os.getenv("JUDGE_MODE", "slide")
+        # "creative": every slide designed from scratch (variants + judge)
+        # "template": slides filled into per-type layout templates, creative as the fallback
+        self.design_mode = design_mode or os.getenv("DESIGN_MODE", "creative")
+        # Streaming planner: slides start as soon as they are planned (PLANNER_STREAMING=1)
+        self.stream_plan = stream_plan if stream_plan is not None else os.getenv("PLANNER_STREAMING", "0") == "1"
+        # How many times a slide whose HTML overflows the frame is sent back to the designer
+        self.overflow_redesigns = (
+            overflow_redesigns if overflow_redesigns is not None else int(os.getenv("RENDER_OVERFLOW_REDESIGNS", "1"))
+        )
+        # Optional progress callback: progress(phase, data), may be async
+        self.progress = None
+        # Deck manifest of the current run (slide id -> record), saved when the deck is done
+        self.deck_id = None
+        self.records = {}
+
+    @staticmethod
+    def make_stages(stage_workers: dict = None) -> dict:
+        workers = {**STAGE_WORKERS, **(stage_workers or {})}
+        return {
+            name: asyncio.Semaphore(int(os.getenv(f"PIPELINE_{name.upper()}_WORKERS", str(count))))
+            for name, count in workers.items()
+        }
+
+    async def run_stage(self, stage: str, func, *args):
+        if stage == "judge" and self.judge.batcher is not None:
+            # Deck judging: slides wait for each other here, a pool slot
+            # per waiting slide would stall the batch
+            with span(f"stage.{stage}"):
+                return await func(*args)
+        async with self.stages[stage]:
+            with span(f"stage.{stage}"):
+                return await func(*args)
 
-            # CODE GENERATION
-            code_task = asyncio.create_task(
-                self.designer.generate_slide_variants(slide, plan)
+    def _start_deck(self):
+        """Per-workflow state shared by the deck's slides."""
+        self.records = {}
+        self.judge.batcher = DeckJudgeBatcher(self.judge) if self.judge_mode == "deck" else None
+
+    async def report(self, phase: str, **data):
+        """Forwards a progress event to the caller (e.g. the job API)."""
+        if self.progress is None:
+            return
+        try:
+            result = self.progress(phase, data)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            print(f"⚠️ Progress callback failed: {e}")
+
+    async def process_slide(self, slide, plan, feedback: str = None, revision: int = 0) -> Union[bytes, NativeSlide]:
+        """
+        Runs one slide through the stages: image generation in parallel with
+        design -> judge, then render once both are done. Returns the image bytes
+        (or, in native output mode, the NativeSlide when no render is needed).
+        `feedback` is passed on to the designer (e.g. for a requested redesign).
+        """
+        print(f"🚀 Processing Slide {slide.id}: {slide.type}")
+        record = SlideRecord(
+            slide_id=slide.id, content_hash=slide_hash(slide, plan), html="", revision=revision,
+            image_prompt=slide.image_prompt if slide.image_action == 'generate' else None,
+        )
+        # Work on a copy: the plan is persisted with the original image prompts
+        slide = slide.model_copy()
+
+        image_task = None
+        asset_name = None
+        # In-memory assets served to the page at render time (name -> bytes)
+        assets = {}
+        
+        # CASE 1: GENERATE NEW IMAGE
+        if slide.image_action == 'generate' and slide.image_prompt:
+            # Deterministic: the URL ends up in the designer and judge prompts (and their cache keys).
+            # Assets are per render, so the name only has to be unique within the slide.
+            asset_name = f"slide_{slide.id}_{ImageService.cache_key(slide.image_prompt)[:12]}.png"
+            
+            image_task = asyncio.create_task(
+                self.run_stage("image", ImageService.generate_image, slide.image_prompt)
             )
+            slide.image_prompt = BrowserService.asset_url(asset_name)
+        
+        # CASE 2: USE PROVIDED IMAGE
+        elif slide.image_action == 'use_provided' and slide.image_url:
+            print(f"   -- 📎 Using provided image: {slide.image_url[:30]}...")
+
+        try:
+            # DESIGN + JUDGE (only needs the image URL, not the image itself)
+            best_html = None
+            if self.design_mode == "template" and feedback is None:
+                if self.judge.batcher is not None:
+                    # Template fills skip the judge: don't hold the deck's batch while this one renders
+                    self.judge.batcher.leave(slide.id)
+                best_html = await self.run_stage("design", self.templates.design_slide, slide, plan)
+                if best_html is None and self.judge.batcher is not None:
+                    self.judge.batcher.expect(slide.id)  # back to variants + judge
+            if best_html is None:
+                variants = await self.run_stage("design", self.designer.generate_slide_variants, slide, plan, feedback)
+                best_html = await self.run_stage("judge", self.judge.select_best_variant, variants, slide, plan)
 
             if image_task:
-                await image_task
-            variants = await code_task
+                try:
+                    assets[asset_name] = await image_task
+                except ProviderError as e:
+                    # The slide still ships: the renderer serves a transparent placeholder
+                    print(f"   -- ⚠️ No image for Slide {slide.id} ({e}), rendering without it")
+        finally:
+            if image_task and not image_task.done():
+                image_task.cancel()
 
-            # RENDER
-            best_html = await self.judge.select_best_variant(variants, slide, plan)
-            
-            # Save HTML temporarily (Add UUID)
-            html_filename = f"slide_{slide.id}_{uuid.uuid4().hex[:6]}.html"
-            html_path = os.path.join("temp", html_filename)
-            with open(html_path, "w", encoding="utf-8") as f:
-                f.write(best_html)
-            self.register_temp_file(html_path) # Mark for cleanup
-            
-            # Render final image (Add UUID)
-            render_path = os.path.join("temp", f"slide_{slide.id}_final_{uuid.uuid4().hex[:6]}.png")
-            print(f"   -- 📸 Rendering Slide {slide.id}...")
-            
-            # Note: BrowserService needs to handle the HTML file path correctly
-            # Assuming it can load "file://{abs_path}" or just relative path if in same root
-            await BrowserService.render_html_to_image(best_html, render_path)
-            
-            self.register_temp_file(render_path) # Mark for cleanup
-            
-            return render_path
+        native = self._translate(best_html, slide, plan, assets)
+        if native is not None:
+            record.html = best_html
+            record.asset_name = asset_name
+            self.records[slide.id] = record
+            return native
+
+        # RENDER (re-designed when the HTML overflows the 16:9 frame)
+        print(f"   -- 📸 Rendering Slide {slide.id}...")
+        result = await self.run_stage("render", BrowserService.render, best_html, assets)
+        redesigns = 0
+        while result.overflow and redesigns < self.overflow_redesigns:
+            redesigns += 1
+            print(f"   -- 📐 Slide {slide.id} overflows ({result.content_width}x{result.content_height}px), re-designing...")
+            await self.report(
+                "slide_overflow", slide_id=slide.id, attempt=redesigns,
+                content_width=result.content_width, content_height=result.content_height,
+            )
+            feedback = (
+                f"The previous design overflowed the {VIEWPORT['width']}x{VIEWPORT['height']} slide "
+                f"(content measured {result.content_width}x{result.content_height}px) and was cut off. "
+                f"Everything must fit inside {VIEWPORT['width']}x{VIEWPORT['height']} without scrolling: "
+                "shorten the copy, reduce font sizes and spacing."
+            )
+            variants = await self.run_stage("design", self.designer.generate_slide_variants, slide, plan, feedback)
+            best_html = await self.run_stage("judge", self.judge.select_best_variant, variants, slide, plan)
+            result = await self.run_stage("render", BrowserService.render, best_html, assets)
 
-    def cleanup_garbage(self):
-        """Deletes all tracked temporary files."""
-        print(f"🧹 Cleaning up {len(self.temp_files)} intermediate assets...")
-        for file_path in self.temp_files:
+        if result.overflow:
+            print(f"   -- ⚠️ Slide {slide.id} still overflows, keeping the clipped render")
+
+        record.html = best_html
+        record.asset_name = asset_name
+        await self._record_slide(record, result.image)
+        return result.image
+
+    async def rerender_slide(self, slide, plan, record: SlideRecord) -> Union[bytes, NativeSlide]:
+        """Renders a slide from its saved HTML (the render itself was evicted, or it was a native slide)."""
+        print(f"   -- 📸 Re-rendering Slide {slide.id} from its saved HTML...")
+        assets = {}
+        if record.asset_name and record.image_prompt:
+            # Normally an image cache hit
+            try:
+                assets[record.asset_name] = await self.run_stage("image", ImageService.generate_image, record.image_prompt)
+            except ProviderError as e:
+                print(f"   -- ⚠️ No image for Slide {slide.id} ({e}), rendering without it")
+        native = self._translate(record.html, slide, plan, assets)
+        if native is not None:
+            self.records[record.slide_id] = record
+            return native
+        result = await self.run_stage("render", BrowserService.render, record.html, assets)
+        await self._record_slide(record, result.image)
+        return result.image
+
+    def _translate(self, html: str, slide, plan, assets: dict) -> Optional[NativeSlide]:
+        """Native output mode: the slide as editable shapes, or None if it has to be rendered."""
+        if self.output_mode != "native":
+            return None
+        native = translate_html(html, slide, plan, assets)
+        if native is None:
+            print(f"   -- 🖼️ Slide {slide.id} uses markup with no native equivalent, rendering it")
+        else:
+            print(f"   -- ✏️ Slide {slide.id} translated to native shapes")
+        return native
+
+    async def _record_slide(self, record: SlideRecord, image_data: bytes):
+        """Keeps what is needed to reuse this slide when the deck is edited."""
+        if manifest_store.enabled:
+            record.render_key = await manifest_store.put_render(image_data)
+        self.records[record.slide_id] = record
+
+    async def _save_manifest(self, plan, created_at: float = None):
+        now = time.time()
+        manifest = DeckManifest(
+            deck_id=self.deck_id,
+            plan=plan,
+            slides=[self.records[slide.id] for slide in plan.slides if slide.id in self.records],
+            created_at=created_at or now,
+            updated_at=now,
+        )
+        try:
+            await manifest_store.save(manifest)
+        except OSError as e:
+            print(f"⚠️ Deck manifest write failed: {e}")
+
+    async def run_workflow(self, user_prompt: str, user_images: list = [], progress=None) -> bytes:
+        """
+        Runs the full pipeline and returns the finished PPTX as bytes.
+        `progress(phase, data)` is called on every phase change and per finished slide.
+        """
+        self.progress = progress
+        # Every provider call below is queued fairly against other requests
+        self.deck_id = f"deck_{uuid.uuid4().hex[:8]}"
+        self._start_deck()
+        with Scheduler.request_scope(self.deck_id), span("workflow", deck_id=self.deck_id):
+            # Renders past PPT_SPILL_BYTES are spilled to this request's scratch directory, removed on exit
+            async with scratch.request(self.deck_id) as space:
+                return await self._run_workflow(user_prompt, user_images, space)
+
+    async def regenerate(self, deck_id: str, plan: PresentationPlan = None, slide_ids: list = None, progress=None) -> bytes:
+        """
+        Rebuilds a saved deck after an edit and returns the new PPTX bytes.
+        Only slides whose inputs changed in `plan` (default: the saved plan),
+        plus the ones listed in `slide_ids`, go through the pipeline again;
+        every other slide reuses its saved render.
+        Raises UnknownDeck if the deck has no manifest, InvalidDeckRequest for
+        a malformed deck id or unknown slide ids.
+        """
+        manifest = await manifest_store.load(deck_id)
+        if manifest is None:
+            raise UnknownDeck(deck_id)
+        plan = plan or manifest.plan
+        forced = set(slide_ids or [])
+        unknown = forced - {slide.id for slide in plan.slides}
+        if unknown:
+            raise InvalidDeckRequest(f"Unknown slide ids: {sorted(unknown)}")
+
+        self.progress = progress
+        self.deck_id = deck_id
+        self._start_deck()
+        with Scheduler.request_scope(f"{deck_id}_edit"), span("regenerate", deck_id=deck_id):
+            async with scratch.request(f"{deck_id}_edit") as space:
+                previous = {record.slide_id: record for record in manifest.slides}
+                await self.report("generating", slides_total=len(plan.slides), visual_style=plan.visual_style)
+                deck = DeckBuilder(len(plan.slides), scratch=space)
+                await self._gather_slides([
+                    self._dispatch(i, slide, plan, deck, previous.get(slide.id), slide.id in forced)
+                    for i, slide in enumerate(plan.slides)
+                ])
+
+                await self.report("compiling")
+                ppt_data = await deck.save()
+                await self._save_manifest(plan, created_at=manifest.created_at)
+                return ppt_data
+
+    def _dispatch(self, index: int, slide, plan, deck: DeckBuilder, previous: SlideRecord = None,
+                  force: bool = False) -> asyncio.Task:
+        """Starts one slide; the deck judge expects it from now on (until it leaves)."""
+        if self.judge.batcher is not None:
+            self.judge.batcher.expect(slide.id)
+        return asyncio.create_task(self._process_and_assemble(index, slide, plan, deck, previous, force))
+
+    async def _process_and_assemble(self, index: int, slide, plan, deck: DeckBuilder,
+                                    previous: SlideRecord = None, force: bool = False):
+        reuse = previous is not None and not force and previous.content_hash == slide_hash(slide, plan)
+        shared = self.slide_deduper is not None and self.slide_deduper.shared(slide_hash(slide, plan))
+        if (reuse or shared) and self.judge.batcher is not None:
+            # Never reaches this deck's judge: stop holding the batch for it now
+            self.judge.batcher.leave(slide.id)
+        with span("slide", slide_id=slide.id, slide_type=slide.type, reused=reuse):
             try:
-                if os.path.exists(file_path):
-                    os.remove(file_path)
-            except Exception as e:
-                print(f"⚠️ Failed to delete {file_path}: {e}")
-        self.temp_files = []
+                if reuse:
+                    image_data = await manifest_store.get_render(previous.render_key) if previous.render_key else None
+                    if image_data is None:
+                        image_data = await self.rerender_slide(slide, plan, previous)
+                    else:
+                        print(f"♻️ Slide {slide.id} unchanged, reusing its render")
+                        self.records[slide.id] = previous
+                elif self.slide_deduper is not None:
+                    record, image_data = await self.slide_deduper.run(
+                        slide_hash(slide, plan), lambda: self._produce_slide(slide, plan)
+                    )
+                    self.records[slide.id] = record
+                else:
+                    feedback, revision = None, 0
+                    if force and previous is not None:
+                        revision = previous.revision + 1
+                        feedback = (
+                            f"The user asked for a new design of this slide (revision {revision}). "
+                            "Do not repeat the previous layout."
+                        )
+                    image_data = await self.process_slide(slide, plan, feedback, revision)
+            finally:
+                if self.judge.batcher is not None:
+                    # No-op once the slide reached the judge; unblocks the batch if it failed earlier
+                    self.judge.batcher.leave(slide.id)
+        await deck.add(index, image_data)
+        await self.report("slide_done", slide_id=slide.id, reused=reuse)
+
+    @staticmethod
+    async def _gather_slides(tasks: list):
+        """Waits for every slide; if one fails the rest are cancelled (their scratch space is about to go)."""
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+    async def _produce_slide(self, slide, plan):
+        image_data = await self.process_slide(slide, plan)
+        return self.records[slide.id], image_data
+
+    async def _plan_streaming(self, user_prompt: str, images: list, deck: DeckBuilder):
+        """
+        Starts each slide as soon as the planner has streamed it.
+        Returns (plan, slide tasks); plan is None if nothing could be streamed.
+        """
+        plan = None
+        tasks = []
+        batcher = self.judge.batcher
+        if batcher is not None:
+            # Slides not streamed yet can't be expected: keep the batch open until the plan ends
+            batcher.expect(DeckJudgeBatcher.PLANNING)
+        try:
+            async for item in self.planner.stream_plan(user_prompt, images):
+                if isinstance(item, PresentationPlan):
+                    plan = item
+                    print(f"📋 Plan header streamed. Style: {plan.visual_style}")
+                    print(f"\n=== STEP 2: PIPELINED GENERATION ===")
+                    await self.report("generating", visual_style=plan.visual_style)
+                else:
+                    print(f"📋 Slide {item.id} planned, dispatching...")
+                    await self.report("slide_planned", slide_id=item.id)
+                    tasks.append(self._dispatch(len(tasks), item, plan, deck))
+        except Exception as e:
+            if not tasks:
+                # Nothing dispatched yet: the caller can still fall back to the blocking planner
+                print(f"⚠️ Streaming planner failed ({e}), falling back to full plan")
+                return None, []
+            for task in tasks:
+                task.cancel()
+            raise
+        finally:
+            if batcher is not None:
+                batcher.leave(DeckJudgeBatcher.PLANNING)
+        return plan, tasks
 
-    async def run_workflow(self, user_prompt: str, user_images: list = []) -> str:
+    async def _run_workflow(self, user_prompt: str, user_images: list, space=None) -> bytes:
         print("\n=== STEP 1: PLANNING ===")
-        os.makedirs("temp", exist_ok=True)
+        await self.report("planning")
         
         processed_images = []
         for img in user_images:
@@ -97,23 +395,29 @@ class Orchestrator:
                 processed_images.append(UserProvidedImage(**img))
             else:
                 processed_images.append(img)
-                
-        plan = await self.planner.create_plan(user_prompt, processed_images)
-        print(f"📋 Plan created: {len(plan.slides)} slides. Style: {plan.visual_style}")
         
-        print(f"\n=== STEP 2: CONCURRENT GENERATION ===")
-        tasks = [self.process_slide(slide, plan) for slide in plan.slides]
-        final_slide_images = await asyncio.gather(*tasks)
+        # Renders are added to the deck as they finish (kept in slide order)
+        deck = DeckBuilder(scratch=space)
+        plan, tasks = None, []
+        if self.stream_plan:
+            with span("planning", streaming=True):
+                plan, tasks = await self._plan_streaming(user_prompt, processed_images, deck)
+
+        if not tasks:
+            with span("planning", streaming=False):
+                plan = await self.planner.create_plan(user_prompt, processed_images)
+            print(f"📋 Plan created: {len(plan.slides)} slides. Style: {plan.visual_style}")
+            
+            print(f"\n=== STEP 2: PIPELINED GENERATION ===")
+            await self.report("generating", slides_total=len(plan.slides), visual_style=plan.visual_style)
+            tasks = [self._dispatch(i, slide, plan, deck) for i, slide in enumerate(plan.slides)]
+
+        await self._gather_slides(tasks)
             
         print("\n=== STEP 3: COMPILING PPTX ===")
-        # Use UUID for the PPT file too
-        output_filename = f"presentation_{uuid.uuid4().hex}.pptx"
-        output_path = os.path.join("temp", output_filename)
-        
-        PPTService.create_presentation(final_slide_images, output_path)
-        
-        # CLEANUP: Delete all pngs/htmls now
-        self.cleanup_garbage()
+        await self.report("compiling")
+        ppt_data = await deck.save()
+        await self._save_manifest(plan)
         
-        print(f"✅ DONE! Created {output_path}")
-        return output_path
\ No newline at end of file
+        print(f"✅ DONE! Built presentation ({len(ppt_data)} bytes)")
+        return ppt_data
@@ -0,0 +1,159 @@
+import os
+import json
+import asyncio
+import hashlib
+from typing import Dict, List, Tuple
+from src.utils.disk_cache import DiskCache
+from src.utils.telemetry import registry
+
+# External fonts, stylesheets and images fetched by renders, shared across
+# requests and workers (RENDER_ASSET_CACHE_DIR="" disables the cache)
+asset_store = DiskCache(
+    directory=os.getenv("RENDER_ASSET_CACHE_DIR", "cache/assets"),
+    max_bytes=int(os.getenv("RENDER_ASSET_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
+    suffix=".asset",
+)
+
+# RENDER_OFFLINE=1: never touch the network, a render needing an uncached URL fails
+RENDER_OFFLINE = os.getenv("RENDER_OFFLINE", "0") == "1"
+RENDER_ASSET_FETCH_TIMEOUT = float(os.getenv("RENDER_ASSET_FETCH_TIMEOUT", "15"))
+# Larger responses are passed through but not stored
+RENDER_ASSET_MAX_BYTES = int(os.getenv("RENDER_ASSET_MAX_BYTES", str(20 * 1024 * 1024)))
+
+CACHED_RESOURCE_TYPES = ("font", "stylesheet", "image")
+
+asset_requests = registry.counter("ppt_render_asset_requests_total", "External render requests, by cache result")
+asset_bytes_saved = registry.counter("ppt_render_asset_bytes_saved_total", "Bytes served from the render asset cache")
+
+
+class OfflineAssetError(Exception):
+    """Offline mode: the page needed URLs that aren't in the asset cache."""
+
+    def __init__(self, urls: List[str]):
+        super().__init__(f"Offline render needs {len(urls)} uncached asset(s): {', '.join(urls[:3])}")
+        self.urls = urls
+
+
+def _pack(content_type: str, body: bytes) -> bytes:
+    """One cache entry: a JSON header line, then the body (a single file, evicted as one)."""
+    return json.dumps({"content_type": content_type}).encode("utf-8") + b"\n" + body
+
+
+def _unpack(blob: bytes) -> Tuple[str, bytes]:
+    header, _, body = blob.partition(b"\n")
+    return json.loads(header)["content_type"], body
+
+
+class RenderAssetCache:
+    """
+    Request interceptor for renders: GET requests for fonts, stylesheets and
+    images are answered from a local content store keyed by URL (sha256),
+    with size-bounded LRU eviction (DiskCache). Each URL is fetched once:
+    concurrent renders asking for the same URL wait on the same fetch.
+    Other requests go to the network as before, unless `offline`, where any
+    request that isn't cached is aborted and the render fails.
+    """
+
+    def __init__(self, store: DiskCache = None, offline: bool = None):
+        self.store = store or asset_store
+        self.offline = RENDER_OFFLINE if offline is None else offline
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._blocked: Dict[object, List[str]] = {}
+        self._stats = {
+            "hits": 0, "shared": 0, "misses": 0, "fetch_failures": 0, "blocked": 0,
+            "bytes_saved": 0, "bytes_fetched": 0,
+        }
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def take_blocked(self, page) -> List[str]:
+        """URLs the page asked for that offline mode refused (cleared on read)."""
+        return self._blocked.pop(page, [])
+
+    async def _fetch(self, route, key: str) -> Tuple[int, str, bytes]:
+        """
+        Network fetch through the browser (same headers as the page).
+        Returns (status, content type, body); only 200s within the size limit are stored.
+        """
+        response = await route.fetch(timeout=RENDER_ASSET_FETCH_TIMEOUT * 1000)
+        body = await response.body()
+        content_type = response.headers.get("content-type", "application/octet-stream")
+        self._stats["bytes_fetched"] += len(body)
+        if response.status == 200 and len(body) <= RENDER_ASSET_MAX_BYTES:
+            try:
+                await asyncio.to_thread(self.store.put, key, _pack(content_type, body))
+            except OSError as e:
+                print(f"   -- ⚠️ Render asset cache write failed: {e}")
+        return response.status, content_type, body
+
+    async def handle(self, route):
+        request = route.request
+        if request.method != "GET" or request.resource_type not in CACHED_RESOURCE_TYPES:
+            if self.offline:
+                await self._block(route)
+            else:
+                await route.continue_()
+            return
+
+        key = self.key(request.url)
+        blob = await asyncio.to_thread(self.store.get, key)
+        if blob is not None:
+            content_type, body = _unpack(blob)
+            self._stats["hits"] += 1
+            self._stats["bytes_saved"] += len(body)
+            asset_requests.inc(result="hit")
+            asset_bytes_saved.inc(len(body))
+            await self._fulfill(route, 200, content_type, body)
+            return
+
+        if self.offline:
+            await self._block(route)
+            return
+
+        task = self._inflight.get(key)
+        shared = task is not None
+        if not shared:
+            task = asyncio.create_task(self._fetch(route, key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        self._stats["shared" if shared else "misses"] += 1
+        asset_requests.inc(result="shared" if shared else "miss")
+        try:
+            status, content_type, body = await asyncio.shield(task)
+        except Exception as e:
+            self._stats["fetch_failures"] += 1
+            print(f"   -- ⚠️ Render asset fetch failed ({request.url[:80]}): {e}")
+            await route.abort("failed")
+            return
+        if shared:
+            # Another render's fetch answered this one
+            self._stats["bytes_saved"] += len(body)
+            asset_bytes_saved.inc(len(body))
+        await self._fulfill(route, status, content_type, body)
+
+    @staticmethod
+    async def _fulfill(route, status: int, content_type: str, body: bytes):
+        # Fonts are cross-origin requests: allow them as the origin server would
+        headers = {"content-type": content_type, "access-control-allow-origin": "*"}
+        await route.fulfill(status=status, headers=headers, body=body)
+
+    async def _block(self, route):
+        self._stats["blocked"] += 1
+        asset_requests.inc(result="blocked")
+        self._blocked.setdefault(route.request.frame.page, []).append(route.request.url)
+        await route.abort("internetdisconnected")
+
+    def stats(self) -> dict:
+        served = self._stats["hits"] + self._stats["shared"]
+        lookups = served + self._stats["misses"]
+        return {
+            "offline": self.offline,
+            "hit_rate": (served / lookups) if lookups else 0.0,
+            **self._stats,
+            "store": self.store.stats(),
+        }
+
+
+render_assets = RenderAssetCache()
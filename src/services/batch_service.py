@@ -0,0 +1,139 @@
+import os
+import time
+import asyncio
+from string import Template
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from src.models.schemas import SlideRecord
+from src.services.manifest_service import manifest_store
+
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "500"))
+
+
+class SlideDeduper:
+    """
+    Shares slide work between the decks of one batch. Slides with the same
+    content hash (same plan and design specs) run through the pipeline once:
+    concurrent requests wait on the same task, later ones reuse its saved
+    render (kept on disk in the render cache, not in memory).
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._done: Dict[str, SlideRecord] = {}
+        self.hits = 0
+
+    async def run(self, key: str, produce: Callable[[], Awaitable[Tuple[SlideRecord, bytes]]]) -> Tuple[SlideRecord, bytes]:
+        record = self._done.get(key)
+        if record is not None:
+            image_data = await manifest_store.get_render(record.render_key)
+            if image_data is not None:
+                self.hits += 1
+                return record, image_data
+            del self._done[key]  # evicted: produce it again
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(produce())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        else:
+            self.hits += 1
+        # Shielded: one deck being cancelled doesn't cancel the slide for the others
+        return await asyncio.shield(task)
+
+    def shared(self, key: str) -> bool:
+        """True if run(key) would wait on (or reuse) work another deck already started."""
+        return key in self._inflight or key in self._done
+
+    def cancel(self):
+        for task in list(self._inflight.values()):
+            task.cancel()
+
+    def _finish(self, key: str, task: asyncio.Task):
+        self._inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        record, _ = task.result()
+        if record.render_key:
+            self._done[key] = record
+
+
+def expand_prompts(prompts: List[str], template: Optional[str], items: List[Dict[str, Any]]) -> List[str]:
+    """
+    Batch input -> one prompt per deck: plain `prompts`, plus `template`
+    rendered once per item ($name placeholders, e.g. "Pitch deck for $client").
+    """
+    expanded = list(prompts)
+    if template:
+        for variables in items or [{}]:
+            expanded.append(Template(template).safe_substitute({k: str(v) for k, v in variables.items()}))
+    return expanded
+
+
+async def run_batch(prompts: List[str], build: Callable[[str], Awaitable[dict]],
+                    concurrency: int = None) -> AsyncIterator[dict]:
+    """
+    Builds one deck per prompt with at most `concurrency` decks in flight.
+    Identical prompts are built once and share the result (`duplicate_of`
+    points at the item that built it).
+    Yields each item's result as soon as it finishes (in completion order),
+    then a final summary. Throughput only counts decks actually built;
+    items served by another item's build are reported as `duplicate_hits`.
+    """
+    semaphore = asyncio.Semaphore(concurrency or BATCH_CONCURRENCY)
+    started = time.perf_counter()
+    builds: Dict[str, asyncio.Task] = {}
+    first_index: Dict[str, int] = {}
+
+    async def build_once(index: int, prompt: str) -> dict:
+        async with semaphore:
+            item_started = time.perf_counter()
+            try:
+                return await build(prompt)
+            finally:
+                print(f"📦 Batch item {index} finished in {time.perf_counter() - item_started:.1f}s")
+
+    async def one(index: int, prompt: str) -> dict:
+        if prompt not in builds:
+            builds[prompt] = asyncio.create_task(build_once(index, prompt))
+            first_index[prompt] = index
+        shared = {"duplicate_of": first_index[prompt]} if first_index[prompt] != index else {}
+        try:
+            result = await asyncio.shield(builds[prompt])
+            return {"type": "item", "index": index, "status": "succeeded", **shared, **result}
+        except Exception as e:
+            print(f"❌ Batch item {index} failed: {e}")
+            return {"type": "item", "index": index, "status": "failed", **shared, "error": str(e)}
+
+    tasks = [asyncio.create_task(one(i, prompt)) for i, prompt in enumerate(prompts)]
+    succeeded = failed = built = duplicate_hits = 0
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            result = await next_done
+            if result["status"] == "succeeded":
+                succeeded += 1
+                if "duplicate_of" in result:
+                    duplicate_hits += 1
+                else:
+                    built += 1
+            else:
+                failed += 1
+            yield result
+    finally:
+        # Client went away (or the caller stopped early): don't keep building
+        for task in [*tasks, *builds.values()]:
+            task.cancel()
+
+    elapsed = time.perf_counter() - started
+    yield {
+        "type": "summary",
+        "decks": len(prompts),
+        "unique_decks": len(builds),
+        "succeeded": succeeded,
+        "failed": failed,
+        "built": built,
+        "duplicate_hits": duplicate_hits,
+        "elapsed_seconds": round(elapsed, 3),
+        "decks_per_hour": round(built / elapsed * 3600, 1) if elapsed else 0.0,
+    }
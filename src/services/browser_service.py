@@ -1,38 +1,383 @@
 import os
-from playwright.async_api import async_playwright
+import time
+import asyncio
+import mimetypes
+from dataclasses import dataclass
+from typing import Dict
+from contextlib import asynccontextmanager
+from src.services.asset_cache import OfflineAssetError, render_assets
+from src.services.scheduler import scheduler
+from src.utils.telemetry import span
+
+# CRITICAL Docker flags
+CHROMIUM_ARGS = [
+    "--no-sandbox",
+    "--disable-setuid-sandbox",
+    "--disable-dev-shm-usage"  # Prevents memory crash on Render
+]
+VIEWPORT = {"width": 1920, "height": 1080}
+
+# Render settings:
+#   RENDER_MODE       "viewport" clips to the 16:9 frame, "full_page" captures the whole document
+#   RENDER_FORMAT     "png" or "jpeg" (RENDER_JPEG_QUALITY, 0-100)
+#   RENDER_SCALE      device scale factor (2 = 3840x2160 output)
+#   RENDER_READY_TIMEOUT  ms to wait for fonts / images before capturing anyway
+RENDER_MODE = os.getenv("RENDER_MODE", "viewport")
+RENDER_FORMAT = os.getenv("RENDER_FORMAT", "png").lower()
+RENDER_JPEG_QUALITY = int(os.getenv("RENDER_JPEG_QUALITY", "90"))
+RENDER_SCALE = float(os.getenv("RENDER_SCALE", "1"))
+RENDER_READY_TIMEOUT = int(os.getenv("RENDER_READY_TIMEOUT", "5000"))
+
+# Resolves once web fonts are loaded and every <img> is decoded (or the
+# timeout passes), then reports how far the content overflows the viewport.
+READY_SCRIPT = """
+async (timeout) => {
+    const ready = Promise.all([
+        document.fonts ? document.fonts.ready : Promise.resolve(),
+        ...Array.from(document.images).map(img => img.decode().catch(() => null)),
+    ]);
+    const timedOut = await Promise.race([
+        ready.then(() => false),
+        new Promise(resolve => setTimeout(() => resolve(true), timeout)),
+    ]);
+    // Two frames so layout and paint have settled
+    await new Promise(resolve => requestAnimationFrame(() => requestAnimationFrame(resolve)));
+    const root = document.documentElement;
+    const body = document.body || root;
+    return {
+        timedOut,
+        width: Math.max(root.scrollWidth, body.scrollWidth),
+        height: Math.max(root.scrollHeight, body.scrollHeight),
+    };
+}
+"""
+
+# Served for assets that are referenced but missing (e.g. image generation
+# failed), so the page shows its background instead of a broken image
+PLACEHOLDER_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d49484452000000010000000108060000001f15c489"
+    "0000000d4944415478da63606060600000000500017aa857500000000049454e44ae426082"
+)
+
+# Overflow below this many CSS pixels is ignored (scrollbar / rounding noise)
+OVERFLOW_TOLERANCE = 4
+
+# Virtual origin for assets we hold in memory (e.g. generated images).
+# Requests to it are intercepted and answered from the render's asset map.
+ASSET_URL_PREFIX = "https://assets.local/"
+
+
+def _external_url(url: str) -> bool:
+    """Network requests of a render (answered through the render asset cache)."""
+    return url.startswith(("http://", "https://")) and not url.startswith(ASSET_URL_PREFIX)
+
+
+@dataclass
+class RenderResult:
+    image: bytes
+    format: str
+    content_width: int
+    content_height: int
+    ready_timed_out: bool = False
+
+    @property
+    def overflow(self) -> bool:
+        """True when the HTML doesn't fit the 16:9 frame (it was clipped)."""
+        return (
+            self.content_width > VIEWPORT["width"] + OVERFLOW_TOLERANCE
+            or self.content_height > VIEWPORT["height"] + OVERFLOW_TOLERANCE
+        )
+
+
+class _PageSlot:
+    """One reusable page (in its own context) owned by the pool."""
+
+    def __init__(self):
+        self.browser = None
+        self.context = None
+        self.page = None
+        self.renders = 0
+        self.dirty = False
+
+
+class BrowserPool:
+    """
+    Long-lived Chromium shared by every render in this worker.
+
+    - The browser is launched once and reused across slides and requests.
+    - `size` pages (each in its own context) are handed out per render,
+      so at most `size` renders run at the same time.
+    - A page is recycled after `max_page_renders` uses or after a failed render.
+    - The browser is relaunched if it crashes, or after `max_browser_renders`
+      renders to keep leaks in check.
+    """
+
+    def __init__(self, size: int = None, max_page_renders: int = None, max_browser_renders: int = None):
+        self.size = size or int(os.getenv("BROWSER_POOL_SIZE", "2"))
+        self.max_page_renders = max_page_renders or int(os.getenv("BROWSER_PAGE_MAX_RENDERS", "50"))
+        self.max_browser_renders = max_browser_renders or int(os.getenv("BROWSER_MAX_RENDERS", "500"))
+
+        self._playwright = None
+        self._browser = None
+        self._browser_renders = 0
+        self._slots = []
+        self._idle = None
+        self._waiting = 0
+        self._lock = asyncio.Lock()
+
+        self._metrics = {
+            "acquisitions": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+            "renders": 0,
+            "failed_renders": 0,
+            "page_recycles": 0,
+            "browser_launches": 0,
+            "browser_crashes": 0,
+        }
+
+    @property
+    def started(self) -> bool:
+        return self._idle is not None
+
+    # -------------------------
+    # Lifecycle
+    # -------------------------
+    async def start(self):
+        async with self._lock:
+            if self.started:
+                return
+            print(f"🌐 Starting browser pool ({self.size} pages)...")
+            from playwright.async_api import async_playwright
+            self._playwright = await async_playwright().start()
+            await self._launch_browser()
+            self._slots = [_PageSlot() for _ in range(self.size)]
+            self._idle = asyncio.Queue()
+            for slot in self._slots:
+                self._idle.put_nowait(slot)
+
+    async def stop(self):
+        async with self._lock:
+            if not self.started:
+                return
+            print("🌐 Stopping browser pool...")
+            browsers = {slot.browser for slot in self._slots if slot.browser} | {self._browser}
+            self._browser = None
+            for slot in self._slots:
+                await self._close_slot(slot)
+            for browser in browsers:
+                await self._close_quietly(browser)
+            await self._playwright.stop()
+            self._playwright = None
+            self._slots = []
+            self._idle = None
+
+    async def _launch_browser(self):
+        browser = await self._playwright.chromium.launch(args=CHROMIUM_ARGS)
+        browser.on("disconnected", self._on_disconnected)
+        self._browser = browser
+        self._browser_renders = 0
+        self._metrics["browser_launches"] += 1
+
+    def _on_disconnected(self, browser):
+        if self.started and browser is self._browser:
+            print("⚠️ Chromium disconnected, it will be relaunched on next render")
+            self._metrics["browser_crashes"] += 1
+
+    async def _ensure_browser(self):
+        """Relaunch the shared browser if it crashed or has served too many renders."""
+        async with self._lock:
+            healthy = self._browser is not None and self._browser.is_connected()
+            if healthy and self._browser_renders < self.max_browser_renders:
+                return
+            old = self._browser
+            await self._launch_browser()
+            # Old browser is closed once no slot uses it anymore
+            if old and not any(slot.browser is old for slot in self._slots):
+                await self._close_quietly(old)
+
+    # -------------------------
+    # Page slots
+    # -------------------------
+    def _needs_recycle(self, slot: _PageSlot) -> bool:
+        return (
+            slot.page is None
+            or slot.dirty
+            or slot.renders >= self.max_page_renders
+            or slot.browser is not self._browser
+            or not slot.browser.is_connected()
+            or slot.page.is_closed()
+        )
+
+    async def _prepare(self, slot: _PageSlot):
+        if self._browser_renders >= self.max_browser_renders or not self._browser.is_connected():
+            await self._ensure_browser()
+        if not self._needs_recycle(slot):
+            return
+
+        if slot.page is not None:
+            self._metrics["page_recycles"] += 1
+        old_browser = slot.browser
+        await self._close_slot(slot)
+        if old_browser and old_browser is not self._browser and not any(s.browser is old_browser for s in self._slots):
+            await self._close_quietly(old_browser)
+
+        slot.browser = self._browser
+        slot.context = await slot.browser.new_context(viewport=VIEWPORT, device_scale_factor=RENDER_SCALE)
+        # Fonts, stylesheets and images come from the render asset cache (page routes serve in-memory assets first)
+        await slot.context.route(_external_url, render_assets.handle)
+        slot.page = await slot.context.new_page()
+        slot.renders = 0
+        slot.dirty = False
+
+    async def _close_slot(self, slot: _PageSlot):
+        if slot.context is not None:
+            await self._close_quietly(slot.context)
+        slot.browser = None
+        slot.context = None
+        slot.page = None
+
+    @staticmethod
+    async def _close_quietly(target):
+        try:
+            await target.close()
+        except Exception:
+            pass
+
+    @asynccontextmanager
+    async def page(self):
+        """Borrow a healthy page for a single render."""
+        if not self.started:
+            await self.start()
+
+        start = time.perf_counter()
+        self._waiting += 1
+        try:
+            slot = await self._idle.get()
+        finally:
+            self._waiting -= 1
+        waited = time.perf_counter() - start
+        self._metrics["acquisitions"] += 1
+        self._metrics["wait_seconds_total"] += waited
+        self._metrics["wait_seconds_max"] = max(self._metrics["wait_seconds_max"], waited)
+
+        try:
+            await self._prepare(slot)
+            yield slot.page
+            slot.renders += 1
+            self._browser_renders += 1
+            self._metrics["renders"] += 1
+        except BaseException:
+            slot.dirty = True
+            self._metrics["failed_renders"] += 1
+            raise
+        finally:
+            # Pool may have been stopped while this render was running
+            if self.started and slot in self._slots:
+                self._idle.put_nowait(slot)
+
+    def stats(self) -> dict:
+        acquisitions = self._metrics["acquisitions"]
+        idle = self._idle.qsize() if self.started else 0
+        return {
+            "size": self.size,
+            "started": self.started,
+            "idle": idle,
+            "in_use": (self.size - idle) if self.started else 0,
+            "waiting": self._waiting,
+            "wait_seconds_avg": (self._metrics["wait_seconds_total"] / acquisitions) if acquisitions else 0.0,
+            **self._metrics,
+        }
+
+
+browser_pool = BrowserPool()
+
 
 class BrowserService:
     @staticmethod
-    async def render_html_to_image(html_content: str, output_path: str):
+    async def start():
+        """Launch the shared browser pool (called from the app lifespan)."""
+        await browser_pool.start()
+
+    @staticmethod
+    async def shutdown():
+        await browser_pool.stop()
+
+    @staticmethod
+    def stats() -> dict:
+        return browser_pool.stats()
+
+    @staticmethod
+    def asset_stats() -> dict:
+        return render_assets.stats()
+
+    @staticmethod
+    def asset_url(name: str) -> str:
+        """URL under which an in-memory asset is served to the page."""
+        return f"{ASSET_URL_PREFIX}{name}"
+
+    @staticmethod
+    async def render_html_to_image(html_content: str, assets: Dict[str, bytes] = None) -> bytes:
+        """Renders an HTML string and returns only the image bytes."""
+        return (await BrowserService.render(html_content, assets)).image
+
+    @staticmethod
+    async def render(html_content: str, assets: Dict[str, bytes] = None) -> RenderResult:
         """
-        Renders HTML string to a PNG image using Playwright.
+        Renders an HTML string using a pooled Playwright page.
+        Nothing touches the disk: the HTML is loaded with set_content and
+        `assets` (name -> bytes) are served through request interception.
+        External fonts, stylesheets and images go through the render asset
+        cache (raises OfflineAssetError in offline mode if one isn't cached).
+        The capture waits for fonts and images, and the result reports
+        whether the content overflowed the slide frame.
         """
-        # 1. Prepare Paths
-        abs_output_path = os.path.abspath(output_path)
-        temp_html_path = abs_output_path.replace(".png", ".html")
-        
-        # 2. Save HTML to disk
-        with open(temp_html_path, "w", encoding="utf-8") as f:
-            f.write(html_content)
-            
-        async with async_playwright() as p:
-            # 3. Launch Browser with CRITICAL Docker flags
-            browser = await p.chromium.launch(
-                args=[
-                    "--no-sandbox", 
-                    "--disable-setuid-sandbox", 
-                    "--disable-dev-shm-usage" # Prevents memory crash on Render
-                ]
-            )
-            page = await browser.new_page(viewport={"width": 1920, "height": 1080})
-            
-            # 4. Open File
-            await page.goto(f"file://{temp_html_path}")
-            
-            # 5. Take Screenshot
-            await page.screenshot(path=abs_output_path, full_page=True)
-            await browser.close()
-            
-        # Cleanup
-        if os.path.exists(temp_html_path):
-            os.remove(temp_html_path)
\ No newline at end of file
+        assets = assets or {}
+        if RENDER_FORMAT == "jpeg":
+            screenshot_options = {"type": "jpeg", "quality": RENDER_JPEG_QUALITY}
+        else:
+            screenshot_options = {"type": "png"}
+
+        async def serve_asset(route):
+            name = route.request.url[len(ASSET_URL_PREFIX):].split("?")[0]
+            data = assets.get(name)
+            if data is None:
+                print(f"   -- ⚠️ Asset {name} missing, serving a transparent placeholder")
+                await route.fulfill(status=200, content_type="image/png", body=PLACEHOLDER_PNG)
+                return
+            content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+            await route.fulfill(status=200, content_type=content_type, body=data)
+
+        with span("render", html_bytes=len(html_content), assets=len(assets)) as current:
+            async with scheduler.slot("browser"), browser_pool.page() as page:
+                await page.route(f"{ASSET_URL_PREFIX}**", serve_asset)
+                try:
+                    # 1. Load HTML from memory, then wait until it is ready to capture
+                    await page.set_content(html_content, wait_until="load")
+                    layout = await page.evaluate(READY_SCRIPT, RENDER_READY_TIMEOUT)
+                    blocked = render_assets.take_blocked(page)
+                    if blocked:
+                        raise OfflineAssetError(blocked)
+
+                    # 2. Take Screenshot (returned as bytes)
+                    if RENDER_MODE == "full_page":
+                        image_data = await page.screenshot(full_page=True, **screenshot_options)
+                    else:
+                        clip = {"x": 0, "y": 0, **VIEWPORT}
+                        image_data = await page.screenshot(clip=clip, **screenshot_options)
+
+                    result = RenderResult(
+                        image=image_data,
+                        format=screenshot_options["type"],
+                        content_width=layout["width"],
+                        content_height=layout["height"],
+                        ready_timed_out=layout["timedOut"],
+                    )
+                    current.set_attribute("render.bytes", len(image_data))
+                    current.set_attribute("render.overflow", result.overflow)
+                    if result.ready_timed_out:
+                        print(f"   -- ⚠️ Render readiness timed out after {RENDER_READY_TIMEOUT}ms, capturing anyway")
+                    return result
+                finally:
+                    render_assets.take_blocked(page)
+                    await page.unroute(f"{ASSET_URL_PREFIX}**", serve_asset)
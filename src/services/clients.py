@@ -0,0 +1,69 @@
+import asyncio
+import threading
+from src.config import settings
+
+
+class ClientRegistry:
+    """
+    One instance of each provider client per worker process, built on first
+    use so importing the app stays cheap (the SDKs are heavy to import).
+    The server builds them all up front in its lifespan (start()).
+    """
+
+    def __init__(self):
+        self._openai = None
+        self._gemini = None
+        self._cloudinary = None
+        self._lock = threading.Lock()
+
+    def openai(self):
+        """Shared AsyncOpenAI client (chat, structured output and images)."""
+        if self._openai is None:
+            with self._lock:
+                if self._openai is None:
+                    from openai import AsyncOpenAI
+                    # Retries, deadlines and circuit breaking are done by the resilience layer
+                    self._openai = AsyncOpenAI(api_key=settings.openai_api_key, max_retries=0)
+        return self._openai
+
+    def gemini(self):
+        """The configured google.generativeai module."""
+        if self._gemini is None:
+            with self._lock:
+                if self._gemini is None:
+                    import google.generativeai as genai
+                    genai.configure(api_key=settings.google_api_key)
+                    self._gemini = genai
+        return self._gemini
+
+    def cloudinary(self):
+        """The configured cloudinary module."""
+        if self._cloudinary is None:
+            with self._lock:
+                if self._cloudinary is None:
+                    import cloudinary
+                    import cloudinary.uploader
+                    cloudinary.config(**settings.cloudinary, secure=True)
+                    self._cloudinary = cloudinary
+        return self._cloudinary
+
+    async def start(self):
+        """Builds every client now (off the event loop: SDK imports block)."""
+        await asyncio.to_thread(self.openai)
+        await asyncio.to_thread(self.gemini)
+        await asyncio.to_thread(self.cloudinary)
+
+    async def close(self):
+        if self._openai is not None:
+            await self._openai.close()
+            self._openai = None
+
+    def stats(self) -> dict:
+        return {
+            "openai": self._openai is not None,
+            "gemini": self._gemini is not None,
+            "cloudinary": self._cloudinary is not None,
+        }
+
+
+clients = ClientRegistry()
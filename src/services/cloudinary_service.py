@@ -1,31 +1,28 @@
-import os
-import cloudinary
-import cloudinary.uploader
+from io import BytesIO
+from src.services.clients import clients
 
 class CloudinaryService:
     @staticmethod
     def init_config():
-        # Ensure config is loaded from environment variables
-        cloudinary.config(
-            cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
-            api_key=os.getenv("CLOUDINARY_API_KEY"),
-            api_secret=os.getenv("CLOUDINARY_API_SECRET"),
-            secure=True
-        )
+        # Configured once from the environment (see ClientRegistry)
+        return clients.cloudinary()
 
     @staticmethod
-    def upload_ppt(file_path: str, filename_without_ext: str) -> str:
+    def upload_ppt(data: bytes, filename_without_ext: str) -> str:
         """
-        Uploads a PPTX file to Cloudinary and returns the secure URL.
+        Uploads PPTX bytes to Cloudinary and returns the secure URL.
+        Blocking: call it from a worker thread (see StorageService).
         """
-        CloudinaryService.init_config()
+        cloudinary = CloudinaryService.init_config()
         
         print(f"☁️ Uploading {filename_without_ext} to Cloudinary...")
         
         try:
             # resource_type="raw" is CRITICAL for non-image files (PPTX, PDF, DOCX)
+            buffer = BytesIO(data)
+            buffer.name = f"{filename_without_ext}.pptx"
             response = cloudinary.uploader.upload(
-                file_path, 
+                buffer, 
                 resource_type="raw", 
                 public_id=f"presentations/{filename_without_ext}",
                 overwrite=True
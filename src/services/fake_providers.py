@@ -0,0 +1,243 @@
+import re
+import ast
+import html
+import random
+import asyncio
+from io import BytesIO
+from typing import AsyncIterator
+from PIL import Image
+from src.models.schemas import DeckJudgement, PresentationPlan, SlideChoice, SlidePlan
+from src.services.image_service import ImageService
+from src.services import resilience
+from src.services.llm_service import LLMService
+from src.services.native_pptx import NATIVE_LAYOUT_RULE
+from src.services.storage_service import MemoryStorage, StorageService
+
+
+class FakeProviderError(Exception):
+    """Injected failure raised by a FakeProvider (retryable, like a 503)."""
+    retryable = True
+
+
+class FakeProvider:
+    """
+    Offline stand-in for a remote API: each call sleeps for a sampled latency
+    and fails with probability `failure_rate`. Tracks how many calls were
+    in flight at once so saturation behaviour can be checked without a network.
+    """
+
+    def __init__(self, name: str, latency: float = 1.0, jitter: float = 0.25, failure_rate: float = 0.0, seed: int = None):
+        self.name = name
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+
+        self.calls = 0
+        self.failures = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def sample_latency(self) -> float:
+        return max(0.0, self._random.gauss(self.latency, self.latency * self.jitter))
+
+    async def call(self):
+        self.calls += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.sample_latency())
+            if self._random.random() < self.failure_rate:
+                self.failures += 1
+                raise FakeProviderError(f"{self.name}: injected failure")
+        finally:
+            self.in_flight -= 1
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "peak_in_flight": self.peak_in_flight,
+        }
+
+
+async def fake_token_stream(text: str, chunk_size: int = 16, delay: float = 0.0) -> AsyncIterator[str]:
+    """Replays `text` in small chunks, like a streaming LLM response."""
+    for start in range(0, len(text), chunk_size):
+        if delay:
+            await asyncio.sleep(delay)
+        yield text[start:start + chunk_size]
+
+
+def fake_plan(prompt: str, default_slides: int = 5) -> PresentationPlan:
+    """Deterministic plan; the slide count is read from 'N slides' in the prompt."""
+    match = re.search(r"(\d+)\s+slides", prompt)
+    count = int(match.group(1)) if match else default_slides
+    slide_types = ['title', 'agenda', 'content_text', 'content_image', 'content_data']
+    return PresentationPlan(
+        topic="Benchmark deck",
+        target_audience="Engineers",
+        visual_style="Dark minimalist",
+        color_palette_hex=["#0B0F19", "#1F2937", "#38BDF8", "#F9FAFB"],
+        font_pairing="Inter / Roboto",
+        slides=[
+            SlidePlan(
+                id=i + 1,
+                type=slide_types[i % len(slide_types)],
+                title=f"Slide {i + 1}: throughput under load",
+                content_points=[f"Point {j + 1} for slide {i + 1}" for j in range(3)],
+                image_action="generate" if i % 2 else "none",
+                image_prompt=f"Abstract data center visual #{i + 1}" if i % 2 else None,
+                layout_notes="Split screen, text left, visual right",
+            )
+            for i in range(count)
+        ],
+    )
+
+
+def fake_deck_judgement(prompt: str) -> DeckJudgement:
+    """Picks variant 0 for every slide listed in a deck-level judge prompt."""
+    slide_ids = [int(i) for i in re.findall(r"=== SLIDE (\d+):", prompt)]
+    return DeckJudgement(choices=[SlideChoice(slide_id=i, variant=0) for i in slide_ids])
+
+
+def fake_slide_html(prompt: str, system_prompt: str = "") -> str:
+    """
+    Deterministic slide markup built from the designer prompt. Layout
+    template prompts get the $title / $points (/ $image_url) placeholders.
+    Under the native layout rule the slide is the title and the plan's
+    points on a plain block layout (no flex), as the PPTX translator wants.
+    """
+    template = "layout TEMPLATE" in prompt
+    if template:
+        title = "$title"
+        image = "$image_url" if "$image_url" in prompt else None
+    else:
+        match = re.search(r"Title: (.*)", prompt)
+        title = match.group(1) if match else "Slide"
+        match = re.search(r'(https?://[^\s"\')]+)', prompt)
+        image = match.group(1) if match else None
+    points = "$points" if template else "<li>Point one</li><li>Point two</li><li>Point three</li>"
+    background = f"background-image: url('{image}'); background-size: cover;" if image else ""
+    if NATIVE_LAYOUT_RULE in system_prompt:
+        if not template:
+            title = html.escape(title)
+            match = re.search(r"Points: (\[.*\])", prompt)
+            if match:
+                points = "".join(f"<li>{html.escape(point)}</li>" for point in ast.literal_eval(match.group(1)))
+        return f"""<!DOCTYPE html>
+<html><head><style>
+body {{ margin: 0; width: 1920px; height: 1080px; font-family: Inter, sans-serif; background: #0B0F19; color: #F9FAFB; }}
+.slide {{ box-sizing: border-box; height: 100%; padding: 120px; {background} }}
+h1 {{ font-size: 72px; color: #38BDF8; }}
+</style></head>
+<body><div class="slide"><h1>{title}</h1>
+<ul>{points}</ul></div></body></html>"""
+    return f"""<!DOCTYPE html>
+<html><head><style>
+body {{ margin: 0; width: 1920px; height: 1080px; font-family: Inter, sans-serif; background: #0B0F19; color: #F9FAFB; }}
+.slide {{ display: flex; height: 100%; {background} }}
+.text {{ padding: 120px; width: 50%; }}
+h1 {{ font-size: 72px; color: #38BDF8; }}
+</style></head>
+<body><div class="slide"><div class="text"><h1>{title}</h1>
+<ul>{points}</ul></div></div></body></html>"""
+
+
+def fake_png(seed: int = 0, size=(1024, 1024)) -> bytes:
+    color = ((seed * 53) % 256, (seed * 97) % 256, (seed * 193) % 256)
+    buffer = BytesIO()
+    Image.new("RGB", size, color).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+class FakeStorage(MemoryStorage):
+    """MemoryStorage with upload latency/failures drawn from a FakeProvider."""
+    name = "fake"
+
+    def __init__(self, provider: FakeProvider):
+        super().__init__()
+        self.provider = provider
+
+    async def upload_ppt(self, data: bytes, filename_without_ext: str) -> str:
+        await self.provider.call()
+        return await super().upload_ppt(data, filename_without_ext)
+
+
+class FakeBackends:
+    """
+    Swaps LLMService, ImageService and the storage backend for local fakes
+    with configurable latency and failure rates. Calls still go through the
+    global scheduler and the resilience layer (retries, breakers), and
+    rendering / PPTX assembly stay real.
+
+        fakes = FakeBackends(failure_rate=0.05)
+        fakes.install()
+        ...
+        fakes.uninstall()
+    """
+
+    def __init__(self, chat_latency: float = 1.5, code_latency: float = 6.0, image_latency: float = 8.0,
+                 upload_latency: float = 0.5, jitter: float = 0.25, failure_rate: float = 0.0, seed: int = 7):
+        self.providers = {
+            "openai_chat": FakeProvider("openai_chat", chat_latency, jitter, failure_rate, seed),
+            "gemini": FakeProvider("gemini", code_latency, jitter, failure_rate, seed + 1),
+            "openai_images": FakeProvider("openai_images", image_latency, jitter, failure_rate, seed + 2),
+            "storage": FakeProvider("storage", upload_latency, jitter, failure_rate, seed + 3),
+        }
+        self.storage = FakeStorage(self.providers["storage"])
+        self._originals = None
+        self._image_seed = 0
+
+    async def _call(self, resource: str):
+        """One fake provider round trip; raises ProviderError like the real services."""
+        await resilience.call(resource, self.providers[resource].call, breaker_name=f"fake:{resource}", slot=resource)
+
+    # Same contracts as the real services (ProviderError on provider errors)
+    async def generate_json(self, prompt: str, system_prompt: str, response_model):
+        await self._call("openai_chat")
+        if response_model is DeckJudgement:
+            return fake_deck_judgement(prompt)
+        return fake_plan(prompt)
+
+    async def stream_json(self, prompt: str, system_prompt: str, response_model):
+        await self._call("openai_chat")
+        async for chunk in fake_token_stream(fake_plan(prompt).model_dump_json(), chunk_size=64):
+            yield chunk
+
+    async def generate_code(self, prompt: str, system_prompt: str) -> str:
+        await self._call("gemini")
+        return fake_slide_html(prompt, system_prompt)
+
+    async def generate_text(self, prompt: str, system_prompt: str) -> str:
+        await self._call("openai_chat")
+        return "0"
+
+    async def generate_image(self, prompt: str):
+        await self._call("openai_images")
+        self._image_seed += 1
+        return await asyncio.to_thread(fake_png, self._image_seed)
+
+    def install(self):
+        if self._originals is not None:
+            return
+        self._originals = {
+            (LLMService, name): LLMService.__dict__[name]
+            for name in ("generate_json", "stream_json", "generate_code", "generate_text")
+        }
+        self._originals[(ImageService, "generate_image")] = ImageService.__dict__["generate_image"]
+        for (cls, name) in self._originals:
+            setattr(cls, name, getattr(self, name))
+        self._previous_storage = StorageService._backend
+        StorageService.set_backend(self.storage)
+
+    def uninstall(self):
+        if self._originals is None:
+            return
+        for (cls, name), original in self._originals.items():
+            setattr(cls, name, original)
+        StorageService.set_backend(self._previous_storage)
+        self._originals = None
+
+    def stats(self) -> dict:
+        return {name: provider.stats() for name, provider in self.providers.items()}
@@ -1,33 +1,111 @@
 import os
 import base64
-from openai import AsyncOpenAI
-from dotenv import load_dotenv
+import asyncio
+import hashlib
+from typing import List, Optional
+from src.services import resilience
+from src.services.clients import clients
+from src.services.resilience import ProviderError
+from src.utils.disk_cache import DiskCache
+from src.utils.telemetry import span
 
-load_dotenv()
-client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+IMAGE_SIZE = "1024x1024"
+
+# Persistent cache of generated images, shared across decks (IMAGE_CACHE_DIR="" disables it)
+image_cache = DiskCache(
+    directory=os.getenv("IMAGE_CACHE_DIR", "cache/images"),
+    max_bytes=int(os.getenv("IMAGE_CACHE_MAX_BYTES", str(512 * 1024 * 1024))),
+    suffix=".png",
+)
 
 class ImageService:
     @staticmethod
-    async def generate_and_save_image(prompt: str, save_path: str):
-        try:
-            print(f"   -- 🎨 Generating High-Grade Image via gpt-image-1: {save_path}...")
+    def cache_key(prompt: str, size: str = IMAGE_SIZE) -> str:
+        """
+        Normalizes the prompt (case, whitespace, trailing punctuation) so
+        near-identical prompts share one cached image.
+        """
+        normalized = " ".join(prompt.lower().split()).strip(" .,;:!")
+        return hashlib.sha256(f"{size}|{normalized}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def cache_stats() -> dict:
+        return image_cache.stats()
+
+    @staticmethod
+    async def cached_image_path(prompt: str, size: str = IMAGE_SIZE) -> Optional[str]:
+        """Path of the cached image for this prompt, or None (no network call)."""
+        key = ImageService.cache_key(prompt, size)
+        if await asyncio.to_thread(image_cache.contains, key):
+            return image_cache.path_for(key)
+        return None
+
+    @staticmethod
+    async def generate_image(prompt: str) -> bytes:
+        """
+        Generates an image and returns the PNG bytes (raises ProviderError on failure).
+        Served from the image cache when the same prompt was seen before.
+        """
+        with span("image.generate", model="gpt-image-1") as current:
+            key = ImageService.cache_key(prompt)
+            cached = await asyncio.to_thread(image_cache.get, key)
+            current.set_attribute("image.cache_hit", cached is not None)
+            if cached is not None:
+                print(f"   -- ♻️ Image cache hit, skipping gpt-image-1.")
+                return cached
+
+            print(f"   -- 🎨 Generating High-Grade Image via gpt-image-1...")
 
             # GPT-Image-1
-            response = await client.images.generate(
-                model="gpt-image-1",
-                prompt=f"Professional VC pitch deck visual, hyper-realistic, dark mode: {prompt}",
-                size="1024x1024",
-                n=1
-            )
+            async def request():
+                return await clients.openai().images.generate(
+                    model="gpt-image-1",
+                    prompt=f"Professional VC pitch deck visual, hyper-realistic, dark mode: {prompt}",
+                    size=IMAGE_SIZE,
+                    n=1
+                )
+
+            try:
+                response = await resilience.call("openai_images", request, slot="openai_images")
+            except ProviderError as e:
+                print(f"   -- ❌ Image Error: {e}")
+                current.set_attribute("image.error", str(e))
+                raise
 
             # Decode Base64 image data
             image_data = base64.b64decode(response.data[0].b64_json)
-            with open(save_path, 'wb') as f:
-                f.write(image_data)
 
-            print(f"   -- ✅ GPT-Image-1 saved successfully.")
-            return True
+            print(f"   -- ✅ GPT-Image-1 generated successfully.")
+
+            current.set_attribute("image.bytes", len(image_data))
+            try:
+                await asyncio.to_thread(image_cache.put, key, image_data)
+            except OSError as e:
+                print(f"   -- ⚠️ Image cache write failed: {e}")
+            return image_data
+
+    @staticmethod
+    async def prewarm(prompts: List[str], concurrency: int = 2) -> dict:
+        """
+        Generates and caches images for common prompts ahead of time.
+        Prompts that are already cached are skipped.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        summary = {"cached": 0, "generated": 0, "failed": 0}
+
+        async def warm(prompt: str):
+            if await asyncio.to_thread(image_cache.contains, ImageService.cache_key(prompt)):
+                summary["cached"] += 1
+                return
+            async with semaphore:
+                try:
+                    await ImageService.generate_image(prompt)
+                    summary["generated"] += 1
+                except ProviderError:
+                    summary["failed"] += 1
 
-        except Exception as e:
-            print(f"   -- ❌ Image Error: {e}")
-            return False
+        # Dedupe on the normalized key so near-identical prompts are generated once
+        unique = {ImageService.cache_key(p): p for p in prompts}
+        await asyncio.gather(*(warm(p) for p in unique.values()))
+        print(f"🔥 Image cache prewarm: {summary}")
+        return summary
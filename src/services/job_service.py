@@ -0,0 +1,230 @@
+import os
+import time
+import uuid
+import asyncio
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+from src.models.schemas import Job, JobEvent
+
+TERMINAL_STATUSES = ("succeeded", "failed")
+
+# Progress events that don't change the job phase
+PROGRESS_EVENTS = ("slide_planned", "slide_done", "slide_overflow")
+
+
+class JobQueueFull(Exception):
+    """Raised when the job queue is at capacity (maps to HTTP 429)."""
+
+
+class JobStore:
+    """
+    Storage for job state and event logs. The in-memory store is the default;
+    a shared backend (Redis, a database...) can implement the same methods.
+    """
+
+    async def create(self, job: Job):
+        raise NotImplementedError
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        raise NotImplementedError
+
+    async def update(self, job: Job):
+        raise NotImplementedError
+
+    async def append_event(self, job_id: str, phase: str, data: Dict[str, Any]) -> JobEvent:
+        raise NotImplementedError
+
+    async def wait_for_events(self, job_id: str, since: int, timeout: float) -> List[JobEvent]:
+        """Events with seq >= `since`, waiting up to `timeout` seconds for new ones."""
+        raise NotImplementedError
+
+
+class InMemoryJobStore(JobStore):
+    """Per-worker store. Keeps the last `max_jobs` jobs."""
+
+    def __init__(self, max_jobs: int = None):
+        self.max_jobs = max_jobs or int(os.getenv("JOB_HISTORY_SIZE", "1000"))
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._events: Dict[str, List[JobEvent]] = {}
+        self._waiters: Dict[str, asyncio.Event] = {}
+
+    async def create(self, job: Job):
+        self._jobs[job.id] = job
+        self._events[job.id] = []
+        self._evict()
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    async def update(self, job: Job):
+        self._jobs[job.id] = job
+
+    async def append_event(self, job_id: str, phase: str, data: Dict[str, Any]) -> JobEvent:
+        events = self._events.setdefault(job_id, [])
+        event = JobEvent(seq=len(events), phase=phase, data=data, at=time.time())
+        events.append(event)
+        waiter = self._waiters.pop(job_id, None)
+        if waiter:
+            waiter.set()
+        return event
+
+    async def wait_for_events(self, job_id: str, since: int, timeout: float) -> List[JobEvent]:
+        events = self._events.get(job_id, [])
+        if len(events) <= since:
+            waiter = self._waiters.setdefault(job_id, asyncio.Event())
+            try:
+                await asyncio.wait_for(waiter.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            events = self._events.get(job_id, [])
+        return events[since:]
+
+    def _evict(self):
+        # Drop the oldest finished jobs first
+        while len(self._jobs) > self.max_jobs:
+            victim = next((j for j in self._jobs.values() if j.status in TERMINAL_STATUSES), None)
+            if victim is None:
+                break
+            del self._jobs[victim.id]
+            self._events.pop(victim.id, None)
+            self._waiters.pop(victim.id, None)
+
+
+# runner(payload, progress) -> result dict
+# progress(phase, data) is awaited by the runner to report progress.
+ProgressCallback = Callable[[str, Dict[str, Any]], Awaitable[None]]
+JobRunner = Callable[[Any, ProgressCallback], Awaitable[Dict[str, Any]]]
+
+
+class JobManager:
+    """
+    Bounded job queue drained by a fixed number of workers.
+
+    - submit() returns immediately with a queued Job (or raises JobQueueFull).
+    - Workers run `runner` and record phase changes, per-phase timings and
+      progress events in the store, which the events stream replays.
+    """
+
+    def __init__(self, runner: JobRunner, store: JobStore = None, workers: int = None, queue_size: int = None):
+        self.runner = runner
+        self.store = store or InMemoryJobStore()
+        self.workers = workers or int(os.getenv("JOB_WORKERS", "2"))
+        self.queue_size = queue_size or int(os.getenv("JOB_QUEUE_SIZE", "20"))
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._running = 0
+
+    async def start(self):
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        print(f"📬 Job manager started ({self.workers} workers, queue size {self.queue_size})")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, payload: Any) -> Job:
+        if self._queue is None:
+            await self.start()
+        if self._queue.full():
+            raise JobQueueFull(f"Job queue is full ({self.queue_size} pending)")
+
+        job = Job(id=uuid.uuid4().hex, created_at=time.time())
+        await self.store.create(job)
+        await self.store.append_event(job.id, "queued", {})
+        self._queue.put_nowait((job.id, payload))
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        return await self.store.get(job_id)
+
+    async def stream_events(self, job_id: str, heartbeat: float = 15.0) -> AsyncIterator[Optional[JobEvent]]:
+        """
+        Yields every event of a job (replaying past ones first) until it finishes.
+        Yields None when nothing happened for `heartbeat` seconds.
+        """
+        since = 0
+        while True:
+            events = await self.store.wait_for_events(job_id, since, heartbeat)
+            if not events:
+                job = await self.store.get(job_id)
+                if job is None or job.status in TERMINAL_STATUSES:
+                    return
+                yield None
+                continue
+            for event in events:
+                yield event
+                if event.phase in TERMINAL_STATUSES:
+                    return
+            since = events[-1].seq + 1
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "running": self._running,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "queue_size": self.queue_size,
+        }
+
+    async def _worker(self, worker_id: int):
+        while True:
+            job_id, payload = await self._queue.get()
+            self._running += 1
+            try:
+                await self._run(job_id, payload)
+            except Exception as e:
+                print(f"❌ Job worker {worker_id} crashed on {job_id}: {e}")
+            finally:
+                self._running -= 1
+                self._queue.task_done()
+
+    async def _run(self, job_id: str, payload: Any):
+        job = await self.store.get(job_id)
+        if job is None:
+            return
+        now = time.time()
+        job.status = "running"
+        job.phase = "starting"
+        job.started_at = now
+        job.timings["queued"] = now - job.created_at
+        await self.store.update(job)
+
+        phase_started = now
+
+        async def progress(phase: str, data: Dict[str, Any] = None):
+            nonlocal phase_started
+            data = data or {}
+            now = time.time()
+            if phase in PROGRESS_EVENTS:
+                if phase == "slide_planned":
+                    job.slides_total += 1
+                elif phase == "slide_done":
+                    job.slides_done += 1
+            else:
+                job.timings[job.phase] = job.timings.get(job.phase, 0.0) + (now - phase_started)
+                job.phase = phase
+                phase_started = now
+                if "slides_total" in data:
+                    job.slides_total = data["slides_total"]
+            await self.store.update(job)
+            await self.store.append_event(job.id, phase, data)
+
+        try:
+            job.result = await self.runner(payload, progress)
+            job.status = "succeeded"
+        except Exception as e:
+            print(f"❌ Job {job.id} failed: {e}")
+            job.status = "failed"
+            job.error = str(e)
+
+        now = time.time()
+        job.timings[job.phase] = job.timings.get(job.phase, 0.0) + (now - phase_started)
+        job.phase = job.status
+        job.finished_at = now
+        job.timings["total"] = now - job.created_at
+        await self.store.update(job)
+        await self.store.append_event(job.id, job.status, {"result": job.result, "error": job.error, "timings": job.timings})
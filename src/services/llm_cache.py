@@ -0,0 +1,179 @@
+import os
+import json
+import time
+import sqlite3
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+
+class LLMCache:
+    """
+    Content-addressed cache for LLM responses.
+
+    - Key: sha256 of (model, system prompt, prompt, response schema).
+    - Tier 1: bounded in-process LRU (LLM_CACHE_SIZE entries, 0 disables it).
+    - Tier 2: optional SQLite file (LLM_CACHE_PATH) shared by workers,
+      with TTL (LLM_CACHE_TTL seconds) and size-based LRU eviction
+      (LLM_CACHE_MAX_BYTES).
+    """
+
+    def __init__(self, max_entries: int = None, db_path: str = None, ttl_seconds: float = None, max_db_bytes: int = None):
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv("LLM_CACHE_SIZE", "512"))
+        self.db_path = db_path if db_path is not None else os.getenv("LLM_CACHE_PATH", "")
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+        self.max_db_bytes = max_db_bytes if max_db_bytes is not None else int(os.getenv("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+        self._memory = OrderedDict()  # key -> (value, expires_at)
+        self._db = None
+        self._db_lock = threading.Lock()
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "evictions": 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 or bool(self.db_path)
+
+    @staticmethod
+    def make_key(model: str, system_prompt: str, prompt: str, schema: dict = None) -> str:
+        payload = json.dumps(
+            {"model": model, "system": system_prompt, "prompt": prompt, "schema": schema},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    # -------------------------
+    # Public API
+    # -------------------------
+    async def get(self, key: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+
+        value = self._memory_get(key)
+        if value is not None:
+            self._stats["memory_hits"] += 1
+            return value
+
+        if self.db_path:
+            try:
+                value = await asyncio.to_thread(self._db_get, key)
+            except sqlite3.Error as e:
+                print(f"⚠️ LLM cache read failed: {e}")
+                value = None
+            if value is not None:
+                self._stats["disk_hits"] += 1
+                self._memory_set(key, value)
+                return value
+
+        self._stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, value: str):
+        if not self.enabled or not value:
+            return
+        self._stats["writes"] += 1
+        self._memory_set(key, value)
+        if self.db_path:
+            try:
+                await asyncio.to_thread(self._db_set, key, value)
+            except sqlite3.Error as e:
+                print(f"⚠️ LLM cache write failed: {e}")
+
+    def stats(self) -> dict:
+        hits = self._stats["memory_hits"] + self._stats["disk_hits"]
+        lookups = hits + self._stats["misses"]
+        return {
+            "enabled": self.enabled,
+            "memory_entries": len(self._memory),
+            "memory_capacity": self.max_entries,
+            "disk_path": self.db_path or None,
+            "hits": hits,
+            "hit_rate": (hits / lookups) if lookups else 0.0,
+            **self._stats,
+        }
+
+    # -------------------------
+    # Tier 1: in-process LRU
+    # -------------------------
+    def _memory_get(self, key: str) -> Optional[str]:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at < time.time():
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return value
+
+    def _memory_set(self, key: str, value: str):
+        if self.max_entries <= 0:
+            return
+        self._memory[key] = (value, time.time() + self.ttl_seconds)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    # -------------------------
+    # Tier 2: SQLite (runs in a worker thread)
+    # -------------------------
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL,"
+                " created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache (accessed_at)")
+            self._db.commit()
+        return self._db
+
+    def _db_get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._db_lock:
+            db = self._connect()
+            row = db.execute("SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if created_at + self.ttl_seconds < now:
+                db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                db.commit()
+                return None
+            db.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            db.commit()
+            return value
+
+    def _db_set(self, key: str, value: str):
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._db_lock:
+            db = self._connect()
+            db.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            # TTL, then size-based eviction (least recently used first)
+            expired = db.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,)).rowcount
+            self._stats["evictions"] += max(expired, 0)
+            total = db.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+            while total > self.max_db_bytes:
+                row = db.execute("SELECT key, size FROM llm_cache ORDER BY accessed_at ASC LIMIT 1").fetchone()
+                if row is None:
+                    break
+                db.execute("DELETE FROM llm_cache WHERE key = ?", (row[0],))
+                total -= row[1]
+                self._stats["evictions"] += 1
+            db.commit()
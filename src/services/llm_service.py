@@ -1,24 +1,62 @@
 import os
+import time
 import asyncio
-from dotenv import load_dotenv
-from openai import AsyncOpenAI
-import google.generativeai as genai
-
-load_dotenv()
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator
+from src.services import resilience
+from src.services.clients import clients
+from src.services.llm_cache import LLMCache
+from src.services.resilience import ProviderError
+from src.services.scheduler import scheduler
+from src.utils.telemetry import record_tokens, span
 
 # =========================
-# OpenAI (ASYNC – stable)
+# OpenAI (ASYNC – stable) and Gemini clients live in the client registry
 # =========================
-openai_client = AsyncOpenAI(
-    api_key=os.getenv("OPENAI_API_KEY")
+
+# "async": generate_content_async over the SDK's shared async transport (pooled connections)
+# "thread": sync SDK on a dedicated bounded executor, never the default one
+GEMINI_TRANSPORT = os.getenv("GEMINI_TRANSPORT", "async")
+gemini_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("GEMINI_EXECUTOR_WORKERS", "8")),
+    thread_name_prefix="gemini",
 )
 
+# GenerativeModel objects keyed by (model, system prompt); the designer reuses one system prompt
+_gemini_models = OrderedDict()
+GEMINI_MODEL_CACHE_SIZE = 32
+
+
+class _Backlog:
+    """Work submitted to gemini_executor that no thread has started yet (thread-safe)."""
+
+    def __init__(self):
+        self.pending = 0
+        self._lock = threading.Lock()
+
+    def add(self, delta: int):
+        with self._lock:
+            self.pending += delta
+
+    def forget_if_cancelled(self, future):
+        # Cancelled while still queued: the call never ran, so it never left the backlog
+        if future.cancelled():
+            self.add(-1)
+
+
+gemini_backlog = _Backlog()
+
+# model -> counters. Per attempt: queue = from submitting the attempt to the call starting
+# (waiting for an executor thread; scheduler slot waits are in the scheduler stats),
+# model = time inside the API call. Retries and backoff sleeps are in neither.
+gemini_metrics = {}
+
 # =========================
-# Gemini (SYNC – REQUIRED)
+# Response cache (shared by all agents)
 # =========================
-genai.configure(
-    api_key=os.getenv("GOOGLE_API_KEY")
-)
+llm_cache = LLMCache()
 
 
 class LLMService:
@@ -26,97 +64,265 @@ class LLMService:
     LLM Routing Layer
 
     - JSON / Judging → GPT-4o (Async)
-    - Creative Code / CSS → Gemini 3 Pro Preview (Sync)
+    - Creative Code / CSS → Gemini 3 Pro Preview (Async)
     - Fallback → GPT-4o
+
+    Every call goes through a content-addressed cache first (see LLMCache),
+    then through the resilience layer: a slot of its provider in the global
+    scheduler, a deadline, retries with backoff and a circuit breaker.
+    Failures raise ProviderError; nothing returns None / "" on error.
     """
 
+    @staticmethod
+    def cache_stats() -> dict:
+        return llm_cache.stats()
+
+    @staticmethod
+    def gemini_stats() -> dict:
+        stats = {"transport": GEMINI_TRANSPORT, "models": {}}
+        for model_name, m in gemini_metrics.items():
+            attempts = m["attempts"] or 1
+            stats["models"][model_name] = {
+                **m,
+                "queue_seconds_avg": m["queue_seconds_total"] / attempts,
+                "model_seconds_avg": m["model_seconds_total"] / attempts,
+            }
+        if GEMINI_TRANSPORT == "thread":
+            stats["executor_backlog"] = gemini_backlog.pending
+        return stats
+
     # -------------------------
     # JSON (Structured Output)
     # -------------------------
     @staticmethod
     async def generate_json(prompt: str, system_prompt: str, response_model):
-        try:
-            completion = await openai_client.beta.chat.completions.parse(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": prompt},
-                ],
-                response_format=response_model,
-            )
-            return completion.choices[0].message.parsed
+        with span("llm.generate_json", model="gpt-4o") as current:
+            key = LLMCache.make_key("gpt-4o", system_prompt, prompt, response_model.model_json_schema())
+            cached = await llm_cache.get(key)
+            current.set_attribute("llm.cache_hit", cached is not None)
+            if cached is not None:
+                return response_model.model_validate_json(cached)
 
-        except Exception as e:
-            print(f"❌ Error in JSON generation: {e}")
-            return None
+            async def request():
+                return await clients.openai().beta.chat.completions.parse(
+                    model="gpt-4o",
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": prompt},
+                    ],
+                    response_format=response_model,
+                )
+
+            try:
+                completion = await resilience.call("openai_chat", request, slot="openai_chat")
+            except ProviderError as e:
+                print(f"❌ Error in JSON generation: {e}")
+                raise
+            LLMService._record_openai_usage(completion, current)
+            parsed = completion.choices[0].message.parsed
+            if parsed is None:
+                raise ProviderError("gpt-4o returned no structured output (refusal)", "openai_chat")
+            await llm_cache.set(key, parsed.model_dump_json())
+            return parsed
+
+    @staticmethod
+    async def stream_json(prompt: str, system_prompt: str, response_model) -> AsyncIterator[str]:
+        """
+        Same request as generate_json, but yields the raw JSON text as it streams in.
+        Shares generate_json's cache entry (a hit is yielded in one chunk).
+        """
+        key = LLMCache.make_key("gpt-4o", system_prompt, prompt, response_model.model_json_schema())
+        cached = await llm_cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+        parts = []
+        first_token_at = None
+        started_at = time.perf_counter()
+        with span("llm.stream_json", model="gpt-4o") as current:
+            # No retries once tokens are flowing; the SDK timeout bounds each read
+            async with resilience.guarded("openai_chat") as policy, scheduler.slot("openai_chat"):
+                async with clients.openai().beta.chat.completions.stream(
+                    model="gpt-4o",
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": prompt},
+                    ],
+                    response_format=response_model,
+                    timeout=policy.timeout,
+                ) as stream:
+                    async for event in stream:
+                        if event.type == "content.delta":
+                            if first_token_at is None:
+                                first_token_at = time.perf_counter()
+                                current.set_attribute("llm.time_to_first_token", first_token_at - started_at)
+                            parts.append(event.delta)
+                            yield event.delta
+
+        # Only cache complete, schema-valid answers
+        text = "".join(parts)
+        response_model.model_validate_json(text)
+        await llm_cache.set(key, text)
 
     # -------------------------
     # Code / Design Generation
     # -------------------------
     @staticmethod
     async def generate_code(prompt: str, system_prompt: str) -> str:
+        with span("llm.generate_code", model="gemini-3-pro-preview") as current:
+            # Keyed on the head of the fallback chain: whichever model answered,
+            # the same request gets the same cached design back.
+            key = LLMCache.make_key("gemini-3-pro-preview", system_prompt, prompt)
+            cached = await llm_cache.get(key)
+            current.set_attribute("llm.cache_hit", cached is not None)
+            if cached is not None:
+                return cached
+
+            code = await LLMService._generate_code_uncached(prompt, system_prompt, current)
+            await llm_cache.set(key, code)
+            return code
+
+    @staticmethod
+    async def _generate_code_uncached(prompt: str, system_prompt: str, current) -> str:
         """
-        Gemini is SYNC.
-        We run it inside a thread so FastAPI stays async-safe.
+        Fallback chain: Gemini 3 Pro → Gemini Flash → GPT-4o.
+        Each model has its own circuit breaker, so while Pro is failing calls
+        go straight to Flash instead of waiting for Pro to fail again.
+        `current` is the caller's span; it gets the model used and the fallback hops.
         """
 
-        loop = asyncio.get_running_loop()
-
         # ---- Gemini 3 Pro Preview (highest quality) ----
         try:
-            return await loop.run_in_executor(
-                None,
-                LLMService._gemini_generate,
-                "gemini-3-pro-preview",
-                prompt,
-                system_prompt,
-            )
+            code = await LLMService._run_gemini("gemini-3-pro-preview", prompt, system_prompt)
+            current.set_attribute("llm.model_used", "gemini-3-pro-preview")
+            current.set_attribute("llm.fallback_hops", 0)
+            return code
 
         except Exception as e:
             print(f"⚠️ Gemini 3 Pro Preview failed: {e}. Trying Gemini Flash...")
 
             # ---- Gemini Flash ----
             try:
-                return await loop.run_in_executor(
-                    None,
-                    LLMService._gemini_generate,
-                    "gemini-2.5-flash",
-                    prompt,
-                    system_prompt,
-                )
+                code = await LLMService._run_gemini("gemini-2.5-flash", prompt, system_prompt)
+                current.set_attribute("llm.model_used", "gemini-2.5-flash")
+                current.set_attribute("llm.fallback_hops", 1)
+                return code
 
             except Exception as e2:
                 print(f"⚠️ Gemini Flash failed: {e2}. Falling back to GPT-4o...")
+                current.set_attribute("llm.model_used", "gpt-4o")
+                current.set_attribute("llm.fallback_hops", 2)
                 return await LLMService.generate_text(prompt, system_prompt)
 
+    @staticmethod
+    async def _run_gemini(model_name: str, prompt: str, system_prompt: str) -> str:
+        metrics = gemini_metrics.setdefault(model_name, {
+            "calls": 0, "attempts": 0, "errors": 0, "queue_seconds_total": 0.0, "model_seconds_total": 0.0,
+        })
+        queue_seconds = 0.0
+
+        with span("llm.gemini", model=model_name) as current:
+            model = LLMService._gemini_model(model_name, system_prompt)
+
+            async def request():
+                # One attempt: timed from its own submission, not from the first attempt
+                nonlocal queue_seconds
+                submitted_at = time.perf_counter()
+                started_at = None
+                try:
+                    if GEMINI_TRANSPORT == "thread":
+                        def call():
+                            nonlocal started_at
+                            started_at = time.perf_counter()
+                            gemini_backlog.add(-1)
+                            return model.generate_content(prompt)
+
+                        gemini_backlog.add(1)
+                        future = gemini_executor.submit(call)
+                        future.add_done_callback(gemini_backlog.forget_if_cancelled)
+                        return await asyncio.wrap_future(future)
+                    started_at = submitted_at
+                    return await model.generate_content_async(prompt)
+                finally:
+                    finished_at = time.perf_counter()
+                    started_at = started_at or finished_at
+                    metrics["attempts"] += 1
+                    metrics["queue_seconds_total"] += started_at - submitted_at
+                    metrics["model_seconds_total"] += finished_at - started_at
+                    queue_seconds += started_at - submitted_at
+
+            try:
+                response = await resilience.call("gemini", request, breaker_name=f"gemini:{model_name}", slot="gemini")
+
+                usage = getattr(response, "usage_metadata", None)
+                if usage is not None:
+                    record_tokens(model_name, usage.prompt_token_count, usage.candidates_token_count, current)
+                return response.text
+
+            except Exception:
+                metrics["errors"] += 1
+                raise
+
+            finally:
+                metrics["calls"] += 1
+                current.set_attribute("llm.queue_seconds", queue_seconds)
+
     # -------------------------
-    # Gemini (SYNC CORE)
+    # Gemini model objects
     # -------------------------
     @staticmethod
-    def _gemini_generate(model_name: str, prompt: str, system_prompt: str) -> str:
-        model = genai.GenerativeModel(
-            model_name=model_name,
-            system_instruction=system_prompt,
-        )
-        response = model.generate_content(prompt)
-        return response.text
+    def _gemini_model(model_name: str, system_prompt: str):
+        key = (model_name, system_prompt)
+        model = _gemini_models.get(key)
+        if model is None:
+            model = clients.gemini().GenerativeModel(
+                model_name=model_name,
+                system_instruction=system_prompt,
+            )
+            _gemini_models[key] = model
+            while len(_gemini_models) > GEMINI_MODEL_CACHE_SIZE:
+                _gemini_models.popitem(last=False)
+        else:
+            _gemini_models.move_to_end(key)
+        return model
 
     # -------------------------
     # Plain Text (OpenAI)
     # -------------------------
     @staticmethod
     async def generate_text(prompt: str, system_prompt: str) -> str:
-        try:
-            completion = await openai_client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": prompt},
-                ]
-            )
-            return completion.choices[0].message.content
+        with span("llm.generate_text", model="gpt-4o") as current:
+            key = LLMCache.make_key("gpt-4o", system_prompt, prompt)
+            cached = await llm_cache.get(key)
+            current.set_attribute("llm.cache_hit", cached is not None)
+            if cached is not None:
+                return cached
 
-        except Exception as e:
-            print(f"❌ Error in OpenAI text generation: {e}")
-            return ""
+            async def request():
+                return await clients.openai().chat.completions.create(
+                    model="gpt-4o",
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": prompt},
+                    ]
+                )
+
+            try:
+                completion = await resilience.call("openai_chat", request, slot="openai_chat")
+            except ProviderError as e:
+                print(f"❌ Error in OpenAI text generation: {e}")
+                raise
+            LLMService._record_openai_usage(completion, current)
+            content = completion.choices[0].message.content
+            if not content:
+                raise ProviderError("gpt-4o returned an empty answer", "openai_chat")
+            await llm_cache.set(key, content)
+            return content
+
+    @staticmethod
+    def _record_openai_usage(completion, current):
+        usage = getattr(completion, "usage", None)
+        if usage is not None:
+            record_tokens("gpt-4o", usage.prompt_tokens, usage.completion_tokens, current)
 #works #brilliant
@@ -0,0 +1,95 @@
+import os
+import re
+import json
+import asyncio
+import hashlib
+from typing import Optional
+from src.models.schemas import DeckManifest, PresentationPlan, SlidePlan
+from src.utils.disk_cache import DiskCache
+
+# Deck-level fields every slide's design depends on
+DESIGN_FIELDS = ("visual_style", "color_palette_hex", "font_pairing")
+
+DECK_ID_PATTERN = re.compile(r"^deck_[0-9a-f]{8,32}$")
+
+# Rendered slides, content-addressed, so an edited deck reuses unchanged slides.
+# Evicted renders are rebuilt from the HTML kept in the manifest.
+render_cache = DiskCache(
+    directory=os.getenv("RENDER_CACHE_DIR", "cache/renders"),
+    max_bytes=int(os.getenv("RENDER_CACHE_MAX_BYTES", str(1024 * 1024 * 1024))),
+    suffix=".img",
+)
+
+
+def slide_hash(slide: SlidePlan, plan: PresentationPlan) -> str:
+    """Changes whenever anything the slide's design is built from changes."""
+    payload = {"slide": slide.model_dump(), **{field: getattr(plan, field) for field in DESIGN_FIELDS}}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class UnknownDeck(KeyError):
+    """No manifest for this deck id (never saved, or evicted; maps to HTTP 404)."""
+
+
+class InvalidDeckRequest(ValueError):
+    """Malformed deck id or unknown slide ids (maps to HTTP 400)."""
+
+
+class ManifestStore:
+    """
+    One JSON manifest per deck (plan + per-slide records) on the local
+    filesystem, size-capped like the render cache: the least recently built
+    or loaded decks are evicted past MANIFEST_MAX_BYTES and can no longer be
+    regenerated. A falsy `directory` disables it (MANIFEST_DIR="").
+    """
+
+    def __init__(self, directory: str = None, max_bytes: int = None):
+        self.directory = directory if directory is not None else os.getenv("MANIFEST_DIR", "cache/decks")
+        self.cache = DiskCache(
+            directory=self.directory,
+            max_bytes=max_bytes if max_bytes is not None else int(os.getenv("MANIFEST_MAX_BYTES", str(256 * 1024 * 1024))),
+            suffix=".json",
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.cache.enabled
+
+    @staticmethod
+    def check_deck_id(deck_id: str):
+        if not DECK_ID_PATTERN.match(deck_id):
+            raise InvalidDeckRequest(f"Invalid deck id: {deck_id!r}")
+
+    def _read(self, deck_id: str) -> Optional[DeckManifest]:
+        self.check_deck_id(deck_id)
+        data = self.cache.get(deck_id)
+        return DeckManifest.model_validate_json(data) if data is not None else None
+
+    def _write(self, manifest: DeckManifest):
+        self.check_deck_id(manifest.deck_id)
+        self.cache.put(manifest.deck_id, manifest.model_dump_json().encode("utf-8"))
+
+    async def load(self, deck_id: str) -> Optional[DeckManifest]:
+        if not self.enabled:
+            return None
+        return await asyncio.to_thread(self._read, deck_id)
+
+    async def save(self, manifest: DeckManifest):
+        if self.enabled:
+            await asyncio.to_thread(self._write, manifest)
+
+    @staticmethod
+    async def put_render(image_data: bytes) -> str:
+        key = hashlib.sha256(image_data).hexdigest()
+        try:
+            await asyncio.to_thread(render_cache.put, key, image_data)
+        except OSError as e:
+            print(f"   -- ⚠️ Render cache write failed: {e}")
+        return key
+
+    @staticmethod
+    async def get_render(key: str) -> Optional[bytes]:
+        return await asyncio.to_thread(render_cache.get, key)
+
+
+manifest_store = ManifestStore()
@@ -0,0 +1,288 @@
+import re
+from io import BytesIO
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Union
+from src.agents.prescreen import CSS_DECLARATION, HEX_COLOR, contrast_ratio
+from src.models.schemas import SlidePlan, PresentationPlan
+from src.services.browser_service import ASSET_URL_PREFIX
+
+# Markup that has no native equivalent: slides using it are rendered as before
+UNSUPPORTED_TAGS = ("svg", "canvas", "table", "iframe", "video", "script", "object", "embed")
+CSS_URL = re.compile(r"url\(\s*['\"]?([^'\")]+)['\"]?\s*\)", re.IGNORECASE)
+# Layouts whose placement (columns, cards, overlays) the fixed native layout can't reproduce
+UNSUPPORTED_LAYOUT = re.compile(r"display\s*:\s*(?:inline-)?(?:grid|flex)\b|position\s*:\s*(?:absolute|fixed)\b", re.IGNORECASE)
+# Designer rule for native output: ask for exactly the subset translate_html() handles
+NATIVE_LAYOUT_RULE = (
+    "Keep to markup that converts to editable PowerPoint shapes: the headline in one <h1>, "
+    "every point as an <li> of one <ul>, and the image (if any) as a CSS background-image or one <img>. "
+    "No other visible text (no subtitles, captions, labels or numbers), no tables, SVG or canvas, and no "
+    "Flexbox, Grid or absolute/fixed positioning: style with colours, a linear-gradient background, "
+    "fonts, margins and padding only."
+)
+# Markup whose text is never shown
+HIDDEN_TAGS = ("head", "style", "script", "title", "noscript", "template")
+WORD = re.compile(r"\w+")
+
+
+@dataclass
+class NativeSlide:
+    """
+    What a slide's HTML translates to in python-pptx terms: text, colours,
+    fonts and an optional picture. Picklable (built in the PPTX worker process).
+    `image` is the picture's bytes, or a path once spilled to scratch.
+    """
+    slide_type: str
+    title: str
+    points: List[str] = field(default_factory=list)
+    background: str = "#FFFFFF"
+    gradient_to: Optional[str] = None
+    text_color: str = "#000000"
+    accent_color: Optional[str] = None
+    title_font: Optional[str] = None
+    body_font: Optional[str] = None
+    image: Optional[Union[bytes, str]] = None
+    image_layout: Optional[str] = None  # "background" (full bleed, behind the text) or "right" (half)
+
+
+def _text(tag) -> str:
+    return " ".join(tag.get_text(" ").split())
+
+
+def _fonts(font_pairing: str):
+    names = [name.strip().strip("'\"") for name in re.split(r"[/,&+]|\band\b", font_pairing or "") if name.strip()]
+    if not names:
+        return None, None
+    return names[0], names[1] if len(names) > 1 else names[0]
+
+
+def _dropped_words(soup, kept: List[str]) -> Counter:
+    """Visible words of the slide that aren't in `kept` (the title and points)."""
+    for tag in soup.find_all(HIDDEN_TAGS):
+        tag.decompose()
+    visible = Counter(word.lower() for word in WORD.findall(soup.get_text(" ")))
+    visible.subtract(word.lower() for text in kept for word in WORD.findall(text))
+    return +visible
+
+
+def _readable_on(background: str) -> str:
+    return "#FFFFFF" if contrast_ratio("#FFFFFF", background) >= contrast_ratio("#000000", background) else "#000000"
+
+
+def translate_html(html: str, slide: SlidePlan, master_plan: PresentationPlan,
+                   assets: Dict[str, bytes] = None) -> Optional[NativeSlide]:
+    """
+    Maps a constrained subset of the designer's HTML/CSS to a NativeSlide:
+    the headline (first h1-h3), the points (li, else p), the main background
+    (colour or linear gradient), the text colour, the deck fonts and a
+    generated image (as a background or beside the text).
+    Returns None when the slide uses something that can't be expressed
+    natively (tables, SVG, canvas, scripts, external images, grid / flex /
+    positioned layouts) or has visible text beyond the headline and points
+    (stat cards, captions, subtitles...): render it instead.
+    """
+    from bs4 import BeautifulSoup
+
+    assets = assets or {}
+    soup = BeautifulSoup(html, "html.parser")
+    if soup.find(UNSUPPORTED_TAGS) is not None:
+        return None
+
+    heading = soup.find(["h1", "h2", "h3"])
+    if heading is None or not _text(heading):
+        return None
+    title = _text(heading)
+
+    points = [_text(li) for li in soup.find_all("li") if _text(li)]
+    if not points:
+        points = [_text(p) for p in soup.find_all("p") if _text(p) and _text(p) != title]
+
+    css = " ".join(tag.get_text() for tag in soup.find_all("style"))
+    css += " " + " ".join(tag.get("style", "") for tag in soup.find_all(style=True))
+    if UNSUPPORTED_LAYOUT.search(css):
+        return None
+
+    # Nothing the designer wrote may be silently dropped (the CSS was read above)
+    if _dropped_words(soup, [title, *points]):
+        return None
+
+    # Images: generated assets are embedded, anything external needs the browser
+    image, image_layout = None, None
+    background_urls = set(CSS_URL.findall(css))
+    for url in background_urls | {img.get("src", "") for img in soup.find_all("img")}:
+        if not url or url.startswith("data:"):
+            continue
+        if not url.startswith(ASSET_URL_PREFIX):
+            return None
+        name = url[len(ASSET_URL_PREFIX):]
+        if name in assets and image is None:
+            image = assets[name]
+            image_layout = "background" if url in background_urls else "right"
+
+    background, gradient_to, text_color = None, None, None
+    for prop, value in CSS_DECLARATION.findall(css):
+        colors = HEX_COLOR.findall(value)
+        if not colors:
+            continue
+        if prop.lower() == "color":
+            text_color = text_color or colors[0]
+        elif background is None:
+            background = colors[0]
+            if "gradient" in value.lower() and len(colors) > 1:
+                gradient_to = colors[-1]
+    palette = [c for c in master_plan.color_palette_hex if HEX_COLOR.fullmatch(c.strip())]
+    background = background or (palette[0] if palette else "#FFFFFF")
+    if text_color is None or contrast_ratio(text_color, background) < 3:
+        text_color = _readable_on(background)
+    accents = [c for c in palette if c.lower() not in (background.lower(), text_color.lower())]
+    accent_color = max(accents, key=lambda c: contrast_ratio(c, background)) if accents else None
+
+    title_font, body_font = _fonts(master_plan.font_pairing)
+    return NativeSlide(
+        slide_type=slide.type,
+        title=title,
+        points=points,
+        background=background,
+        gradient_to=gradient_to,
+        text_color=text_color,
+        accent_color=accent_color,
+        title_font=title_font,
+        body_font=body_font,
+        image=image,
+        image_layout=image_layout,
+    )
+
+
+# -------------------------
+# Worker side (runs in the PPTX process pool)
+# -------------------------
+def _rgb(hex_color: str):
+    from pptx.dml.color import RGBColor
+
+    value = hex_color.lstrip("#")
+    if len(value) == 3:
+        value = "".join(c * 2 for c in value)
+    return RGBColor.from_string(value.upper())
+
+
+def _set_alpha(shape, alpha: float):
+    """Fill transparency (python-pptx has no API for it)."""
+    from pptx.oxml.ns import qn
+
+    color = shape.fill._xPr.find(qn("a:solidFill")).find(qn("a:srgbClr"))
+    color.append(color.makeelement(qn("a:alpha"), {"val": str(int(alpha * 100000))}))
+
+
+def _set_bullet(paragraph, char: str = "•"):
+    from pptx.oxml.ns import qn
+
+    p_pr = paragraph._p.get_or_add_pPr()
+    p_pr.set("marL", "342900")
+    p_pr.set("indent", "-342900")
+    p_pr.append(p_pr.makeelement(qn("a:buChar"), {"char": char}))
+
+
+def _body_size(points: List[str], base: int) -> int:
+    chars = sum(len(p) for p in points) + 40 * len(points)
+    return max(14, min(base, int(base * (500 / max(chars, 1)) ** 0.5)))
+
+
+def _add_picture(slide, image: bytes, left, top, width, height):
+    """Picture cropped (not stretched) to fill the box."""
+    from PIL import Image
+
+    with Image.open(BytesIO(image)) as img:
+        image_ratio = img.width / img.height
+    picture = slide.shapes.add_picture(BytesIO(image), left, top, width, height)
+    box_ratio = width / height
+    if image_ratio > box_ratio:
+        crop = (1 - box_ratio / image_ratio) / 2
+        picture.crop_left = picture.crop_right = crop
+    elif image_ratio < box_ratio:
+        crop = (1 - image_ratio / box_ratio) / 2
+        picture.crop_top = picture.crop_bottom = crop
+    return picture
+
+
+def add_native_slide(prs, spec: NativeSlide, image: Optional[bytes] = None):
+    """Adds `spec` to `prs` as editable shapes. `image` is the picture's bytes, if any."""
+    from pptx.enum.shapes import MSO_SHAPE
+    from pptx.enum.text import MSO_ANCHOR, MSO_AUTO_SIZE, PP_ALIGN
+    from pptx.util import Inches, Pt
+
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    width, height = prs.slide_width, prs.slide_height
+
+    fill = slide.background.fill
+    if spec.gradient_to:
+        fill.gradient()
+        fill.gradient_angle = 90
+        fill.gradient_stops[0].color.rgb = _rgb(spec.background)
+        fill.gradient_stops[1].color.rgb = _rgb(spec.gradient_to)
+    else:
+        fill.solid()
+        fill.fore_color.rgb = _rgb(spec.background)
+
+    margin = Inches(0.7)
+    text_width = width - 2 * margin
+    if image is not None and spec.image_layout == "background":
+        _add_picture(slide, image, 0, 0, width, height)
+        # Tinted overlay so the text stays legible on the photo
+        overlay = slide.shapes.add_shape(MSO_SHAPE.RECTANGLE, 0, 0, width, height)
+        overlay.fill.solid()
+        overlay.fill.fore_color.rgb = _rgb(spec.background)
+        _set_alpha(overlay, 0.55)
+        overlay.line.fill.background()
+    elif image is not None:
+        image_width = int(width * 0.45)
+        _add_picture(slide, image, width - image_width, 0, image_width, height)
+        text_width = width - image_width - 2 * margin
+
+    centered = spec.slide_type == "title"
+    title_top = Inches(2.3) if centered else Inches(0.6)
+    title_box = slide.shapes.add_textbox(margin, title_top, text_width, Inches(1.6 if centered else 1.3))
+    frame = title_box.text_frame
+    frame.word_wrap = True
+    frame.auto_size = MSO_AUTO_SIZE.TEXT_TO_FIT_SHAPE
+    frame.vertical_anchor = MSO_ANCHOR.BOTTOM if centered else MSO_ANCHOR.TOP
+    paragraph = frame.paragraphs[0]
+    paragraph.alignment = PP_ALIGN.CENTER if centered else PP_ALIGN.LEFT
+    run = paragraph.add_run()
+    run.text = spec.title
+    run.font.size = Pt(54 if centered else 40)
+    run.font.bold = True
+    run.font.color.rgb = _rgb(spec.text_color)
+    if spec.title_font:
+        run.font.name = spec.title_font
+
+    if spec.accent_color:
+        bar_left = (width - Inches(1.5)) // 2 if centered else margin
+        bar = slide.shapes.add_shape(
+            MSO_SHAPE.RECTANGLE, bar_left, title_top + title_box.height + Inches(0.1), Inches(1.5), Inches(0.08)
+        )
+        bar.fill.solid()
+        bar.fill.fore_color.rgb = _rgb(spec.accent_color)
+        bar.line.fill.background()
+
+    if not spec.points:
+        return slide
+
+    body_top = title_top + title_box.height + Inches(0.45)
+    body = slide.shapes.add_textbox(margin, body_top, text_width, height - body_top - Inches(0.6))
+    frame = body.text_frame
+    frame.word_wrap = True
+    frame.auto_size = MSO_AUTO_SIZE.TEXT_TO_FIT_SHAPE
+    size = _body_size(spec.points, 28 if centered else 26)
+    for i, point in enumerate(spec.points):
+        paragraph = frame.paragraphs[0] if i == 0 else frame.add_paragraph()
+        paragraph.alignment = PP_ALIGN.CENTER if centered else PP_ALIGN.LEFT
+        paragraph.space_after = Pt(size * 0.5)
+        if not centered:
+            _set_bullet(paragraph)
+        run = paragraph.add_run()
+        run.text = point
+        run.font.size = Pt(size)
+        run.font.color.rgb = _rgb(spec.text_color)
+        if spec.body_font:
+            run.font.name = spec.body_font
+    return slide
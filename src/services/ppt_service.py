@@ -1,23 +1,191 @@
-from pptx import Presentation
-from pptx.util import Inches
-from typing import List
+import os
+import asyncio
+import dataclasses
+import multiprocessing
+from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Union
+from src.services.native_pptx import NativeSlide, add_native_slide
+from src.services.scratch_service import ScratchSpace
+from src.utils.telemetry import span
+
+# Decks are assembled in worker processes so zipping full-HD PNGs never blocks
+# the event loop (PPT_PROCESS_WORKERS=0 falls back to a thread).
+PPT_PROCESS_WORKERS = int(os.getenv("PPT_PROCESS_WORKERS", "2"))
+# Workers are never forked from this process: it runs threads (Gemini executor,
+# asyncio's default executor, Playwright) and forking a threaded process can deadlock.
+PPT_PROCESS_START_METHOD = os.getenv(
+    "PPT_PROCESS_START_METHOD",
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn",
+)
+
+# Optional slide image optimization: "off" (default, images embedded as rendered),
+# "png" (lossless re-encode), "quantize" (palette PNG) or "jpeg".
+PPT_IMAGE_OPTIMIZE = os.getenv("PPT_IMAGE_OPTIMIZE", "off").lower()
+PPT_JPEG_QUALITY = int(os.getenv("PPT_JPEG_QUALITY", "85"))
+PPT_QUANTIZE_COLORS = int(os.getenv("PPT_QUANTIZE_COLORS", "256"))
+
+# Renders of one deck held in memory up to this many bytes; past it (with a
+# scratch space) further ones are spilled to disk. 0 spills every render.
+PPT_SPILL_BYTES = int(os.getenv("PPT_SPILL_BYTES", str(64 * 1024 * 1024)))
+
+OPTIMIZE_MODES = ("off", "png", "quantize", "jpeg")
+
+# A deck item: rendered image bytes, the path of a spilled render, or a native (editable) slide
+SlideItem = Union[bytes, str, NativeSlide]
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+# -------------------------
+# Worker-side functions (must stay top-level so they can be pickled)
+# -------------------------
+def optimize_image(image_data: bytes, mode: str, jpeg_quality: int = PPT_JPEG_QUALITY,
+                   colors: int = PPT_QUANTIZE_COLORS) -> bytes:
+    """
+    Re-encodes one rendered slide to shrink the deck.
+    The original bytes are kept whenever the result isn't smaller.
+    """
+    if mode == "off":
+        return image_data
+
+    from PIL import Image
+
+    with Image.open(BytesIO(image_data)) as img:
+        out = BytesIO()
+        if mode == "png":
+            img.save(out, format="PNG", optimize=True)
+        elif mode == "quantize":
+            img.convert("RGB").quantize(colors=colors, method=Image.Quantize.MEDIANCUT).save(out, format="PNG", optimize=True)
+        elif mode == "jpeg":
+            img.convert("RGB").save(out, format="JPEG", quality=jpeg_quality, optimize=True, progressive=True)
+        else:
+            raise ValueError(f"Unknown image optimization mode: {mode}")
+
+    optimized = out.getvalue()
+    return optimized if len(optimized) < len(image_data) else image_data
+
+
+def _read(data: Union[bytes, str]) -> bytes:
+    if isinstance(data, str):
+        with open(data, "rb") as f:
+            return f.read()
+    return data
+
+
+def build_pptx(images: List[SlideItem], optimize: str = "off", jpeg_quality: int = PPT_JPEG_QUALITY,
+               colors: int = PPT_QUANTIZE_COLORS) -> bytes:
+    """
+    Creates a PPTX and returns it as bytes. Rendered slides (image bytes, or
+    paths of renders spilled to scratch) become full-screen pictures;
+    NativeSlides become editable text and shapes.
+    """
+    from pptx import Presentation
+    from pptx.util import Inches
+
+    prs = Presentation()
+    # Set to 16:9
+    prs.slide_width = Inches(13.333)
+    prs.slide_height = Inches(7.5)
+
+    blank_slide_layout = prs.slide_layouts[6]
+    for image_data in images:
+        if isinstance(image_data, NativeSlide):
+            # Native pictures are photos: always worth a JPEG re-encode
+            picture = _read(image_data.image) if image_data.image is not None else None
+            if picture is not None:
+                picture = optimize_image(picture, "jpeg", jpeg_quality, colors)
+            add_native_slide(prs, image_data, picture)
+            continue
+        image_data = optimize_image(_read(image_data), optimize, jpeg_quality, colors)
+        slide = prs.slides.add_slide(blank_slide_layout)
+        slide.shapes.add_picture(BytesIO(image_data), 0, 0, width=prs.slide_width, height=prs.slide_height)
+
+    buffer = BytesIO()
+    prs.save(buffer)
+    return buffer.getvalue()
+
+
+class DeckBuilder:
+    """
+    Collects the slides of one deck (renders or NativeSlides): they can arrive in any order and
+    are kept in slide order. `total_slides` may be unknown up front (streamed plans).
+    Renders are kept in memory up to `spill_bytes`; with a `scratch` space,
+    later ones are written there as they arrive and only their paths are kept
+    (and sent to the assembling process).
+    """
+
+    def __init__(self, total_slides: int = None, optimize: str = None, scratch: ScratchSpace = None,
+                 spill_bytes: int = None):
+        self.total_slides = total_slides
+        self.optimize = (optimize or PPT_IMAGE_OPTIMIZE).lower()
+        if self.optimize not in OPTIMIZE_MODES:
+            raise ValueError(f"PPT_IMAGE_OPTIMIZE must be one of {OPTIMIZE_MODES}, got {self.optimize!r}")
+        self.scratch = scratch
+        self.spill_bytes = spill_bytes if spill_bytes is not None else PPT_SPILL_BYTES
+        self.memory_bytes = 0
+        self._images: List[SlideItem] = []
+        self._pending = {}
+
+    async def _keep(self, name: str, data: bytes) -> Union[bytes, str]:
+        """The render itself while the deck fits in memory, else its path in scratch."""
+        if self.scratch is None or self.memory_bytes + len(data) <= self.spill_bytes:
+            self.memory_bytes += len(data)
+            return data
+        return await self.scratch.write(name, data)
+
+    async def add(self, index: int, image_data: Union[bytes, NativeSlide]):
+        if isinstance(image_data, NativeSlide):
+            if isinstance(image_data.image, bytes):
+                picture = await self._keep(f"slide_{index:03d}_picture.img", image_data.image)
+                image_data = dataclasses.replace(image_data, image=picture)
+        else:
+            image_data = await self._keep(f"slide_{index:03d}.img", image_data)
+        self._pending[index] = image_data
+        while len(self._images) in self._pending:
+            self._images.append(self._pending.pop(len(self._images)))
+
+    async def save(self) -> bytes:
+        added = len(self._images)
+        if self._pending or (self.total_slides is not None and added != self.total_slides):
+            raise ValueError(f"Deck incomplete: {added} slides added, missing slide {added}")
+        with span("pptx.save", slides=added, optimize=self.optimize) as current:
+            ppt_data = await PPTService.assemble(self._images, self.optimize)
+            current.set_attribute("pptx.bytes", len(ppt_data))
+        print(f"✅ PowerPoint built: {added} slides, {len(ppt_data) / 1024:.0f} KB (optimize={self.optimize})")
+        return ppt_data
+
 
 class PPTService:
     @staticmethod
-    def create_presentation(image_paths: List[str], output_file: str):
+    def _get_executor() -> ProcessPoolExecutor:
+        global _executor
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=PPT_PROCESS_WORKERS,
+                mp_context=multiprocessing.get_context(PPT_PROCESS_START_METHOD),
+            )
+        return _executor
+
+    @staticmethod
+    async def assemble(images: List[SlideItem], optimize: str = "off") -> bytes:
+        """Builds the PPTX off the event loop (worker process, or a thread if disabled)."""
+        if PPT_PROCESS_WORKERS <= 0:
+            return await asyncio.to_thread(build_pptx, images, optimize)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(PPTService._get_executor(), build_pptx, images, optimize)
+
+    @staticmethod
+    def shutdown():
+        global _executor
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+    @staticmethod
+    def create_presentation(images: List[bytes]) -> bytes:
         """
-        Creates a PPTX file where each slide is a full-screen image.
+        Creates a PPTX where each slide is a full-screen image and returns it as bytes.
+        `images` are the rendered PNG bytes, in slide order. Runs in the caller's thread.
         """
-        prs = Presentation()
-        # Set to 16:9
-        prs.slide_width = Inches(13.333)
-        prs.slide_height = Inches(7.5)
-        
-        blank_slide_layout = prs.slide_layouts[6] 
-        
-        for img_path in image_paths:
-            slide = prs.slides.add_slide(blank_slide_layout)
-            slide.shapes.add_picture(img_path, 0, 0, width=prs.slide_width, height=prs.slide_height)
-            
-        prs.save(output_file)
-        print(f"✅ PowerPoint saved to: {output_file}")
\ No newline at end of file
+        return build_pptx(images, PPT_IMAGE_OPTIMIZE)
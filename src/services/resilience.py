@@ -0,0 +1,221 @@
+import os
+import time
+import random
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+from src.services.scheduler import scheduler
+from src.utils.telemetry import registry
+
+T = TypeVar("T")
+
+# policy -> (timeout seconds, attempts, base backoff seconds, max backoff seconds)
+# Overridable per policy: RETRY_<POLICY>_TIMEOUT / _ATTEMPTS / _BACKOFF / _MAX_BACKOFF
+DEFAULT_POLICIES = {
+    "openai_chat": (90.0, 3, 1.0, 20.0),
+    "openai_images": (180.0, 2, 2.0, 30.0),
+    "gemini": (120.0, 2, 1.0, 10.0),
+    "storage": (60.0, 3, 1.0, 10.0),
+}
+
+# HTTP statuses worth retrying (timeouts, conflicts, rate limits, server errors)
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+# Provider SDK exceptions that mean "try again", matched by name so no SDK is imported here
+RETRYABLE_NAMES = {
+    "APIConnectionError", "APITimeoutError", "RateLimitError", "InternalServerError",  # openai
+    "ServiceUnavailable", "DeadlineExceeded", "ResourceExhausted", "TooManyRequests",  # google.api_core
+    "GatewayTimeout", "BadGateway",
+    "ConnectionError", "ConnectTimeout", "ReadTimeout",
+}
+
+breaker_state = registry.gauge("ppt_circuit_state", "Circuit breaker state (0 closed, 1 half-open, 2 open)")
+breaker_transitions = registry.counter("ppt_circuit_transitions_total", "Circuit breaker state changes")
+breaker_rejections = registry.counter("ppt_circuit_rejections_total", "Calls refused by an open circuit")
+provider_retries = registry.counter("ppt_provider_retries_total", "Retried provider calls")
+provider_timeouts = registry.counter("ppt_provider_timeouts_total", "Provider calls that hit their deadline")
+
+STATE_VALUES = {"closed": 0, "half_open": 1, "open": 2}
+
+
+class ProviderError(Exception):
+    """A provider call failed for good (retries exhausted, not retryable, or circuit open)."""
+
+    def __init__(self, message: str, provider: str = None):
+        super().__init__(message)
+        self.provider = provider
+
+
+class CircuitOpenError(ProviderError):
+    """Refused without calling: the provider's circuit breaker is open."""
+
+
+def is_retryable(error: BaseException) -> bool:
+    # Distinct types before Python 3.11: call() raises the builtin one for hung calls
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    if getattr(error, "retryable", False):
+        return True
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    if isinstance(status, int) and status in RETRYABLE_STATUS:
+        return True
+    return type(error).__name__ in RETRYABLE_NAMES
+
+
+class CircuitBreaker:
+    """
+    Per-provider (or per-model) breaker. After `failure_threshold` consecutive
+    retryable failures it opens and refuses calls for `reset_timeout` seconds,
+    then lets a single probe through (half-open): success closes it, failure
+    re-opens it. Non-retryable errors (bad request, auth) don't count.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = None, reset_timeout: float = None):
+        self.name = name
+        self.failure_threshold = failure_threshold or int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+        self.reset_timeout = reset_timeout or float(os.getenv("BREAKER_RESET_TIMEOUT", "30"))
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        breaker_state.set(0, breaker=name)
+
+    def _transition(self, state: str):
+        if state == self.state:
+            return
+        print(f"🔌 Circuit {self.name}: {self.state} -> {state}")
+        self.state = state
+        breaker_state.set(STATE_VALUES[state], breaker=self.name)
+        breaker_transitions.inc(breaker=self.name, state=state)
+
+    def allow(self) -> bool:
+        if self.state == "open":
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self._transition("half_open")
+        if self.state == "half_open":
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+        return True
+
+    def record_success(self):
+        self._probe_in_flight = False
+        self.failures = 0
+        self._transition("closed")
+
+    def record_failure(self):
+        self._probe_in_flight = False
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            self._transition("open")
+
+    def release(self):
+        """The call ended without telling us anything about provider health."""
+        self._probe_in_flight = False
+
+    def stats(self) -> dict:
+        return {"state": self.state, "consecutive_failures": self.failures}
+
+
+class RetryPolicy:
+    def __init__(self, name: str, timeout: float, attempts: int, backoff: float, max_backoff: float):
+        prefix = f"RETRY_{name.upper()}"
+        self.name = name
+        self.timeout = float(os.getenv(f"{prefix}_TIMEOUT", str(timeout)))
+        self.attempts = max(1, int(os.getenv(f"{prefix}_ATTEMPTS", str(attempts))))
+        self.backoff = float(os.getenv(f"{prefix}_BACKOFF", str(backoff)))
+        self.max_backoff = float(os.getenv(f"{prefix}_MAX_BACKOFF", str(max_backoff)))
+
+    def delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff before retry number `attempt` (1-based)."""
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+
+
+policies: Dict[str, RetryPolicy] = {name: RetryPolicy(name, *values) for name, values in DEFAULT_POLICIES.items()}
+breakers: Dict[str, CircuitBreaker] = {}
+
+
+def breaker(name: str) -> CircuitBreaker:
+    if name not in breakers:
+        breakers[name] = CircuitBreaker(name)
+    return breakers[name]
+
+
+async def call(policy: str, func: Callable[[], Awaitable[T]], breaker_name: Optional[str] = None,
+               slot: Optional[str] = None) -> T:
+    """
+    Runs `func()` under the policy's deadline, retrying retryable errors with
+    jittered exponential backoff, guarded by the `breaker_name` breaker
+    (default: the policy name). With `slot`, each attempt holds a scheduler
+    slot of that resource; the deadline only covers the call itself, and
+    backoff sleeps don't hold the slot.
+    Raises ProviderError (CircuitOpenError when the breaker refuses).
+    """
+    rules = policies[policy]
+    guard = breaker(breaker_name or policy)
+    last_error = None
+
+    for attempt in range(1, rules.attempts + 1):
+        if not guard.allow():
+            breaker_rejections.inc(breaker=guard.name)
+            raise CircuitOpenError(f"{guard.name}: circuit open", guard.name) from last_error
+        try:
+            if slot:
+                async with scheduler.slot(slot):
+                    result = await asyncio.wait_for(func(), rules.timeout)
+            else:
+                result = await asyncio.wait_for(func(), rules.timeout)
+        except asyncio.CancelledError:
+            guard.release()
+            raise
+        except Exception as e:
+            last_error = e
+            if isinstance(e, asyncio.TimeoutError):
+                provider_timeouts.inc(policy=policy)
+                e = last_error = TimeoutError(f"no answer within {rules.timeout:g}s")
+            if not is_retryable(e):
+                guard.release()
+                raise ProviderError(f"{guard.name}: {e}", guard.name) from e
+            guard.record_failure()
+            if attempt == rules.attempts:
+                break
+            delay = rules.delay(attempt)
+            provider_retries.inc(policy=policy)
+            print(f"   -- 🔁 {guard.name} failed ({e}), retry {attempt}/{rules.attempts - 1} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+        else:
+            guard.record_success()
+            return result
+
+    raise ProviderError(f"{guard.name}: failed after {rules.attempts} attempt(s): {last_error}", guard.name) from last_error
+
+
+@asynccontextmanager
+async def guarded(policy: str, breaker_name: Optional[str] = None):
+    """
+    Breaker bookkeeping for calls that can't go through call(), such as
+    streams: refuses when open, records the outcome of the block.
+    No retries; the deadline is up to the caller (e.g. the SDK's timeout).
+    """
+    guard = breaker(breaker_name or policy)
+    if not guard.allow():
+        breaker_rejections.inc(breaker=guard.name)
+        raise CircuitOpenError(f"{guard.name}: circuit open", guard.name)
+    try:
+        yield policies[policy]
+    except (asyncio.CancelledError, GeneratorExit):
+        guard.release()
+        raise
+    except Exception as e:
+        if is_retryable(e):
+            guard.record_failure()
+        else:
+            guard.release()
+        raise ProviderError(f"{guard.name}: {e}", guard.name) from e
+    else:
+        guard.record_success()
+
+
+def stats() -> dict:
+    return {name: b.stats() for name, b in breakers.items()}
@@ -0,0 +1,175 @@
+import os
+import time
+import asyncio
+import contextvars
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Optional
+
+# Which request the current task is working for. Set once per workflow;
+# tasks spawned inside it inherit the value.
+current_owner = contextvars.ContextVar("scheduler_owner", default="default")
+
+# resource -> (default concurrency, default requests/second; 0 = no rate limit)
+DEFAULT_LIMITS = {
+    "openai_chat": (8, 0),
+    "openai_images": (2, 0),
+    "gemini": (6, 0),
+    "browser": (int(os.getenv("BROWSER_POOL_SIZE", "2")), 0),
+}
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, up to `capacity` banked."""
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def take(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class FairLimiter:
+    """
+    Concurrency limit (+ optional rate limit) for one outbound resource.
+
+    Waiters are queued per owner (request) and served round-robin, so one
+    large deck can't starve the requests that arrived after it.
+    """
+
+    def __init__(self, name: str, concurrency: int, rate: float = 0, burst: float = None):
+        self.name = name
+        self.concurrency = max(1, concurrency)
+        self.bucket = TokenBucket(rate, burst) if rate > 0 else None
+
+        self._active = 0
+        self._queues: "OrderedDict[str, deque]" = OrderedDict()
+        self._metrics = {
+            "acquired": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+            "peak_active": 0,
+            "peak_queued": 0,
+        }
+
+    def queued(self) -> int:
+        return sum(1 for q in self._queues.values() for fut in q if not fut.done())
+
+    async def acquire(self, owner: str):
+        start = time.perf_counter()
+        if self._active < self.concurrency and not self.queued():
+            self._active += 1
+        else:
+            fut = asyncio.get_running_loop().create_future()
+            self._queues.setdefault(owner, deque()).append(fut)
+            self._metrics["peak_queued"] = max(self._metrics["peak_queued"], self.queued())
+            try:
+                await fut
+            except asyncio.CancelledError:
+                # The slot may have been handed to us right before cancellation
+                if fut.done() and not fut.cancelled():
+                    self.release()
+                raise
+
+        if self.bucket:
+            try:
+                await self.bucket.take()
+            except asyncio.CancelledError:
+                self.release()
+                raise
+
+        waited = time.perf_counter() - start
+        self._metrics["acquired"] += 1
+        self._metrics["wait_seconds_total"] += waited
+        self._metrics["wait_seconds_max"] = max(self._metrics["wait_seconds_max"], waited)
+        self._metrics["peak_active"] = max(self._metrics["peak_active"], self._active)
+
+    def release(self):
+        self._active -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        while self._active < self.concurrency and self._queues:
+            owner, queue = next(iter(self._queues.items()))
+            fut = queue.popleft()
+            if queue:
+                # Round-robin: this owner goes to the back of the line
+                self._queues.move_to_end(owner)
+            else:
+                del self._queues[owner]
+            if fut.done():
+                continue  # waiter was cancelled
+            self._active += 1
+            fut.set_result(None)
+
+    def stats(self) -> dict:
+        acquired = self._metrics["acquired"]
+        return {
+            "concurrency": self.concurrency,
+            "rate_per_second": self.bucket.rate if self.bucket else None,
+            "active": self._active,
+            "queued": self.queued(),
+            "queued_owners": len(self._queues),
+            "wait_seconds_avg": (self._metrics["wait_seconds_total"] / acquired) if acquired else 0.0,
+            **self._metrics,
+        }
+
+
+class Scheduler:
+    """
+    Process-wide gate for every outbound call, shared by all requests.
+
+    Each resource gets its own FairLimiter, configured from the environment:
+      LIMIT_<RESOURCE>_CONCURRENCY, LIMIT_<RESOURCE>_RPS, LIMIT_<RESOURCE>_BURST
+    e.g. LIMIT_OPENAI_CHAT_CONCURRENCY=8, LIMIT_GEMINI_RPS=2.
+    """
+
+    def __init__(self, limits: Dict[str, tuple] = None):
+        self.limiters: Dict[str, FairLimiter] = {}
+        for resource, (concurrency, rate) in (limits or DEFAULT_LIMITS).items():
+            prefix = f"LIMIT_{resource.upper()}"
+            burst = os.getenv(f"{prefix}_BURST")
+            self.limiters[resource] = FairLimiter(
+                resource,
+                concurrency=int(os.getenv(f"{prefix}_CONCURRENCY", str(concurrency))),
+                rate=float(os.getenv(f"{prefix}_RPS", str(rate))),
+                burst=float(burst) if burst else None,
+            )
+
+    @asynccontextmanager
+    async def slot(self, resource: str, owner: Optional[str] = None):
+        """Hold one slot of `resource` for the duration of the block."""
+        limiter = self.limiters[resource]
+        await limiter.acquire(owner or current_owner.get())
+        try:
+            yield
+        finally:
+            limiter.release()
+
+    @staticmethod
+    @contextmanager
+    def request_scope(owner: str):
+        """Marks every call made inside the block as belonging to `owner`."""
+        token = current_owner.set(owner)
+        try:
+            yield
+        finally:
+            current_owner.reset(token)
+
+    def stats(self) -> dict:
+        return {name: limiter.stats() for name, limiter in self.limiters.items()}
+
+
+scheduler = Scheduler()
@@ -0,0 +1,263 @@
+import os
+import re
+import time
+import uuid
+import shutil
+import asyncio
+import tempfile
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+from src.utils.telemetry import registry
+
+# Per-request scratch directories live here (point it at /dev/shm for tmpfs).
+# Shared by every worker process on the host.
+SCRATCH_DIR = os.getenv("SCRATCH_DIR", os.path.join(tempfile.gettempdir(), "ppt-scratch"))
+# Bytes all workers may hold in scratch before new requests wait (0 = no limit)
+SCRATCH_QUOTA_BYTES = int(os.getenv("SCRATCH_QUOTA_BYTES", str(1024 * 1024 * 1024)))
+# How long a new request waits for space before giving up
+SCRATCH_WAIT_TIMEOUT = float(os.getenv("SCRATCH_WAIT_TIMEOUT", "60"))
+# Directories older than this are removed by the sweeper whoever owns them
+SCRATCH_ORPHAN_TTL = float(os.getenv("SCRATCH_ORPHAN_TTL", "3600"))
+SCRATCH_SWEEP_INTERVAL = float(os.getenv("SCRATCH_SWEEP_INTERVAL", "300"))
+
+# "<pid>-<label>-<hex>": the owning worker is part of the name
+SCRATCH_NAME = re.compile(r"^(\d+)-")
+
+scratch_bytes = registry.gauge("ppt_scratch_bytes", "Bytes held in request scratch directories by this worker")
+scratch_waits = registry.counter("ppt_scratch_waits_total", "Requests that waited for scratch space")
+scratch_swept = registry.counter("ppt_scratch_swept_total", "Orphaned scratch directories removed")
+
+
+class ScratchQuotaExceeded(Exception):
+    """No scratch space freed up in time (maps to HTTP 503)."""
+
+
+def _write_file(path: str, data: bytes) -> int:
+    """Writes `data` to `path`, returns the size of the file it replaced (0 if new)."""
+    try:
+        previous = os.path.getsize(path)
+    except FileNotFoundError:
+        previous = 0
+    with open(path, "wb") as f:
+        f.write(data)
+    return previous
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _directory_bytes(path: str) -> int:
+    total = 0
+    for parent, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(parent, name))
+            except FileNotFoundError:
+                pass
+    return total
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class ScratchSpace:
+    """One request's scratch directory. File I/O runs off the event loop."""
+
+    def __init__(self, manager: "ScratchManager", name: str, path: str):
+        self.manager = manager
+        self.name = name
+        self.path = path
+        self.bytes_used = 0
+
+    def path_for(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    async def write(self, name: str, data: bytes) -> str:
+        """Stores `data` as `name` and returns its path."""
+        path = self.path_for(name)
+        previous = await asyncio.to_thread(_write_file, path, data)
+        self.bytes_used += len(data) - previous
+        self.manager._charge(len(data) - previous)
+        return path
+
+    async def read(self, name: str) -> bytes:
+        return await asyncio.to_thread(_read_file, self.path_for(name))
+
+
+class ScratchManager:
+    """
+    Hands out one scratch directory per request and removes it when the
+    request ends, however it ends (`async with scratch.request(...)`).
+
+    - Quota: while the bytes held in scratch (this worker's, plus other
+      workers' as measured by the last sweep) are over `quota_bytes`, new
+      requests wait for running ones to finish; after `wait_timeout` seconds
+      they fail with ScratchQuotaExceeded. Running requests are never
+      blocked mid-way.
+    - Sweeper: directories left by crashed workers (owner pid gone, or older
+      than `orphan_ttl`) are removed at startup and every `sweep_interval`.
+    """
+
+    def __init__(self, directory: str = None, quota_bytes: int = None, wait_timeout: float = None,
+                 orphan_ttl: float = None, sweep_interval: float = None):
+        self.directory = directory or SCRATCH_DIR
+        self.quota_bytes = quota_bytes if quota_bytes is not None else SCRATCH_QUOTA_BYTES
+        self.wait_timeout = wait_timeout if wait_timeout is not None else SCRATCH_WAIT_TIMEOUT
+        self.orphan_ttl = orphan_ttl if orphan_ttl is not None else SCRATCH_ORPHAN_TTL
+        self.sweep_interval = sweep_interval if sweep_interval is not None else SCRATCH_SWEEP_INTERVAL
+        self.active: Dict[str, ScratchSpace] = {}
+        self.used_bytes = 0
+        self.other_workers_bytes = 0
+        self.waiting = 0
+        self._freed = asyncio.Event()
+        self._sweeper: Optional[asyncio.Task] = None
+        self._releases = set()
+        self._stats = {"requests": 0, "waits": 0, "rejected": 0, "swept": 0}
+
+    @property
+    def full(self) -> bool:
+        return self.quota_bytes > 0 and self.used_bytes + self.other_workers_bytes >= self.quota_bytes
+
+    def _charge(self, delta: int):
+        self.used_bytes += delta
+        scratch_bytes.set(self.used_bytes)
+
+    async def _admit(self):
+        if not self.full:
+            return
+        self._stats["waits"] += 1
+        scratch_waits.inc()
+        print(f"⏳ Scratch space full ({self.used_bytes + self.other_workers_bytes} / {self.quota_bytes} bytes), waiting...")
+        deadline = time.monotonic() + self.wait_timeout
+        self.waiting += 1
+        try:
+            while self.full:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["rejected"] += 1
+                    raise ScratchQuotaExceeded(f"Scratch space full, no room freed within {self.wait_timeout:g}s")
+                freed = self._freed
+                try:
+                    await asyncio.wait_for(freed.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self.waiting -= 1
+
+    async def _remove(self, space: ScratchSpace):
+        await asyncio.to_thread(shutil.rmtree, space.path, ignore_errors=True)
+        # Still active until removed, so a sweep doesn't count it as another worker's
+        self.active.pop(space.name, None)
+        self._charge(-space.bytes_used)
+        space.bytes_used = 0
+        # Wake every waiter, then start a fresh event for the next release
+        self._freed.set()
+        self._freed = asyncio.Event()
+
+    async def _release(self, space: ScratchSpace):
+        # Off the event loop, and shielded: a cancelled request still gets its directory removed
+        removal = asyncio.create_task(self._remove(space))
+        self._releases.add(removal)
+        removal.add_done_callback(self._releases.discard)
+        await asyncio.shield(removal)
+
+    @asynccontextmanager
+    async def request(self, label: str = "request"):
+        """Scratch directory for one request, removed (with its contents) on exit."""
+        await self._admit()
+        label = re.sub(r"[^A-Za-z0-9_]", "_", label)[:40]
+        name = f"{os.getpid()}-{label}-{uuid.uuid4().hex[:8]}"
+        space = ScratchSpace(self, name, os.path.join(self.directory, name))
+        # Registered before the directory exists so a concurrent sweep never takes it
+        self.active[name] = space
+        self._stats["requests"] += 1
+        try:
+            await asyncio.to_thread(os.makedirs, space.path, exist_ok=True)
+            yield space
+        finally:
+            await self._release(space)
+
+    def sweep(self) -> int:
+        """
+        Removes orphaned directories and measures what other workers hold.
+        Blocking: run it in a worker thread. Returns the number removed.
+        """
+        if not os.path.isdir(self.directory):
+            return 0
+        removed, others, now = 0, 0, time.time()
+        for name in os.listdir(self.directory):
+            if name in self.active:
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                age = now - os.stat(path).st_mtime
+            except FileNotFoundError:
+                continue
+            match = SCRATCH_NAME.match(name)
+            owner = int(match.group(1)) if match else None
+            if owner is not None and owner != os.getpid() and _pid_alive(owner) and age < self.orphan_ttl:
+                others += _directory_bytes(path)
+                continue
+            # Dead owner, expired, unknown, or ours but no longer active (pid reused after a crash)
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            removed += 1
+        self.other_workers_bytes = others
+        if removed:
+            self._stats["swept"] += removed
+            scratch_swept.inc(removed)
+            print(f"🧹 Scratch sweeper removed {removed} orphaned entr{'y' if removed == 1 else 'ies'}")
+        return removed
+
+    async def _sweep_forever(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                await asyncio.to_thread(self.sweep)
+            except OSError as e:
+                print(f"⚠️ Scratch sweep failed: {e}")
+
+    async def start(self):
+        """Clears what crashed workers left behind, then keeps sweeping in the background."""
+        if self._sweeper is not None:
+            return
+        await asyncio.to_thread(os.makedirs, self.directory, exist_ok=True)
+        await asyncio.to_thread(self.sweep)
+        self._sweeper = asyncio.create_task(self._sweep_forever())
+        print(f"🗂️ Scratch space: {self.directory} (quota {self.quota_bytes} bytes)")
+
+    async def stop(self):
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            await asyncio.gather(self._sweeper, return_exceptions=True)
+            self._sweeper = None
+        # Directories of cancelled requests still being removed
+        await asyncio.gather(*self._releases, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "directory": self.directory,
+            "active": len(self.active),
+            "used_bytes": self.used_bytes,
+            "other_workers_bytes": self.other_workers_bytes,
+            "quota_bytes": self.quota_bytes,
+            "waiting": self.waiting,
+            **self._stats,
+        }
+
+
+scratch = ScratchManager()
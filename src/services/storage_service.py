@@ -0,0 +1,90 @@
+import os
+import asyncio
+from pathlib import Path
+from typing import Dict
+from src.services.cloudinary_service import CloudinaryService
+from src.services import resilience
+from src.utils.telemetry import span
+
+
+class StorageBackend:
+    """
+    Where finished decks go. Backends take the PPTX bytes straight from memory
+    and must not block the event loop.
+    """
+    name = "base"
+
+    async def upload_ppt(self, data: bytes, filename_without_ext: str) -> str:
+        raise NotImplementedError
+
+
+class CloudinaryStorage(StorageBackend):
+    """Production backend. The SDK is blocking, so it runs in a worker thread."""
+    name = "cloudinary"
+
+    async def upload_ppt(self, data: bytes, filename_without_ext: str) -> str:
+        return await asyncio.to_thread(CloudinaryService.upload_ppt, data, filename_without_ext)
+
+
+class LocalStorage(StorageBackend):
+    """Writes decks to a local directory and returns a file:// URL."""
+    name = "local"
+
+    def __init__(self, directory: str = None):
+        self.directory = directory or os.getenv("LOCAL_STORAGE_DIR", "output")
+
+    def _write(self, data: bytes, filename_without_ext: str) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        path = Path(self.directory, f"{filename_without_ext}.pptx").resolve()
+        path.write_bytes(data)
+        return path.as_uri()
+
+    async def upload_ppt(self, data: bytes, filename_without_ext: str) -> str:
+        url = await asyncio.to_thread(self._write, data, filename_without_ext)
+        print(f"💾 Saved {filename_without_ext} locally: {url}")
+        return url
+
+
+class MemoryStorage(StorageBackend):
+    """Keeps decks in a dict. For offline tests and benchmarks."""
+    name = "memory"
+
+    def __init__(self):
+        self.files: Dict[str, bytes] = {}
+
+    async def upload_ppt(self, data: bytes, filename_without_ext: str) -> str:
+        self.files[filename_without_ext] = data
+        return f"memory://presentations/{filename_without_ext}.pptx"
+
+
+BACKENDS = {
+    CloudinaryStorage.name: CloudinaryStorage,
+    LocalStorage.name: LocalStorage,
+    MemoryStorage.name: MemoryStorage,
+}
+
+
+class StorageService:
+    """Entry point used by the server. Backend is picked by STORAGE_BACKEND."""
+    _backend: StorageBackend = None
+
+    @staticmethod
+    def get_backend() -> StorageBackend:
+        if StorageService._backend is None:
+            name = os.getenv("STORAGE_BACKEND", CloudinaryStorage.name).lower()
+            if name not in BACKENDS:
+                raise ValueError(f"Unknown STORAGE_BACKEND '{name}'. Use one of: {', '.join(BACKENDS)}")
+            StorageService._backend = BACKENDS[name]()
+        return StorageService._backend
+
+    @staticmethod
+    def set_backend(backend: StorageBackend):
+        StorageService._backend = backend
+
+    @staticmethod
+    async def upload_ppt(data: bytes, filename_without_ext: str) -> str:
+        backend = StorageService.get_backend()
+        with span("upload", backend=backend.name, bytes=len(data)):
+            return await resilience.call(
+                "storage", lambda: backend.upload_ppt(data, filename_without_ext), breaker_name=f"storage:{backend.name}"
+            )
@@ -0,0 +1,122 @@
+import os
+import uuid
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+
+class DiskCache:
+    """
+    Size-capped, content-addressed blob store on the local filesystem.
+
+    - One file per key (`<key><suffix>`) so hits can be served as bytes or as a path.
+    - LRU eviction by total size; recency comes from file mtime, which is
+      bumped on every hit so the order survives restarts.
+    - Blocking I/O: call from a worker thread (asyncio.to_thread) in async code.
+    - A falsy `directory` disables the cache (every lookup misses).
+    """
+
+    def __init__(self, directory: str, max_bytes: int, suffix: str = ".bin"):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+
+        self._index = None  # key -> size, least recently used first
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory) and self.max_bytes > 0
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}{self.suffix}")
+
+    def _load_index(self):
+        if self._index is not None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(self.suffix):
+                continue
+            try:
+                st = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, name[:-len(self.suffix)], st.st_size))
+        self._index = OrderedDict((key, size) for _, key, size in sorted(entries))
+        self._total_bytes = sum(self._index.values())
+
+    def contains(self, key: str) -> bool:
+        if not self.enabled:
+            return False
+        with self._lock:
+            self._load_index()
+            return key in self._index and os.path.exists(self.path_for(key))
+
+    def get(self, key: str) -> Optional[bytes]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            self._load_index()
+            path = self.path_for(key)
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+                os.utime(path)
+            except FileNotFoundError:
+                # Evicted by another worker sharing the directory
+                if key in self._index:
+                    self._total_bytes -= self._index.pop(key)
+                self._stats["misses"] += 1
+                return None
+            if key not in self._index:
+                self._index[key] = len(data)
+                self._total_bytes += len(data)
+            self._index.move_to_end(key)
+            self._stats["hits"] += 1
+            return data
+
+    def put(self, key: str, data: bytes) -> Optional[str]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            self._load_index()
+            path = self.path_for(key)
+            # Write-then-rename so readers never see a partial file
+            tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+            if key in self._index:
+                self._total_bytes -= self._index.pop(key)
+            self._index[key] = len(data)
+            self._total_bytes += len(data)
+            self._stats["writes"] += 1
+            self._evict()
+            return path
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes and len(self._index) > 1:
+            key, size = self._index.popitem(last=False)
+            self._total_bytes -= size
+            self._stats["evictions"] += 1
+            try:
+                os.remove(self.path_for(key))
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> dict:
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            "enabled": self.enabled,
+            "directory": self.directory or None,
+            "entries": len(self._index) if self._index is not None else None,
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "hit_rate": (self._stats["hits"] / lookups) if lookups else 0.0,
+            **self._stats,
+        }
@@ -0,0 +1,76 @@
+import json
+from typing import Any, List, Tuple
+
+
+class IncrementalObjectParser:
+    """
+    Parses a streamed JSON object of the shape {<header fields>..., "<array_key>": [{...}, {...}]}
+    as the text arrives.
+
+    feed() returns events as soon as they are complete:
+      ("header", dict)  once, when the array starts (every field before it is done)
+      ("item", dict)    for each finished element of the array
+
+    `complete` tells whether the top-level object was closed, i.e. whether a
+    stream that ended was cut short.
+
+    Relies on the array being the last field, which holds for structured
+    outputs since they follow the schema's field order.
+    """
+
+    def __init__(self, array_key: str):
+        self.array_key = array_key
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._last_key = None
+        self._last_key_start = None
+        self._array_started = False
+        self._item_start = None
+        self.complete = False
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        self._buffer += chunk
+        events = []
+        buffer = self._buffer
+
+        while self._pos < len(buffer):
+            i = self._pos
+            char = buffer[i]
+            self._pos += 1
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1 and not self._array_started:
+                        self._last_key = buffer[self._string_start + 1:i]
+                        self._last_key_start = self._string_start
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = i
+            elif char in "{[":
+                self._depth += 1
+                if char == "[" and self._depth == 2 and self._last_key == self.array_key and not self._array_started:
+                    self._array_started = True
+                    header = buffer[:self._last_key_start].rstrip().rstrip(",") + "}"
+                    events.append(("header", json.loads(header)))
+                elif char == "{" and self._depth == 3 and self._array_started:
+                    self._item_start = i
+            elif char in "}]":
+                if char == "}" and self._depth == 3 and self._item_start is not None:
+                    events.append(("item", json.loads(buffer[self._item_start:i + 1])))
+                    self._item_start = None
+                self._depth -= 1
+                if self._depth == 0:
+                    self.complete = True
+
+        return events
@@ -0,0 +1,199 @@
+import sys
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict, Tuple
+
+# OpenTelemetry is optional. Without an SDK configured, its API is a no-op,
+# and without the package at all we fall back to our own no-op span.
+try:
+    from opentelemetry import trace as _otel_trace
+    _tracer = _otel_trace.get_tracer("ppt-agent")
+except ImportError:
+    _otel_trace = None
+    _tracer = None
+
+
+class _NoopSpan:
+    def set_attribute(self, key, value):
+        pass
+
+    def record_exception(self, exception):
+        pass
+
+    def set_status(self, *args, **kwargs):
+        pass
+
+
+# =========================
+# Prometheus-style metrics
+# =========================
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _labels_key(labels: dict) -> Tuple:
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key: Tuple, extra: dict = None) -> str:
+    items = list(key) + list((extra or {}).items())
+    if not items:
+        return ""
+    body = ",".join(f'{name}="{str(value)}"' for name, value in items)
+    return "{" + body + "}"
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._lock = threading.Lock()
+
+    def render(self) -> str:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str):
+        super().__init__(name, help_text)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = _labels_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> str:
+        return "\n".join(f"{self.name}{_format_labels(k)} {v}" for k, v in self._values.items())
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str):
+        super().__init__(name, help_text)
+        self._values: Dict[Tuple, float] = {}
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[_labels_key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = _labels_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def render(self) -> str:
+        return "\n".join(f"{self.name}{_format_labels(k)} {v}" for k, v in self._values.items())
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple, list] = {}  # key -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels):
+        key = _labels_key(labels)
+        with self._lock:
+            series = self._series.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> str:
+        lines = []
+        for key, series in self._series.items():
+            for i, bound in enumerate(self.buckets):
+                lines.append(f"{self.name}_bucket{_format_labels(key, {'le': bound})} {series[i]}")
+            lines.append(f"{self.name}_bucket{_format_labels(key, {'le': '+Inf'})} {series[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {series[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {series[-1]}")
+        return "\n".join(lines)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _get(self, cls, name: str, help_text: str, **kwargs):
+        if name not in self._metrics:
+            self._metrics[name] = cls(name, help_text, **kwargs)
+        return self._metrics[name]
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        return self._get(Counter, name, help_text)
+
+    def gauge(self, name: str, help_text: str) -> Gauge:
+        return self._get(Gauge, name, help_text)
+
+    def histogram(self, name: str, help_text: str, buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help_text, buckets=buckets)
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        blocks = []
+        for metric in self._metrics.values():
+            body = metric.render()
+            blocks.append(f"# HELP {metric.name} {metric.help}\n# TYPE {metric.name} {metric.kind}" + (f"\n{body}" if body else ""))
+        return "\n".join(blocks) + "\n"
+
+
+registry = MetricsRegistry()
+
+span_duration = registry.histogram("ppt_stage_duration_seconds", "Duration of each traced stage")
+span_in_flight = registry.gauge("ppt_stage_in_flight", "Traced stages currently running")
+span_errors = registry.counter("ppt_stage_errors_total", "Traced stages that raised")
+llm_tokens = registry.counter("ppt_llm_tokens_total", "LLM tokens by model and direction")
+
+
+# =========================
+# Spans
+# =========================
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Traces one unit of work: an OpenTelemetry span (no-op unless an SDK is
+    configured) plus latency histogram / in-flight gauge under stage=name.
+    Child spans opened inside the block (even in spawned tasks) nest under it.
+    """
+    attributes = {k: v for k, v in attributes.items() if v is not None}
+    span_in_flight.inc(stage=name)
+    start = time.perf_counter()
+    cm = _tracer.start_as_current_span(name, attributes=attributes) if _tracer else None
+    current = cm.__enter__() if cm else _NoopSpan()
+    try:
+        yield current
+    except Exception:
+        span_errors.inc(stage=name)
+        raise
+    finally:
+        span_in_flight.dec(stage=name)
+        span_duration.observe(time.perf_counter() - start, stage=name)
+        if cm:
+            # Records the exception / error status on the span, if any
+            cm.__exit__(*sys.exc_info())
+
+
+def record_tokens(model: str, prompt_tokens: int = None, completion_tokens: int = None, current=None):
+    """Adds token usage to the metrics and, if given, to the current span."""
+    if prompt_tokens:
+        llm_tokens.inc(prompt_tokens, model=model, direction="prompt")
+    if completion_tokens:
+        llm_tokens.inc(completion_tokens, model=model, direction="completion")
+    if current is not None:
+        if prompt_tokens is not None:
+            current.set_attribute("llm.prompt_tokens", prompt_tokens)
+        if completion_tokens is not None:
+            current.set_attribute("llm.completion_tokens", completion_tokens)
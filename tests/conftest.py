@@ -0,0 +1,55 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Offline defaults, set before anything under src/ reads its settings at import
+# time: every on-disk cache and the scratch space live in a throwaway directory.
+_TMP = tempfile.mkdtemp(prefix="ppt-tests-")
+for name, value in {
+    "OPENAI_API_KEY": "test",
+    "GOOGLE_API_KEY": "test",
+    "STORAGE_BACKEND": "memory",
+    "IMAGE_CACHE_DIR": os.path.join(_TMP, "images"),
+    "RENDER_CACHE_DIR": os.path.join(_TMP, "renders"),
+    "MANIFEST_DIR": os.path.join(_TMP, "decks"),
+    "TEMPLATE_CACHE_DIR": os.path.join(_TMP, "templates"),
+    "RENDER_ASSET_CACHE_DIR": os.path.join(_TMP, "assets"),
+    "SCRATCH_DIR": os.path.join(_TMP, "scratch"),
+    "LOCAL_STORAGE_DIR": os.path.join(_TMP, "output"),
+    "LLM_CACHE_PATH": "",
+}.items():
+    os.environ.setdefault(name, value)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def renders(monkeypatch):
+    """Replaces Chromium with an instant render that fits the frame; returns the rendered HTML, in order."""
+    from src.services.browser_service import VIEWPORT, BrowserService, RenderResult
+    from src.services.fake_providers import fake_png
+
+    rendered = []
+
+    async def render(html, assets=None):
+        rendered.append(html)
+        return RenderResult(image=fake_png(1, (64, 36)), format="png",
+                            content_width=VIEWPORT["width"], content_height=VIEWPORT["height"])
+
+    monkeypatch.setattr(BrowserService, "render", staticmethod(render))
+    # PPTX assembled in a thread: no worker processes per test
+    monkeypatch.setattr("src.services.ppt_service.PPT_PROCESS_WORKERS", 0)
+    return rendered
+
+
+@pytest.fixture
+def fakes(renders):
+    """Offline providers with no latency (FakeBackends), installed for the test."""
+    from src.services.fake_providers import FakeBackends
+
+    fakes = FakeBackends(chat_latency=0, code_latency=0, image_latency=0, upload_latency=0, jitter=0)
+    fakes.install()
+    yield fakes
+    fakes.uninstall()
@@ -0,0 +1,102 @@
+import asyncio
+from types import SimpleNamespace
+
+from src.services.asset_cache import RenderAssetCache
+from src.services.browser_service import _external_url
+from src.utils.disk_cache import DiskCache
+
+PAGE = object()
+
+
+class FakeResponse:
+    def __init__(self, status=200, body=b"font-bytes", content_type="font/woff2"):
+        self.status = status
+        self._body = body
+        self.headers = {"content-type": content_type}
+
+    async def body(self):
+        return self._body
+
+
+class FakeRoute:
+    """Records what the interceptor did with one intercepted request."""
+    fetches = 0
+
+    def __init__(self, url, resource_type="font", method="GET", response=None, delay=0.0):
+        self.request = SimpleNamespace(url=url, resource_type=resource_type, method=method,
+                                       frame=SimpleNamespace(page=PAGE))
+        self.response = response or FakeResponse()
+        self.delay = delay
+        self.outcome = None
+
+    async def fetch(self, timeout=None):
+        FakeRoute.fetches += 1
+        await asyncio.sleep(self.delay)
+        return self.response
+
+    async def continue_(self):
+        self.outcome = ("continue",)
+
+    async def fulfill(self, status, headers, body):
+        self.outcome = ("fulfill", status, headers["content-type"], body)
+
+    async def abort(self, error_code):
+        self.outcome = ("abort", error_code)
+
+
+def _handle(cache, *routes):
+    async def run():
+        await asyncio.gather(*(cache.handle(route) for route in routes))
+    asyncio.run(run())
+
+
+def test_only_external_urls_are_intercepted():
+    assert _external_url("https://fonts.gstatic.com/s/inter.woff2")
+    assert not _external_url("https://assets.local/slide_1.png")
+    assert not _external_url("data:image/png;base64,AAAA")
+
+
+def test_concurrent_renders_share_one_fetch_then_hit_the_store(tmp_path):
+    FakeRoute.fetches = 0
+    cache = RenderAssetCache(DiskCache(str(tmp_path), max_bytes=1024 * 1024), offline=False)
+    url = "https://fonts.gstatic.com/s/inter.woff2"
+    first = [FakeRoute(url, delay=0.02) for _ in range(3)]
+    _handle(cache, *first)
+    later = FakeRoute(url)
+    _handle(cache, later)
+
+    assert FakeRoute.fetches == 1
+    assert all(route.outcome == ("fulfill", 200, "font/woff2", b"font-bytes") for route in [*first, later])
+    stats = cache.stats()
+    assert (stats["misses"], stats["shared"], stats["hits"]) == (1, 2, 1)
+
+
+def test_failed_responses_are_passed_through_but_not_stored(tmp_path):
+    cache = RenderAssetCache(DiskCache(str(tmp_path), max_bytes=1024 * 1024), offline=False)
+    url = "https://example.com/missing.png"
+    route = FakeRoute(url, resource_type="image", response=FakeResponse(404, b"nope", "text/plain"))
+    _handle(cache, route)
+    assert route.outcome == ("fulfill", 404, "text/plain", b"nope")
+    assert not cache.store.contains(cache.key(url))
+
+
+def test_other_requests_go_to_the_network(tmp_path):
+    cache = RenderAssetCache(DiskCache(str(tmp_path), max_bytes=1024 * 1024), offline=False)
+    routes = [FakeRoute("https://example.com/app.js", resource_type="script"),
+              FakeRoute("https://example.com/a.png", resource_type="image", method="POST")]
+    _handle(cache, *routes)
+    assert [route.outcome for route in routes] == [("continue",), ("continue",)]
+
+
+def test_offline_serves_cached_assets_and_blocks_the_rest(tmp_path):
+    store = DiskCache(str(tmp_path), max_bytes=1024 * 1024)
+    url = "https://fonts.gstatic.com/s/inter.woff2"
+    _handle(RenderAssetCache(store, offline=False), FakeRoute(url))
+
+    offline = RenderAssetCache(store, offline=True)
+    cached, uncached = FakeRoute(url), FakeRoute("https://fonts.gstatic.com/s/other.woff2")
+    _handle(offline, cached, uncached)
+    assert cached.outcome[0] == "fulfill"
+    assert uncached.outcome == ("abort", "internetdisconnected")
+    assert offline.take_blocked(PAGE) == ["https://fonts.gstatic.com/s/other.woff2"]
+    assert offline.take_blocked(PAGE) == []
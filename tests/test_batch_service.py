@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from src.models.schemas import SlideRecord
+from src.services.batch_service import SlideDeduper, expand_prompts, run_batch
+
+
+def test_template_is_expanded_once_per_item():
+    prompts = expand_prompts(["Plain"], "Deck for $client ($missing)", [{"client": "Acme"}, {"client": 7}])
+    assert prompts == ["Plain", "Deck for Acme ($missing)", "Deck for 7 ($missing)"]
+
+
+def _collect(prompts, build, concurrency=2):
+    async def run():
+        return [result async for result in run_batch(prompts, build, concurrency)]
+    results = asyncio.run(run())
+    return results[:-1], results[-1]
+
+
+def test_duplicates_are_built_once_and_not_counted_as_throughput():
+    built = []
+
+    async def build(prompt):
+        built.append(prompt)
+        await asyncio.sleep(0.05)
+        return {"deck_id": prompt}
+
+    items, summary = _collect(["a", "b", "a", "a"], build)
+    assert sorted(built) == ["a", "b"]
+    assert sorted(item["index"] for item in items) == [0, 1, 2, 3]
+    assert {item["index"]: item.get("duplicate_of") for item in items} == {0: None, 1: None, 2: 0, 3: 0}
+    assert (summary["decks"], summary["unique_decks"], summary["succeeded"]) == (4, 2, 4)
+    assert (summary["built"], summary["duplicate_hits"]) == (2, 2)
+    assert summary["decks_per_hour"] == pytest.approx(2 / summary["elapsed_seconds"] * 3600, rel=0.05)
+
+
+def test_a_failed_build_fails_its_duplicates():
+    async def build(prompt):
+        if prompt == "bad":
+            raise RuntimeError("planner down")
+        return {}
+
+    items, summary = _collect(["bad", "ok", "bad"], build)
+    assert sorted((item["index"], item["status"]) for item in items) == [(0, "failed"), (1, "succeeded"), (2, "failed")]
+    assert (summary["failed"], summary["built"], summary["duplicate_hits"]) == (2, 1, 0)
+
+
+def test_concurrent_identical_slides_share_one_task():
+    produced = 0
+
+    async def produce():
+        nonlocal produced
+        produced += 1
+        await asyncio.sleep(0.01)
+        return SlideRecord(slide_id=1, content_hash="h", html="<div></div>"), b"png"
+
+    async def run():
+        deduper = SlideDeduper()
+        results = await asyncio.gather(*(deduper.run("h", produce) for _ in range(3)))
+        return deduper, results
+
+    deduper, results = asyncio.run(run())
+    assert produced == 1 and deduper.hits == 2
+    assert all(image == b"png" for _, image in results)
@@ -0,0 +1,157 @@
+import asyncio
+
+import pytest
+
+from src.services.browser_service import BrowserPool
+
+
+class FakePage:
+    def __init__(self):
+        self.closed = False
+
+    def is_closed(self):
+        return self.closed
+
+
+class FakeContext:
+    def __init__(self):
+        self.page = None
+        self.closed = False
+
+    async def route(self, matcher, handler):
+        pass
+
+    async def new_page(self):
+        self.page = FakePage()
+        return self.page
+
+    async def close(self):
+        self.closed = True
+        if self.page is not None:
+            self.page.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+        self.contexts = []
+
+    def on(self, event, handler):
+        pass
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, **kwargs):
+        context = FakeContext()
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        self.connected = False
+
+
+class FakeChromium:
+    def __init__(self):
+        self.browsers = []
+
+    async def launch(self, **kwargs):
+        browser = FakeBrowser()
+        self.browsers.append(browser)
+        return browser
+
+
+class FakePlaywright:
+    def __init__(self):
+        self.chromium = FakeChromium()
+
+    async def start(self):
+        return self
+
+    async def stop(self):
+        pass
+
+
+@pytest.fixture
+def playwright(monkeypatch):
+    fake = FakePlaywright()
+    monkeypatch.setattr("playwright.async_api.async_playwright", lambda: fake)
+    return fake
+
+
+async def _render(pool, fail=False):
+    async with pool.page() as page:
+        if fail:
+            raise RuntimeError("render failed")
+        return page
+
+
+def test_page_is_reused_then_recycled_after_max_renders(playwright):
+    async def run():
+        pool = BrowserPool(size=1, max_page_renders=2, max_browser_renders=100)
+        pages = [await _render(pool) for _ in range(3)]
+        await pool.stop()
+        return pool, pages
+
+    pool, pages = asyncio.run(run())
+    assert pages[0] is pages[1]
+    assert pages[2] is not pages[0] and pages[0].closed
+    assert pool.stats()["page_recycles"] == 1
+    assert pool.stats()["browser_launches"] == 1
+
+
+def test_failed_render_recycles_its_page(playwright):
+    async def run():
+        pool = BrowserPool(size=1, max_page_renders=50, max_browser_renders=100)
+        first = await _render(pool)
+        with pytest.raises(RuntimeError):
+            await _render(pool, fail=True)
+        second = await _render(pool)
+        await pool.stop()
+        return pool, first, second
+
+    pool, first, second = asyncio.run(run())
+    assert second is not first
+    assert pool.stats()["failed_renders"] == 1
+    assert pool.stats()["page_recycles"] == 1
+
+
+def test_browser_is_relaunched_after_max_renders_and_after_a_crash(playwright):
+    async def run():
+        pool = BrowserPool(size=2, max_page_renders=50, max_browser_renders=2)
+        await _render(pool)
+        await _render(pool)
+        await _render(pool)  # over max_browser_renders: new browser
+        playwright.chromium.browsers[-1].connected = False  # crash
+        await _render(pool)
+        await pool.stop()
+        return pool
+
+    pool = asyncio.run(run())
+    browsers = playwright.chromium.browsers
+    assert pool.stats()["browser_launches"] == 3
+    assert len(browsers) == 3
+    # The retired browser is closed once no page uses it
+    assert not browsers[0].connected
+
+
+def test_pool_bounds_concurrent_renders(playwright):
+    async def run():
+        pool = BrowserPool(size=2, max_page_renders=50, max_browser_renders=100)
+        active, peak = 0, 0
+
+        async def render():
+            nonlocal active, peak
+            async with pool.page():
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.01)
+                active -= 1
+
+        await asyncio.gather(*(render() for _ in range(6)))
+        await pool.stop()
+        return pool, peak
+
+    pool, peak = asyncio.run(run())
+    assert peak == 2
+    assert pool.stats()["renders"] == 6
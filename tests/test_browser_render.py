@@ -0,0 +1,118 @@
+import asyncio
+import builtins
+import re
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from src.services import browser_service
+from src.services.browser_service import PLACEHOLDER_PNG, VIEWPORT, BrowserService
+
+HTML = """<html><body><h1>Slide</h1>
+<img src="https://assets.local/slide_1.png">
+<img src="https://assets.local/missing.png?v=2">
+<img src="https://cdn.example.com/logo.svg">
+</body></html>"""
+
+
+class FakeRoute:
+    def __init__(self, url):
+        self.request = SimpleNamespace(url=url)
+        self.fulfilled = None
+
+    async def fulfill(self, status, content_type, body):
+        self.fulfilled = (status, content_type, body)
+
+
+class FakeRenderPage:
+    """Plays the page's requests through the routes registered on it."""
+
+    def __init__(self, content_size=(1920, 1080)):
+        self.routes = {}
+        self.requests = {}
+        self.content = None
+        self.screenshot_options = None
+        self.content_size = content_size
+
+    async def route(self, pattern, handler):
+        self.routes[pattern] = handler
+
+    async def unroute(self, pattern, handler):
+        assert self.routes.pop(pattern) is handler
+
+    async def set_content(self, html, wait_until=None):
+        self.content = html
+        for url in re.findall(r'src="([^"]+)"', html):
+            route = FakeRoute(url)
+            handler = next((h for p, h in self.routes.items() if url.startswith(p.rstrip("*"))), None)
+            if handler is not None:
+                await handler(route)
+            self.requests[url] = route.fulfilled or "network"
+
+    async def evaluate(self, script, timeout):
+        width, height = self.content_size
+        return {"timedOut": False, "width": width, "height": height}
+
+    async def screenshot(self, **options):
+        self.screenshot_options = options
+        return b"captured"
+
+
+@pytest.fixture
+def page(monkeypatch):
+    page = FakeRenderPage()
+
+    @asynccontextmanager
+    async def borrow():
+        yield page
+
+    monkeypatch.setattr(browser_service.browser_pool, "page", borrow)
+    return page
+
+
+@pytest.fixture
+def no_file_writes(monkeypatch):
+    written = []
+    original = builtins.open
+
+    def tracking_open(file, mode="r", *args, **kwargs):
+        if any(flag in mode for flag in "wax+"):
+            written.append(file)
+        return original(file, mode, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "open", tracking_open)
+    return written
+
+
+def test_assets_are_served_from_memory(page, no_file_writes):
+    image = b"\x89PNG generated"
+    result = asyncio.run(BrowserService.render(HTML, {"slide_1.png": image}))
+
+    assert page.requests["https://assets.local/slide_1.png"] == (200, "image/png", image)
+    # Unknown names get the transparent placeholder instead of a broken image
+    assert page.requests["https://assets.local/missing.png?v=2"] == (200, "image/png", PLACEHOLDER_PNG)
+    # Anything else is left to the context's routes (render asset cache / network)
+    assert page.requests["https://cdn.example.com/logo.svg"] == "network"
+    assert not page.routes  # the asset route is removed after the render
+
+    assert page.content == HTML
+    assert result.image == b"captured" and result.format == "png" and not result.overflow
+    assert no_file_writes == []
+
+
+def test_capture_is_clipped_to_the_slide_frame(page):
+    page.content_size = (1920, 1500)
+    result = asyncio.run(BrowserService.render("<html><body>tall</body></html>"))
+    assert page.screenshot_options == {"clip": {"x": 0, "y": 0, **VIEWPORT}, "type": "png"}
+    assert result.overflow and result.content_height == 1500
+
+
+def test_asset_route_is_removed_when_the_render_fails(page, monkeypatch):
+    async def fail(html, wait_until=None):
+        raise RuntimeError("page crashed")
+
+    monkeypatch.setattr(page, "set_content", fail)
+    with pytest.raises(RuntimeError, match="page crashed"):
+        asyncio.run(BrowserService.render(HTML, {}))
+    assert not page.routes
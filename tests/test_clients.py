@@ -0,0 +1,33 @@
+import asyncio
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from src.services.clients import ClientRegistry
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("openai", "google.generativeai", "cloudinary", "playwright", "pptx", "PIL", "bs4")
+
+
+def test_importing_the_server_loads_no_provider_sdk():
+    code = (
+        "import sys, server; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ""
+
+
+def test_clients_are_built_once_on_first_use():
+    registry = ClientRegistry()
+    assert registry.stats() == {"openai": False, "gemini": False, "cloudinary": False}
+
+    with ThreadPoolExecutor(4) as pool:
+        built = list(pool.map(lambda _: registry.openai(), range(8)))
+    assert all(client is built[0] for client in built)
+    assert registry.stats()["openai"] and not registry.stats()["gemini"]
+
+    asyncio.run(registry.close())
+    assert not registry.stats()["openai"]
@@ -0,0 +1,121 @@
+import asyncio
+from io import BytesIO
+
+from src.agents.judge import DeckJudgeBatcher, JudgeAgent
+from src.models.schemas import DeckJudgement, SlideChoice
+from src.orchestrator import Orchestrator
+from src.services.fake_providers import fake_plan, fake_token_stream
+from src.services.llm_service import LLMService
+
+PLAN = fake_plan("3 slides")
+
+
+def test_deck_call_covers_every_slide_and_falls_back_concurrently(monkeypatch):
+    deck_calls, single_calls = [], []
+
+    async def generate_json(prompt, system_prompt, response_model):
+        deck_calls.append(prompt)
+        # No choice for slide 3, an out-of-range one for slide 2
+        return DeckJudgement(choices=[SlideChoice(slide_id=1, variant=1), SlideChoice(slide_id=2, variant=5)])
+
+    async def generate_text(prompt, system_prompt):
+        single_calls.append(asyncio.get_running_loop().time())
+        await asyncio.sleep(0.05)
+        return "1"
+
+    monkeypatch.setattr(LLMService, "generate_json", staticmethod(generate_json))
+    monkeypatch.setattr(LLMService, "generate_text", staticmethod(generate_text))
+
+    async def run():
+        judge = JudgeAgent()
+        batcher = DeckJudgeBatcher(judge, window=5)
+        for slide in PLAN.slides:
+            batcher.expect(slide.id)
+        picks = await asyncio.gather(*(
+            batcher.submit([f"<div>{slide.id}a</div>", f"<div>{slide.id}b</div>"], slide, PLAN)
+            for slide in PLAN.slides
+        ))
+        return picks, batcher
+
+    picks, batcher = asyncio.run(run())
+    assert picks == ["<div>1b</div>", "<div>2b</div>", "<div>3b</div>"]
+    assert len(deck_calls) == 1
+    # Slides 2 and 3 fell back to per-slide calls, started together
+    assert len(single_calls) == 2 and single_calls[1] - single_calls[0] < 0.04
+    assert not batcher._reviews
+
+
+def test_window_flushes_without_waiting_for_every_slide(monkeypatch):
+    async def generate_json(prompt, system_prompt, response_model):
+        return DeckJudgement(choices=[SlideChoice(slide_id=1, variant=0)])
+
+    monkeypatch.setattr(LLMService, "generate_json", staticmethod(generate_json))
+
+    async def run():
+        batcher = DeckJudgeBatcher(JudgeAgent(), window=0.05)
+        batcher.expect(1)
+        batcher.expect(2)  # never arrives
+        return await batcher.submit(["<a/>", "<b/>"], PLAN.slides[0], PLAN)
+
+    assert asyncio.run(run()) == "<a/>"
+
+
+def test_deck_judge_mode_uses_one_judge_call_per_deck(fakes):
+    from pptx import Presentation
+
+    orchestrator = Orchestrator(judge_mode="deck", design_mode="creative", output_mode="image")
+    data = asyncio.run(orchestrator.run_workflow("Make 3 slides"))
+
+    assert len(Presentation(BytesIO(data)).slides) == 3
+    chat = fakes.stats()["openai_chat"]["calls"]
+    # One planner call and one deck-level judge call
+    assert chat == 2
+
+
+def _time_deck_calls(monkeypatch, fakes):
+    """Records when (since the first call) each deck-level judge call was made."""
+    calls, started = [], []
+
+    async def generate_json(prompt, system_prompt, response_model):
+        now = asyncio.get_running_loop().time()
+        started.append(now)
+        if response_model is DeckJudgement:
+            calls.append(now - started[0])
+        return await fakes.generate_json(prompt, system_prompt, response_model)
+
+    monkeypatch.setattr(LLMService, "generate_json", staticmethod(generate_json))
+    return calls
+
+
+def test_template_filled_slide_does_not_hold_the_deck_judge(fakes, monkeypatch):
+    monkeypatch.setenv("JUDGE_BATCH_WINDOW", "5")
+    deck_calls = _time_deck_calls(monkeypatch, fakes)
+    orchestrator = Orchestrator(judge_mode="deck", design_mode="template", output_mode="image")
+
+    async def design_slide(slide, plan):
+        if slide.id != 1:
+            return None  # creative: variants + deck judge
+        await asyncio.sleep(0.5)
+        return "<div class='slide'>filled</div>"
+
+    orchestrator.templates.design_slide = design_slide
+    asyncio.run(orchestrator.run_workflow("Make 3 slides"))
+
+    # Sent as soon as slides 2 and 3 arrived, not when slide 1 (or the window) finished
+    assert len(deck_calls) == 1 and deck_calls[0] < 0.3
+
+
+def test_streamed_plan_is_judged_in_one_deck_call(fakes, monkeypatch):
+    monkeypatch.setenv("JUDGE_BATCH_WINDOW", "5")
+
+    async def stream_json(prompt, system_prompt, response_model):
+        # Slides arrive well apart: the first ones reach the judge before the last is planned
+        async for chunk in fake_token_stream(fake_plan(prompt).model_dump_json(), chunk_size=64, delay=0.02):
+            yield chunk
+
+    monkeypatch.setattr(LLMService, "stream_json", staticmethod(stream_json))
+    deck_calls = _time_deck_calls(monkeypatch, fakes)
+    orchestrator = Orchestrator(judge_mode="deck", design_mode="creative", output_mode="image", stream_plan=True)
+    asyncio.run(orchestrator.run_workflow("Make 4 slides"))
+
+    assert len(deck_calls) == 1
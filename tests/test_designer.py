@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+
+from src.agents.designer import DesignerAgent
+from src.services.fake_providers import fake_plan
+from src.services.llm_service import LLMService
+
+
+@pytest.mark.parametrize("variants", [0, -1])
+def test_variants_below_one_are_rejected(variants):
+    with pytest.raises(ValueError, match="at least 1"):
+        DesignerAgent(variants=variants)
+
+
+def test_zero_variants_from_the_environment_is_rejected(monkeypatch):
+    monkeypatch.setenv("DESIGNER_VARIANTS", "0")
+    with pytest.raises(ValueError, match="DESIGNER_VARIANTS"):
+        DesignerAgent()
+
+
+def test_explicit_variants_win_over_the_environment(monkeypatch):
+    monkeypatch.setenv("DESIGNER_VARIANTS", "5")
+    assert DesignerAgent(variants=1).variants == 1
+    assert DesignerAgent().variants == 5
+
+
+@pytest.fixture
+def slow_variants(monkeypatch):
+    """Variant N answers after N * 50ms; records which ones were started and finished."""
+    started, finished = [], []
+
+    async def generate_code(prompt, system_prompt):
+        variant = int(prompt.split("Variant #")[1].split()[0])
+        started.append(variant)
+        await asyncio.sleep(variant * 0.05)
+        finished.append(variant)
+        return f"<div>variant {variant}</div>"
+
+    monkeypatch.setattr(LLMService, "generate_code", staticmethod(generate_code))
+    return started, finished
+
+
+def test_first_k_keeps_the_fastest_and_cancels_the_rest(slow_variants):
+    started, finished = slow_variants
+    plan = fake_plan("1 slides")
+    designer = DesignerAgent(variants=4, first_k=2)
+
+    variants = asyncio.run(designer.generate_slide_variants(plan.slides[0], plan))
+    assert variants == ["<div>variant 1</div>", "<div>variant 2</div>"]
+    assert sorted(started) == [1, 2, 3, 4]
+    assert finished == [1, 2]
+
+
+def test_deadline_judges_what_has_arrived(slow_variants):
+    plan = fake_plan("1 slides")
+    designer = DesignerAgent(variants=4, first_k=4, deadline=0.07)
+
+    variants = asyncio.run(designer.generate_slide_variants(plan.slides[0], plan))
+    assert variants == ["<div>variant 1</div>"]
+
+
+def test_all_variants_failing_raises_the_provider_error(monkeypatch):
+    from src.services.resilience import ProviderError
+
+    async def generate_code(prompt, system_prompt):
+        raise ProviderError("gemini down", "gemini")
+
+    monkeypatch.setattr(LLMService, "generate_code", staticmethod(generate_code))
+    plan = fake_plan("1 slides")
+    with pytest.raises(ProviderError, match="gemini down"):
+        asyncio.run(DesignerAgent(variants=2).generate_slide_variants(plan.slides[0], plan))
@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+from benchmarks import e2e_benchmark
+from benchmarks.e2e_benchmark import percentile, process_rss, run_batch
+from src.services import resilience
+from src.services.fake_providers import FakeBackends, FakeProvider, FakeProviderError, fake_plan
+from src.services.image_service import ImageService
+from src.services.llm_service import LLMService
+from src.services.resilience import ProviderError
+from src.services.storage_service import StorageService
+
+
+def test_fake_plan_is_deterministic_and_sized_from_the_prompt():
+    plan = fake_plan("A deck about caching, 7 slides please")
+    assert len(plan.slides) == 7
+    assert plan == fake_plan("A deck about caching, 7 slides please")
+    assert len(fake_plan("no count").slides) == 5
+
+
+def test_seeded_failures_are_reproducible():
+    async def outcomes(seed):
+        provider = FakeProvider("p", latency=0, jitter=0, failure_rate=0.5, seed=seed)
+        results = []
+        for _ in range(20):
+            try:
+                await provider.call()
+                results.append(True)
+            except FakeProviderError:
+                results.append(False)
+        return provider, results
+
+    first, a = asyncio.run(outcomes(3))
+    _, b = asyncio.run(outcomes(3))
+    assert a == b
+    assert 0 < first.failures < 20 and first.calls == 20
+
+
+def test_peak_in_flight_is_tracked():
+    async def run():
+        provider = FakeProvider("p", latency=0.01, jitter=0)
+        await asyncio.gather(*(provider.call() for _ in range(5)))
+        return provider
+
+    assert asyncio.run(run()).stats()["peak_in_flight"] == 5
+
+
+def test_install_swaps_the_services_and_uninstall_restores_them():
+    originals = (LLMService.generate_code, ImageService.generate_image, StorageService._backend)
+    fakes = FakeBackends(chat_latency=0, code_latency=0, image_latency=0, upload_latency=0, jitter=0)
+    fakes.install()
+    try:
+        html = asyncio.run(LLMService.generate_code("Title: Hello", "system"))
+        assert "<h1>Hello</h1>" in html
+        assert StorageService.get_backend() is fakes.storage
+    finally:
+        fakes.uninstall()
+    assert (LLMService.generate_code, ImageService.generate_image, StorageService._backend) == originals
+
+
+def test_injected_failures_surface_as_provider_errors(monkeypatch):
+    # Fresh breakers: these failures must not open the fakes' circuits for other tests
+    monkeypatch.setattr(resilience, "breakers", {})
+    monkeypatch.setattr(resilience.RetryPolicy, "delay", lambda self, attempt: 0)
+    fakes = FakeBackends(chat_latency=0, code_latency=0, image_latency=0, upload_latency=0, jitter=0, failure_rate=1.0)
+    fakes.install()
+    try:
+        with pytest.raises(ProviderError):
+            asyncio.run(LLMService.generate_text("prompt", "system"))
+    finally:
+        fakes.uninstall()
+    # Retried by the resilience layer before giving up
+    assert fakes.stats()["openai_chat"]["calls"] > 1
+
+
+def test_run_batch_reports_latency_and_failures():
+    calls = 0
+
+    async def make_call(prompt):
+        nonlocal calls
+        calls += 1
+        number = calls
+        await asyncio.sleep(0.01)
+        if number % 4 == 0:
+            raise RuntimeError("deck failed")
+
+    result = asyncio.run(run_batch(make_call, deck_size=3, concurrency=2, decks=8))
+    assert (result["decks"], result["failures"]) == (8, 2)
+    assert result["latency_p50_seconds"] >= 0.01
+    assert percentile([1, 2, 3, 4], 50) == 2 and percentile([], 95) == 0.0
+
+
+def test_peak_rss_is_measured_per_run(monkeypatch):
+    rss = {"value": 0}
+    monkeypatch.setattr(e2e_benchmark, "process_rss", lambda: rss["value"])
+    monkeypatch.setattr(e2e_benchmark, "chromium_processes", lambda: (0, 0))
+
+    def deck_using(mb):
+        async def make_call(prompt):
+            rss["value"] = mb * 1024 * 1024
+            await asyncio.sleep(0.01)
+        return make_call
+
+    big = asyncio.run(run_batch(deck_using(500), deck_size=1, concurrency=1, decks=1))
+    rss["value"] = 0  # the first run's memory was released
+    small = asyncio.run(run_batch(deck_using(100), deck_size=1, concurrency=1, decks=1))
+    assert (big["peak_rss_mb"], small["peak_rss_mb"]) == (500.0, 100.0)
+    assert process_rss() > 0
@@ -0,0 +1,79 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from src.services import llm_service, resilience
+from src.services.llm_service import LLMService
+
+
+class FakeModel:
+    """Sync Gemini model: each call blocks its thread for `latency` seconds."""
+
+    def __init__(self, latency: float = 0.05, failures: int = 0):
+        self.latency = latency
+        self.failures = failures
+
+    def generate_content(self, prompt):
+        time.sleep(self.latency)
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("transient")
+        return SimpleNamespace(text=f"<html>{prompt}</html>", usage_metadata=None)
+
+
+@pytest.fixture
+def thread_transport(monkeypatch):
+    model = FakeModel()
+    monkeypatch.setattr(llm_service, "GEMINI_TRANSPORT", "thread")
+    monkeypatch.setattr(llm_service, "gemini_executor", ThreadPoolExecutor(max_workers=1))
+    monkeypatch.setattr(llm_service, "gemini_metrics", {})
+    monkeypatch.setattr(llm_service, "gemini_backlog", llm_service._Backlog())
+    monkeypatch.setattr(LLMService, "_gemini_model", staticmethod(lambda name, system: model))
+    monkeypatch.setattr(resilience, "breakers", {})
+    return model
+
+
+def test_backlog_counts_work_waiting_for_a_thread(thread_transport):
+    async def run():
+        calls = [asyncio.create_task(LLMService._run_gemini("m", str(i), "s")) for i in range(3)]
+        await asyncio.sleep(0.02)
+        backlog = LLMService.gemini_stats()["executor_backlog"]
+        results = await asyncio.gather(*calls)
+        return backlog, results
+
+    backlog, results = asyncio.run(run())
+    # One call running on the single thread, two submitted behind it
+    assert backlog == 2
+    assert results == ["<html>0</html>", "<html>1</html>", "<html>2</html>"]
+    stats = LLMService.gemini_stats()
+    assert stats["executor_backlog"] == 0
+    assert stats["models"]["m"]["queue_seconds_total"] >= 0.05 * (1 + 2) * 0.9
+
+
+def test_queue_time_excludes_earlier_attempts_and_backoff(thread_transport, monkeypatch):
+    thread_transport.failures = 1
+    monkeypatch.setattr(resilience.RetryPolicy, "delay", lambda self, attempt: 0.2)
+
+    result = asyncio.run(LLMService._run_gemini("m", "retry", "s"))
+    assert result == "<html>retry</html>"
+    metrics = LLMService.gemini_stats()["models"]["m"]
+    assert (metrics["calls"], metrics["attempts"]) == (1, 2)
+    # The idle executor starts each attempt at once: the failed attempt and
+    # the 0.2s backoff sleep are not queue time
+    assert metrics["queue_seconds_total"] < 0.05
+    assert metrics["model_seconds_total"] >= 0.1 * 0.9
+
+
+def test_cancelled_queued_work_leaves_the_backlog(thread_transport):
+    async def run():
+        first = asyncio.create_task(LLMService._run_gemini("m", "a", "s"))
+        second = asyncio.create_task(LLMService._run_gemini("m", "b", "s"))
+        await asyncio.sleep(0.01)
+        second.cancel()
+        await asyncio.gather(first, second, return_exceptions=True)
+
+    asyncio.run(run())
+    assert LLMService.gemini_stats()["executor_backlog"] == 0
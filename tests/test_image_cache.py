@@ -0,0 +1,72 @@
+import asyncio
+import base64
+import os
+import time
+from types import SimpleNamespace
+
+from src.services import image_service
+from src.services.clients import clients
+from src.services.fake_providers import fake_png
+from src.services.image_service import ImageService
+from src.utils.disk_cache import DiskCache
+
+
+def test_disk_cache_evicts_least_recently_used_over_max_bytes(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=25)
+    cache.put("a", b"a" * 10)
+    cache.put("b", b"b" * 10)
+    assert cache.get("a") == b"a" * 10  # "b" is now least recently used
+    cache.put("c", b"c" * 10)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"a" * 10
+    assert cache.get("c") == b"c" * 10
+    assert cache.stats()["evictions"] == 1
+    assert sorted(os.listdir(tmp_path)) == ["a.bin", "c.bin"]
+
+
+def test_disk_cache_recency_survives_a_restart(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=25)
+    cache.put("a", b"a" * 10)
+    time.sleep(0.01)
+    cache.put("b", b"b" * 10)
+    time.sleep(0.01)
+    cache.get("a")
+
+    # A new instance (restart, or another worker) rebuilds the LRU order from mtimes
+    reopened = DiskCache(str(tmp_path), max_bytes=25)
+    reopened.put("c", b"c" * 10)
+    assert not reopened.contains("b")
+    assert reopened.contains("a") and reopened.contains("c")
+
+
+def test_disabled_disk_cache_always_misses():
+    cache = DiskCache("", max_bytes=1024)
+    assert cache.put("a", b"data") is None
+    assert cache.get("a") is None
+
+
+def test_near_identical_prompts_share_a_key():
+    key = ImageService.cache_key("A glowing  data center.")
+    assert key == ImageService.cache_key("a glowing data center")
+    assert key != ImageService.cache_key("a glowing data centre")
+
+
+def test_generated_image_is_served_from_the_cache(monkeypatch, tmp_path):
+    png = fake_png(3, (32, 32))
+    calls = []
+
+    async def generate(**kwargs):
+        calls.append(kwargs["prompt"])
+        return SimpleNamespace(data=[SimpleNamespace(b64_json=base64.b64encode(png).decode())])
+
+    monkeypatch.setattr(image_service, "image_cache", DiskCache(str(tmp_path), max_bytes=1024 * 1024, suffix=".png"))
+    monkeypatch.setattr(clients, "_openai", SimpleNamespace(images=SimpleNamespace(generate=generate)))
+
+    async def run():
+        first = await ImageService.generate_image("Abstract city skyline")
+        second = await ImageService.generate_image("abstract city skyline.")
+        return first, second
+
+    assert asyncio.run(run()) == (png, png)
+    assert len(calls) == 1
@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from src.services.job_service import InMemoryJobStore, JobManager, JobQueueFull
+
+
+async def _collect(manager: JobManager, job_id: str):
+    return [event async for event in manager.stream_events(job_id, heartbeat=1)]
+
+
+def test_job_runs_and_streams_its_progress():
+    async def runner(payload, progress):
+        await progress("planning")
+        await progress("generating", {"slides_total": 2})
+        await progress("slide_done", {"slide_id": 1})
+        await progress("slide_done", {"slide_id": 2})
+        return {"url": f"memory://{payload}"}
+
+    async def run():
+        manager = JobManager(runner, workers=1, queue_size=5)
+        job = await manager.submit("deck")
+        events = await asyncio.wait_for(_collect(manager, job.id), 5)
+        await manager.stop()
+        return await manager.get(job.id), events
+
+    job, events = asyncio.run(run())
+    assert [e.phase for e in events] == ["queued", "planning", "generating", "slide_done", "slide_done", "succeeded"]
+    assert [e.seq for e in events] == list(range(len(events)))
+    assert job.status == "succeeded"
+    assert job.result == {"url": "memory://deck"}
+    assert (job.slides_done, job.slides_total) == (2, 2)
+    assert {"queued", "planning", "generating", "total"} <= set(job.timings)
+
+
+def test_failed_job_reports_the_error():
+    async def runner(payload, progress):
+        await progress("planning")
+        raise RuntimeError("planner down")
+
+    async def run():
+        manager = JobManager(runner, workers=1, queue_size=5)
+        job = await manager.submit(None)
+        events = await asyncio.wait_for(_collect(manager, job.id), 5)
+        await manager.stop()
+        return await manager.get(job.id), events
+
+    job, events = asyncio.run(run())
+    assert job.status == "failed" and job.error == "planner down"
+    assert events[-1].phase == "failed"
+
+
+def test_full_queue_is_rejected():
+    async def run():
+        gate = asyncio.Event()
+
+        async def runner(payload, progress):
+            await gate.wait()
+            return {}
+
+        manager = JobManager(runner, workers=1, queue_size=1)
+        await manager.submit(1)
+        await asyncio.sleep(0)  # the worker takes the first job
+        await manager.submit(2)
+        with pytest.raises(JobQueueFull):
+            await manager.submit(3)
+        gate.set()
+        await manager.stop()
+
+    asyncio.run(run())
+
+
+def test_store_evicts_oldest_finished_jobs_only():
+    from src.models.schemas import Job
+
+    async def run():
+        store = InMemoryJobStore(max_jobs=2)
+        running = Job(id="running", created_at=0, status="running")
+        done = Job(id="done", created_at=1, status="succeeded")
+        await store.create(running)
+        await store.create(done)
+        await store.create(Job(id="new", created_at=2))
+        return [await store.get(job_id) is not None for job_id in ("running", "done", "new")]
+
+    assert asyncio.run(run()) == [True, False, True]
@@ -0,0 +1,115 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src.services import llm_service
+from src.services.browser_service import BrowserService, RenderResult
+from src.services.clients import clients
+from src.services.fake_providers import fake_plan, fake_png, fake_slide_html
+from src.services.image_service import ImageService
+from src.services.llm_cache import LLMCache
+from src.services.llm_service import LLMService
+
+
+def test_memory_tier_is_a_bounded_lru():
+    async def run():
+        cache = LLMCache(max_entries=2, db_path="")
+        await cache.set("a", "1")
+        await cache.set("b", "2")
+        assert await cache.get("a") == "1"  # "b" is now least recently used
+        await cache.set("c", "3")
+        return cache, [await cache.get(key) for key in ("a", "b", "c")]
+
+    cache, values = asyncio.run(run())
+    assert values == ["1", None, "3"]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_disk_tier_survives_a_new_process_and_expires(tmp_path):
+    path = str(tmp_path / "llm.sqlite")
+
+    async def run():
+        await LLMCache(max_entries=0, db_path=path).set("key", "value")
+        # A second instance (another worker) sees the entry
+        fresh = LLMCache(max_entries=0, db_path=path)
+        hit = await fresh.get("key")
+        expired = LLMCache(max_entries=0, db_path=path, ttl_seconds=0)
+        time.sleep(0.01)
+        return hit, await expired.get("key")
+
+    assert asyncio.run(run()) == ("value", None)
+
+
+def test_disk_tier_evicts_least_recently_used_over_max_bytes(tmp_path):
+    async def run():
+        cache = LLMCache(max_entries=0, db_path=str(tmp_path / "llm.sqlite"), max_db_bytes=25)
+        for key in ("a", "b", "c"):
+            await cache.set(key, key * 10)
+            time.sleep(0.01)
+        return [await cache.get(key) for key in ("a", "b", "c")]
+
+    assert asyncio.run(run()) == [None, "b" * 10, "c" * 10]
+
+
+def test_key_covers_model_prompts_and_schema():
+    base = LLMCache.make_key("gpt-4o", "system", "prompt")
+    assert base == LLMCache.make_key("gpt-4o", "system", "prompt")
+    assert base != LLMCache.make_key("gpt-4o-mini", "system", "prompt")
+    assert base != LLMCache.make_key("gpt-4o", "system", "prompt2")
+    assert base != LLMCache.make_key("gpt-4o", "system", "prompt", {"type": "object"})
+
+
+@pytest.fixture
+def offline_providers(monkeypatch):
+    """
+    Providers replaced below the cache: LLMService's cache is real, the
+    model calls behind it and rendering are local. Counts the provider calls.
+    """
+    calls = {"design": 0, "judge": 0}
+
+    async def generate_code_uncached(prompt, system_prompt, current):
+        calls["design"] += 1
+        return fake_slide_html(prompt)
+
+    async def create(**kwargs):
+        calls["judge"] += 1
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="0"))])
+
+    async def generate_image(prompt):
+        return fake_png(1, (64, 64))
+
+    async def render(html, assets=None):
+        return RenderResult(image=fake_png(2, (64, 36)), format="png", content_width=1920, content_height=1080)
+
+    monkeypatch.setattr(llm_service, "llm_cache", LLMCache(max_entries=1000, db_path=""))
+    monkeypatch.setattr(LLMService, "_generate_code_uncached", staticmethod(generate_code_uncached))
+    monkeypatch.setattr(clients, "_openai", SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create))))
+    monkeypatch.setattr(ImageService, "generate_image", staticmethod(generate_image))
+    monkeypatch.setattr(BrowserService, "render", staticmethod(render))
+    return calls
+
+
+def test_identical_rerun_is_served_from_the_llm_cache(offline_providers):
+    from src.orchestrator import Orchestrator
+
+    plan = fake_plan("4 slides")
+    assert any(slide.image_action == "generate" for slide in plan.slides)
+
+    async def run_deck():
+        orchestrator = Orchestrator(design_mode="creative", output_mode="image")
+        for slide in plan.slides:
+            await orchestrator.process_slide(slide, plan)
+
+    asyncio.run(run_deck())
+    first = dict(offline_providers)
+    assert first["design"] > 0 and first["judge"] > 0
+
+    before = llm_service.llm_cache.stats()
+    asyncio.run(run_deck())
+    after = llm_service.llm_cache.stats()
+    # Generated-image slides included: every design and judge lookup hits
+    assert offline_providers == first
+    assert after["misses"] == before["misses"]
+    assert after["hits"] - before["hits"] == first["design"] + first["judge"]
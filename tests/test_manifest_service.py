@@ -0,0 +1,66 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+
+import server
+from src.models.schemas import DeckManifest
+from src.orchestrator import Orchestrator
+from src.services.fake_providers import fake_plan
+from src.services.manifest_service import InvalidDeckRequest, ManifestStore, UnknownDeck
+
+
+def _manifest(deck_id: str) -> DeckManifest:
+    return DeckManifest(deck_id=deck_id, plan=fake_plan("3 slides"), slides=[], created_at=1.0, updated_at=1.0)
+
+
+def test_manifests_round_trip_and_are_evicted_past_max_bytes(tmp_path):
+    size = len(_manifest("deck_00000000").model_dump_json())
+    store = ManifestStore(str(tmp_path), max_bytes=size * 2)
+
+    async def run():
+        await store.save(_manifest("deck_00000001"))
+        time.sleep(0.01)
+        await store.save(_manifest("deck_00000002"))
+        # Loading a deck keeps it: the least recently used one goes first
+        assert (await store.load("deck_00000001")).deck_id == "deck_00000001"
+        await store.save(_manifest("deck_00000003"))
+        return [await store.load(f"deck_0000000{n}") for n in (1, 2, 3)]
+
+    first, second, third = asyncio.run(run())
+    assert first is not None and second is None and third is not None
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["deck_00000001.json", "deck_00000003.json"]
+
+
+def test_malformed_deck_id_is_rejected(tmp_path):
+    with pytest.raises(InvalidDeckRequest, match="Invalid deck id"):
+        asyncio.run(ManifestStore(str(tmp_path)).load("../../etc/passwd"))
+
+
+def test_regenerate_raises_dedicated_errors(tmp_path, monkeypatch):
+    store = ManifestStore(str(tmp_path))
+    monkeypatch.setattr("src.orchestrator.manifest_store", store)
+    asyncio.run(store.save(_manifest("deck_0000000a")))
+
+    with pytest.raises(UnknownDeck):
+        asyncio.run(Orchestrator().regenerate("deck_0000000b"))
+    with pytest.raises(InvalidDeckRequest, match=r"Unknown slide ids: \[9\]"):
+        asyncio.run(Orchestrator().regenerate("deck_0000000a", slide_ids=[1, 9]))
+
+
+@pytest.mark.parametrize("error, status", [
+    (UnknownDeck("deck_0000000a"), 404),
+    (InvalidDeckRequest("Unknown slide ids: [9]"), 400),
+    # A failure inside the pipeline is a server error, not a bad request
+    (ValueError("Deck incomplete: 2 slides added, missing slide 2"), 500),
+])
+def test_regenerate_endpoint_maps_only_the_request_errors(monkeypatch, error, status):
+    async def regenerate_presentation(deck_id, request, progress=None):
+        raise error
+
+    monkeypatch.setattr(server, "regenerate_presentation", regenerate_presentation)
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(server.regenerate_deck("deck_0000000a", server.RegenerateRequest()))
+    assert raised.value.status_code == status
+
@@ -0,0 +1,102 @@
+import asyncio
+from io import BytesIO
+
+import pytest
+
+from src.agents import template_designer
+from src.agents.designer import DesignerAgent
+from src.agents.template_designer import TemplateDesigner
+from src.orchestrator import Orchestrator
+from src.services.browser_service import ASSET_URL_PREFIX
+from src.services.fake_providers import fake_plan, fake_png
+from src.services.native_pptx import NATIVE_LAYOUT_RULE, NativeSlide, translate_html
+from src.utils.disk_cache import DiskCache
+from src.services.ppt_service import build_pptx
+
+PLAN = fake_plan("2 slides")
+SLIDE = PLAN.slides[0]
+
+STYLE = "<style>body { background: #0B0F19; color: #F9FAFB; font-family: Inter; }</style>"
+
+
+def _page(body: str, style: str = STYLE) -> str:
+    return f"<html><head><title>Deck</title>{style}</head><body>{body}</body></html>"
+
+
+def test_title_and_points_translate_to_native_shapes():
+    html = _page("<h1>Throughput under load</h1><ul><li>Fewer browsers</li><li>Shared caches</li></ul>")
+    native = translate_html(html, SLIDE, PLAN)
+    assert native.title == "Throughput under load"
+    assert native.points == ["Fewer browsers", "Shared caches"]
+    assert (native.background, native.text_color) == ("#0B0F19", "#F9FAFB")
+    assert native.title_font == "Inter" and native.body_font == "Roboto"
+
+
+def test_stat_cards_are_not_flattened_to_a_bare_title():
+    html = _page(
+        "<h1>Results</h1>"
+        "<div class='stats'><div class='card'><span class='value'>3.2x</span><span>faster renders</span></div>"
+        "<div class='card'><span class='value'>-40%</span><span>provider cost</span></div></div>"
+    )
+    assert translate_html(html, SLIDE, PLAN) is None
+
+
+@pytest.mark.parametrize("body", [
+    "<h1>Results</h1><h2>What we measured</h2><ul><li>Latency</li></ul>",
+    "<h1>Results</h1><ul><li>Latency</li></ul><p class='caption'>Source: load test</p>",
+])
+def test_subtitles_and_captions_keep_the_slide_rendered(body):
+    assert translate_html(_page(body), SLIDE, PLAN) is None
+
+
+@pytest.mark.parametrize("css", [
+    ".row { display: flex; }",
+    ".cards { display: grid; grid-template-columns: 1fr 1fr; }",
+    ".badge { position: absolute; top: 40px; }",
+])
+def test_layouts_the_native_slide_cant_place_are_rendered(css):
+    html = _page("<h1>Results</h1><ul><li>Latency</li></ul>", f"<style>{css}</style>")
+    assert translate_html(html, SLIDE, PLAN) is None
+
+
+def test_unsupported_markup_and_external_images_are_rendered():
+    assert translate_html(_page("<h1>Results</h1><table><tr><td>1</td></tr></table>"), SLIDE, PLAN) is None
+    assert translate_html(_page("<h1>Results</h1><img src='https://example.com/a.png'>"), SLIDE, PLAN) is None
+
+
+def test_generated_image_is_embedded_and_the_deck_builds():
+    from pptx import Presentation
+
+    image = fake_png(4, (320, 180))
+    html = _page(f"<h1>Results</h1><ul><li>Latency</li></ul><img src='{ASSET_URL_PREFIX}slide_1.png'>")
+    native = translate_html(html, SLIDE, PLAN, {"slide_1.png": image})
+    assert isinstance(native, NativeSlide)
+    assert (native.image, native.image_layout) == (image, "right")
+
+    prs = Presentation(BytesIO(build_pptx([native, fake_png(1, (64, 36))])))
+    texts = [shape.text_frame.text for shape in prs.slides[0].shapes if shape.has_text_frame]
+    assert "Results" in texts and "Latency" in texts
+
+
+def test_native_mode_asks_the_designers_for_translatable_markup():
+    assert NATIVE_LAYOUT_RULE in DesignerAgent(native=True).base_system_prompt
+    assert "Flexbox/Grid" not in TemplateDesigner(native=True).system_prompt
+    assert "Flexbox/Grid" in DesignerAgent().base_system_prompt
+    # Native templates never come from (or go to) the image decks' cache entries
+    assert TemplateDesigner.signature(SLIDE, PLAN, native=True) != TemplateDesigner.signature(SLIDE, PLAN)
+
+
+@pytest.mark.parametrize("design_mode", ["creative", "template"])
+def test_native_deck_is_built_without_the_browser(design_mode, fakes, renders, tmp_path, monkeypatch):
+    from pptx import Presentation
+
+    monkeypatch.setattr(template_designer, "template_cache", DiskCache(str(tmp_path), max_bytes=1024 * 1024, suffix=".html"))
+    orchestrator = Orchestrator(design_mode=design_mode, output_mode="native")
+    data = asyncio.run(orchestrator.run_workflow("Make 4 slides"))
+
+    assert renders == []
+    prs = Presentation(BytesIO(data))
+    assert len(prs.slides) == 4
+    for slide, planned in zip(prs.slides, fake_plan("4 slides").slides):
+        texts = [shape.text_frame.text for shape in slide.shapes if shape.has_text_frame]
+        assert planned.title in texts and any(planned.content_points[0] in text for text in texts)
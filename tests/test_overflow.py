@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+
+from src.orchestrator import Orchestrator
+from src.services.browser_service import VIEWPORT, BrowserService, RenderResult, OVERFLOW_TOLERANCE
+from src.services.fake_providers import fake_plan, fake_png
+
+
+def _result(width, height):
+    return RenderResult(image=fake_png(1, (64, 36)), format="png", content_width=width, content_height=height)
+
+
+def test_overflow_ignores_rounding_noise():
+    assert not _result(VIEWPORT["width"], VIEWPORT["height"] + OVERFLOW_TOLERANCE).overflow
+    assert _result(VIEWPORT["width"], VIEWPORT["height"] + OVERFLOW_TOLERANCE + 1).overflow
+    assert _result(VIEWPORT["width"] + 200, VIEWPORT["height"]).overflow
+
+
+def _run_slide(monkeypatch, overflowing_renders: int, redesigns: int):
+    """Renders one slide; the first `overflowing_renders` renders overflow."""
+    renders, feedbacks, events = [], [], []
+
+    async def render(html, assets=None):
+        renders.append(html)
+        height = 1600 if len(renders) <= overflowing_renders else VIEWPORT["height"]
+        return _result(VIEWPORT["width"], height)
+
+    monkeypatch.setattr(BrowserService, "render", staticmethod(render))
+    orchestrator = Orchestrator(overflow_redesigns=redesigns, design_mode="creative", output_mode="image")
+    original = orchestrator.designer.generate_slide_variants
+
+    async def generate_slide_variants(slide, plan, feedback=None):
+        feedbacks.append(feedback)
+        return await original(slide, plan, feedback)
+
+    orchestrator.designer.generate_slide_variants = generate_slide_variants
+    orchestrator.progress = lambda phase, data: events.append((phase, data))
+    plan = fake_plan("1 slides")
+    image = asyncio.run(orchestrator.process_slide(plan.slides[0], plan))
+    return image, renders, feedbacks, events
+
+
+def test_overflowing_slide_is_redesigned_with_feedback(fakes, monkeypatch):
+    image, renders, feedbacks, events = _run_slide(monkeypatch, overflowing_renders=1, redesigns=2)
+    assert len(renders) == 2
+    assert feedbacks[0] is None
+    assert "overflowed" in feedbacks[1] and "1920x1600" in feedbacks[1]
+    assert events == [("slide_overflow", {"slide_id": 1, "attempt": 1, "content_width": 1920, "content_height": 1600})]
+    assert image
+
+
+def test_redesigns_are_bounded(fakes, monkeypatch):
+    _, renders, feedbacks, events = _run_slide(monkeypatch, overflowing_renders=10, redesigns=2)
+    # The first render plus one per redesign, then the clipped render is kept
+    assert len(renders) == 3 and len(feedbacks) == 3
+    assert [data["attempt"] for _, data in events] == [1, 2]
@@ -0,0 +1,73 @@
+import asyncio
+from io import BytesIO
+
+import pytest
+
+from src.orchestrator import Orchestrator
+from src.services.fake_providers import fake_png
+from src.services.ppt_service import DeckBuilder
+
+
+@pytest.fixture
+def in_thread(monkeypatch):
+    """Assemble decks in a thread: no worker processes in unit tests."""
+    monkeypatch.setattr("src.services.ppt_service.PPT_PROCESS_WORKERS", 0)
+
+
+def _color(image: bytes):
+    from PIL import Image
+
+    with Image.open(BytesIO(image)) as img:
+        return img.convert("RGB").getpixel((0, 0))
+
+
+def _slide_colors(pptx_bytes: bytes):
+    from pptx import Presentation
+
+    return [_color(slide.shapes[0].image.blob) for slide in Presentation(BytesIO(pptx_bytes)).slides]
+
+
+def test_deck_builder_keeps_slide_order_whatever_the_arrival_order(in_thread):
+    images = [fake_png(seed, (32, 18)) for seed in (1, 2, 3)]
+
+    async def run():
+        deck = DeckBuilder(total_slides=3)
+        for index in (2, 0, 1):
+            await deck.add(index, images[index])
+        return await deck.save()
+
+    assert _slide_colors(asyncio.run(run())) == [_color(image) for image in images]
+
+
+def test_incomplete_deck_is_not_saved(in_thread):
+    async def run():
+        deck = DeckBuilder(total_slides=3)
+        await deck.add(0, fake_png(1, (32, 18)))
+        await deck.add(2, fake_png(3, (32, 18)))
+        await deck.save()
+
+    with pytest.raises(ValueError, match="Deck incomplete"):
+        asyncio.run(run())
+
+
+def test_stage_pools_are_bounded_per_stage(monkeypatch):
+    monkeypatch.setenv("PIPELINE_RENDER_WORKERS", "1")
+
+    async def run():
+        orchestrator = Orchestrator(stage_workers={"design": 3})
+        active = {"design": 0, "render": 0}
+        peak = dict(active)
+
+        async def work(stage):
+            active[stage] += 1
+            peak[stage] = max(peak[stage], active[stage])
+            await asyncio.sleep(0.01)
+            active[stage] -= 1
+
+        await asyncio.gather(*(
+            orchestrator.run_stage(stage, work, stage)
+            for stage in ("design", "render") for _ in range(6)
+        ))
+        return peak
+
+    assert asyncio.run(run()) == {"design": 3, "render": 1}
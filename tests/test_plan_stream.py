@@ -0,0 +1,129 @@
+import asyncio
+import json
+from io import BytesIO
+
+import pytest
+
+from src.agents.planner import PlannerAgent
+from src.models.schemas import PresentationPlan
+from src.orchestrator import Orchestrator
+from src.services.browser_service import BrowserService, RenderResult
+from src.services.fake_providers import FakeBackends, fake_plan, fake_png, fake_token_stream
+from src.utils.json_stream import IncrementalObjectParser
+
+TRICKY = {
+    "topic": 'Quotes "inside", a backslash \\ and braces { [ ] }',
+    "count": 2,
+    "slides": [
+        {"id": 1, "title": "Escaped \\\" quote then }", "notes": ["a", "[b]"]},
+        {"id": 2, "title": "Unicode é—🚀 and \\\\", "nested": {"k": [1, {"x": "}"}]}},
+    ],
+}
+
+
+def _parse(text: str, chunk_size: int):
+    parser = IncrementalObjectParser("slides")
+    events = []
+    for start in range(0, len(text), chunk_size):
+        events += parser.feed(text[start:start + chunk_size])
+    return parser, events
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 7, 64, 10_000])
+def test_chunk_boundaries_inside_strings_and_escapes(chunk_size):
+    for text in (json.dumps(TRICKY), json.dumps(TRICKY, ensure_ascii=False), json.dumps(TRICKY, indent=2)):
+        parser, events = _parse(text, chunk_size)
+        header = {k: v for k, v in TRICKY.items() if k != "slides"}
+        assert events == [("header", header)] + [("item", slide) for slide in TRICKY["slides"]]
+        assert parser.complete
+
+
+def test_truncated_text_is_not_complete():
+    text = json.dumps(TRICKY)
+    parser, events = _parse(text[:text.index('"id": 2')], 4)
+    assert [kind for kind, _ in events] == ["header", "item"]
+    assert not parser.complete
+
+
+def test_slides_are_yielded_before_the_stream_ends():
+    plan = fake_plan("3 slides")
+    text = plan.model_dump_json()
+    chunks_sent = 0
+
+    async def source():
+        nonlocal chunks_sent
+        async for chunk in fake_token_stream(text, chunk_size=16):
+            chunks_sent += 1
+            yield chunk
+
+    async def run():
+        seen = []
+        async for item in PlannerAgent.parse_plan_stream(source()):
+            seen.append((type(item).__name__, chunks_sent))
+        return seen
+
+    seen = asyncio.run(run())
+    total_chunks = -(-len(text) // 16)
+    assert [kind for kind, _ in seen] == ["PresentationPlan", "SlidePlan", "SlidePlan", "SlidePlan"]
+    # Header and first slide were dispatched well before the last token
+    assert seen[0][1] < seen[1][1] < total_chunks
+    assert seen[1][1] < total_chunks / 2
+
+
+def test_truncated_stream_raises_after_the_slides_it_had():
+    text = fake_plan("3 slides").model_dump_json()
+
+    async def run():
+        seen = []
+        with pytest.raises(ValueError, match=r"ended early \(1 slide"):
+            async for item in PlannerAgent.parse_plan_stream(fake_token_stream(text[:text.index('"id":2')], 16)):
+                seen.append(item)
+        return seen
+
+    seen = asyncio.run(run())
+    assert isinstance(seen[0], PresentationPlan) and len(seen) == 2
+
+
+class TruncatedPlanStream(FakeBackends):
+    """Offline providers whose plan stream stops right before `cut_before`."""
+
+    def __init__(self, cut_before: str):
+        super().__init__(chat_latency=0, code_latency=0, image_latency=0, upload_latency=0, jitter=0)
+        self.cut_before = cut_before
+
+    async def stream_json(self, prompt: str, system_prompt: str, response_model):
+        await self._call("openai_chat")
+        text = fake_plan(prompt).model_dump_json()
+        async for chunk in fake_token_stream(text[:text.index(self.cut_before)], chunk_size=16):
+            yield chunk
+
+
+@pytest.fixture
+def local_render(monkeypatch):
+    async def render(html, assets=None):
+        return RenderResult(image=fake_png(1, (64, 36)), format="png", content_width=1920, content_height=1080)
+
+    monkeypatch.setattr(BrowserService, "render", staticmethod(render))
+    monkeypatch.setattr("src.services.ppt_service.PPT_PROCESS_WORKERS", 0)
+
+
+def _run_streaming_deck(cut_before: str) -> bytes:
+    fakes = TruncatedPlanStream(cut_before)
+    fakes.install()
+    try:
+        orchestrator = Orchestrator(stream_plan=True, design_mode="creative", output_mode="image")
+        return asyncio.run(orchestrator.run_workflow("Make 3 slides"))
+    finally:
+        fakes.uninstall()
+
+
+def test_stream_cut_before_any_slide_falls_back_to_the_full_plan(local_render):
+    from pptx import Presentation
+
+    data = _run_streaming_deck('"slides"')
+    assert len(Presentation(BytesIO(data)).slides) == 3
+
+
+def test_stream_cut_after_dispatch_fails_the_deck(local_render):
+    with pytest.raises(ValueError, match="ended early"):
+        _run_streaming_deck('"id":2')
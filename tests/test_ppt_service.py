@@ -0,0 +1,44 @@
+import asyncio
+import multiprocessing
+from io import BytesIO
+
+import pytest
+
+from src.services import ppt_service
+from src.services.fake_providers import fake_png
+from src.services.ppt_service import OPTIMIZE_MODES, DeckBuilder, PPTService, optimize_image
+
+
+def test_workers_are_not_forked():
+    assert ppt_service.PPT_PROCESS_START_METHOD in ("forkserver", "spawn")
+    assert ppt_service.PPT_PROCESS_START_METHOD in multiprocessing.get_all_start_methods()
+
+
+def test_deck_is_assembled_in_the_process_pool(monkeypatch):
+    from pptx import Presentation
+
+    monkeypatch.setattr(ppt_service, "PPT_PROCESS_WORKERS", 1)
+
+    async def build():
+        builder = DeckBuilder(total_slides=2)
+        await builder.add(1, fake_png(2, (64, 36)))
+        await builder.add(0, fake_png(1, (64, 36)))
+        return await builder.save()
+
+    try:
+        data = asyncio.run(build())
+        assert PPTService._get_executor()._mp_context.get_start_method() == ppt_service.PPT_PROCESS_START_METHOD
+    finally:
+        PPTService.shutdown()
+    assert len(Presentation(BytesIO(data)).slides) == 2
+
+
+@pytest.mark.parametrize("mode", OPTIMIZE_MODES)
+def test_optimize_never_grows_the_image(mode):
+    image = fake_png(3, (320, 180))
+    assert len(optimize_image(image, mode)) <= len(image)
+
+
+def test_unknown_optimize_mode_is_rejected():
+    with pytest.raises(ValueError, match="PPT_IMAGE_OPTIMIZE"):
+        DeckBuilder(optimize="webp")
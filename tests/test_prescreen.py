@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from src.agents.judge import JudgeAgent
+from src.agents.prescreen import HtmlPreScreen, contrast_ratio
+from src.services.fake_providers import fake_plan
+from src.services.llm_service import LLMService
+
+PLAN = fake_plan("1 slides")
+SLIDE = PLAN.slides[0]
+
+
+def _html(body: str = "", text: str = "#F9FAFB", background: str = "#0B0F19", title: str = SLIDE.title) -> str:
+    return (
+        f"<html><head><style>body {{ background: {background}; color: {text}; font-size: 24px; }}</style></head>"
+        f"<body><div><h1>{title}</h1>{body}</div></body></html>"
+    )
+
+
+def test_contrast_ratio_matches_wcag():
+    assert contrast_ratio("#000000", "#FFFFFF") == pytest.approx(21.0)
+    assert contrast_ratio("#fff", "#ffffff") == pytest.approx(1.0)
+
+
+@pytest.mark.parametrize("html, problem", [
+    (_html()[:-len("</div></body></html>")], "unclosed <html>"),
+    (_html(title="Something else entirely"), "slide title missing"),
+    (_html("<p>" + "word " * 3000 + "</p>"), "likely overflow"),
+    ("just text", "no HTML elements"),
+])
+def test_hard_failures(html, problem):
+    report = HtmlPreScreen().evaluate(0, html, SLIDE, PLAN)
+    assert not report.valid
+    assert any(p.startswith(problem) for p in report.problems)
+
+
+def test_required_image_must_be_used():
+    slide = SLIDE.model_copy(update={"image_action": "use_provided", "image_url": "https://example.com/a.png"})
+    report = HtmlPreScreen().evaluate(0, _html(), slide, PLAN)
+    assert report.problems == ["required image URL not used"]
+
+
+def test_low_contrast_scores_lower():
+    screen = HtmlPreScreen()
+    legible = screen.evaluate(0, _html(), SLIDE, PLAN)
+    illegible = screen.evaluate(1, _html(text="#1F2937"), SLIDE, PLAN)
+    assert legible.valid and illegible.valid
+    assert legible.contrast > 4.5 > illegible.contrast
+    assert legible.score > illegible.score
+
+
+@pytest.fixture
+def judge_calls(monkeypatch):
+    prompts = []
+
+    async def generate_text(prompt, system_prompt):
+        prompts.append(prompt)
+        return "1"
+
+    monkeypatch.setattr(LLMService, "generate_text", staticmethod(generate_text))
+    return prompts
+
+
+def test_clear_winner_skips_the_llm(judge_calls):
+    variants = [_html(text="#1F2937"), _html(), "<div>broken"]
+    best = asyncio.run(JudgeAgent().select_best_variant(variants, SLIDE, PLAN))
+    assert best == variants[1] and judge_calls == []
+
+
+def test_close_variants_go_to_the_llm_without_the_rejected_ones(judge_calls):
+    variants = [_html(), "<div>broken", _html("<p>Another layout</p>")]
+    best = asyncio.run(JudgeAgent().select_best_variant(variants, SLIDE, PLAN))
+    assert best == variants[2]
+    assert len(judge_calls) == 1 and "VARIANT 2" not in judge_calls[0]
@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+
+from src.services import resilience
+from src.services.resilience import CircuitBreaker, CircuitOpenError, ProviderError, RetryPolicy
+
+
+class Unavailable(Exception):
+    status_code = 503
+
+
+class BadRequest(Exception):
+    status_code = 400
+
+
+@pytest.fixture(autouse=True)
+def fast_policy(monkeypatch):
+    monkeypatch.setattr(resilience, "breakers", {})
+    monkeypatch.setitem(resilience.policies, "test", RetryPolicy("test", timeout=0.05, attempts=3, backoff=0, max_backoff=0))
+
+
+def _flaky(errors):
+    """A provider call raising `errors` in turn, then answering "ok"."""
+    calls = []
+
+    async def func():
+        calls.append(1)
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return "ok"
+
+    return func, calls
+
+
+def test_retryable_errors_are_retried_until_success():
+    func, calls = _flaky([Unavailable(), ConnectionError()])
+    assert asyncio.run(resilience.call("test", func)) == "ok"
+    assert len(calls) == 3
+    assert resilience.breakers["test"].state == "closed"
+
+
+def test_non_retryable_errors_fail_at_once_and_dont_trip_the_breaker():
+    func, calls = _flaky([BadRequest()])
+    with pytest.raises(ProviderError, match="test"):
+        asyncio.run(resilience.call("test", func))
+    assert len(calls) == 1
+    assert resilience.breakers["test"].failures == 0
+
+
+def test_deadline_turns_a_hung_call_into_a_retryable_timeout():
+    calls = []
+
+    async def hang():
+        calls.append(1)
+        await asyncio.sleep(10)
+
+    with pytest.raises(ProviderError, match=r"failed after 3 attempt\(s\): no answer within 0.05s"):
+        asyncio.run(asyncio.wait_for(resilience.call("test", hang), 2))
+    assert len(calls) == 3
+    assert resilience.breakers["test"].failures == 3
+
+
+def test_both_timeout_types_are_retryable():
+    # One type from Python 3.11 on, two before: neither may depend on the alias
+    assert resilience.is_retryable(TimeoutError("no answer within 1s"))
+    assert resilience.is_retryable(asyncio.TimeoutError())
+
+
+def test_breaker_opens_after_threshold_and_probes_once_after_reset(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: clock[0])
+    guard = CircuitBreaker("p", failure_threshold=2, reset_timeout=30)
+
+    guard.record_failure()
+    assert guard.allow() and guard.state == "closed"
+    guard.record_failure()
+    assert guard.state == "open" and not guard.allow()
+
+    clock[0] += 30
+    assert guard.allow() and guard.state == "half_open"
+    assert not guard.allow()  # one probe at a time
+    guard.record_failure()
+    assert guard.state == "open" and not guard.allow()
+
+    clock[0] += 30
+    assert guard.allow()
+    guard.record_success()
+    assert guard.state == "closed" and guard.allow()
+
+
+def test_open_circuit_refuses_without_calling():
+    resilience.breakers["test"] = CircuitBreaker("test", failure_threshold=1, reset_timeout=60)
+    func, calls = _flaky([Unavailable()] * 5)
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(resilience.call("test", func))
+    # First attempt opened the circuit, the retry was refused
+    assert len(calls) == 1
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(resilience.call("test", func))
+    assert len(calls) == 1
+
+
+def test_cancellation_releases_the_half_open_probe():
+    guard = resilience.breakers["test"] = CircuitBreaker("test", failure_threshold=1, reset_timeout=60)
+    guard.state = "half_open"
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    async def run():
+        task = asyncio.create_task(resilience.call("test", hang))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    # Not counted as a failure, and the next probe is allowed through
+    assert guard.state == "half_open" and guard.allow()
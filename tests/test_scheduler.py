@@ -0,0 +1,94 @@
+import asyncio
+
+from src.services.scheduler import FairLimiter, Scheduler, TokenBucket
+
+
+def test_waiters_are_served_round_robin_across_owners():
+    """A big deck queued first doesn't starve a small one that arrives after it."""
+
+    async def run():
+        limiter = FairLimiter("test", concurrency=1)
+        order = []
+
+        async def call(owner: str, i: int):
+            await limiter.acquire(owner)
+            order.append(f"{owner}{i}")
+            await asyncio.sleep(0)
+            limiter.release()
+
+        await limiter.acquire("holder")
+        tasks = [asyncio.create_task(call("big", i)) for i in range(4)]
+        await asyncio.sleep(0)
+        tasks += [asyncio.create_task(call("small", i)) for i in range(2)]
+        await asyncio.sleep(0)
+        limiter.release()
+        await asyncio.gather(*tasks)
+        return limiter, order
+
+    limiter, order = asyncio.run(run())
+    assert order == ["big0", "small0", "big1", "small1", "big2", "big3"]
+    assert limiter.stats()["peak_active"] == 1
+    assert limiter.stats()["active"] == 0
+
+
+def test_concurrency_is_bounded_and_cancelled_waiters_are_skipped():
+    async def run():
+        limiter = FairLimiter("test", concurrency=2)
+        active, peak = 0, 0
+
+        async def call(owner: str):
+            nonlocal active, peak
+            await limiter.acquire(owner)
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            limiter.release()
+
+        tasks = [asyncio.create_task(call(f"deck{i % 3}")) for i in range(9)]
+        await asyncio.sleep(0)
+        tasks[-1].cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return limiter, peak
+
+    limiter, peak = asyncio.run(run())
+    assert peak == 2
+    assert limiter.stats()["acquired"] == 8
+    assert limiter.stats()["active"] == 0 and limiter.stats()["queued"] == 0
+
+
+def test_slot_uses_the_request_scope_as_owner():
+    async def run():
+        scheduler = Scheduler({"api": (1, 0)})
+        limiter = scheduler.limiters["api"]
+        seen = []
+        original = limiter.acquire
+
+        async def acquire(owner):
+            seen.append(owner)
+            await original(owner)
+
+        limiter.acquire = acquire
+        with Scheduler.request_scope("deck_a"):
+            async with scheduler.slot("api"):
+                pass
+        async with scheduler.slot("api", owner="deck_b"):
+            pass
+        async with scheduler.slot("api"):
+            pass
+        return seen
+
+    assert asyncio.run(run()) == ["deck_a", "deck_b", "default"]
+
+
+def test_token_bucket_limits_the_rate():
+    async def run():
+        bucket = TokenBucket(rate=50, capacity=1)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        for _ in range(6):
+            await bucket.take()
+        return loop.time() - start
+
+    # One banked token, then five more at 50/s
+    assert asyncio.run(run()) >= 5 / 50 * 0.9
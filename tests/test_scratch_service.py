@@ -0,0 +1,97 @@
+import asyncio
+import os
+import threading
+
+import pytest
+
+from src.services import scratch_service
+from src.services.ppt_service import DeckBuilder
+from src.services.scratch_service import ScratchManager, ScratchQuotaExceeded
+
+
+def test_deck_spills_only_past_the_threshold(tmp_path):
+    async def run():
+        manager = ScratchManager(str(tmp_path), quota_bytes=0)
+        async with manager.request("deck") as space:
+            deck = DeckBuilder(total_slides=3, scratch=space, spill_bytes=25)
+            for index in range(3):
+                await deck.add(index, bytes([index]) * 10)
+            return deck._images, sorted(os.listdir(space.path)), deck.memory_bytes
+
+    images, spilled, in_memory = asyncio.run(run())
+    assert images[:2] == [b"\x00" * 10, b"\x01" * 10]
+    assert isinstance(images[2], str) and spilled == ["slide_002.img"]
+    assert in_memory == 20
+
+
+def test_no_scratch_space_keeps_everything_in_memory():
+    async def run():
+        deck = DeckBuilder(total_slides=2, spill_bytes=0)
+        await deck.add(0, b"a" * 10)
+        await deck.add(1, b"b" * 10)
+        return deck._images
+
+    assert asyncio.run(run()) == [b"a" * 10, b"b" * 10]
+
+
+def test_cancelled_request_still_removes_its_directory_off_the_loop(tmp_path, monkeypatch):
+    removed_in = []
+    rmtree = scratch_service.shutil.rmtree
+
+    def tracking_rmtree(path, ignore_errors=False):
+        removed_in.append(threading.current_thread() is threading.main_thread())
+        rmtree(path, ignore_errors=ignore_errors)
+
+    monkeypatch.setattr(scratch_service.shutil, "rmtree", tracking_rmtree)
+    manager = ScratchManager(str(tmp_path), quota_bytes=0)
+    started = []
+
+    async def request():
+        async with manager.request("cancelled") as space:
+            await space.write("a.img", b"x" * 100)
+            started.append(space.path)
+            await asyncio.sleep(10)
+
+    async def run():
+        task = asyncio.create_task(request())
+        while not started:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await manager.stop()
+
+    asyncio.run(run())
+    assert removed_in == [False]
+    assert not os.path.exists(started[0])
+    assert manager.used_bytes == 0 and not manager.active
+
+
+def test_full_scratch_makes_new_requests_wait_then_fail(tmp_path):
+    manager = ScratchManager(str(tmp_path), quota_bytes=10, wait_timeout=0.05)
+
+    async def run():
+        async with manager.request("big") as space:
+            await space.write("a.img", b"x" * 20)
+            with pytest.raises(ScratchQuotaExceeded):
+                async with manager.request("late"):
+                    pass
+        # Released: the next request gets in at once
+        async with manager.request("after"):
+            pass
+
+    asyncio.run(run())
+    assert manager.stats()["rejected"] == 1
+
+
+def test_sweep_removes_directories_of_dead_workers(tmp_path, monkeypatch):
+    monkeypatch.setattr(scratch_service, "_pid_alive", lambda pid: pid == 1)
+    (tmp_path / "999999-dead-abcd").mkdir()
+    alive = tmp_path / "1-alive-abcd"
+    alive.mkdir()
+    (alive / "a.img").write_bytes(b"x" * 7)
+
+    manager = ScratchManager(str(tmp_path), quota_bytes=0)
+    assert manager.sweep() == 1
+    assert sorted(os.listdir(tmp_path)) == ["1-alive-abcd"]
+    assert manager.other_workers_bytes == 7
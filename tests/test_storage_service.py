@@ -0,0 +1,48 @@
+import asyncio
+from io import BytesIO
+from pathlib import Path
+from urllib.parse import urlparse
+
+import pytest
+
+from src.services.fake_providers import fake_png
+from src.services.ppt_service import PPTService
+from src.services.storage_service import LocalStorage, MemoryStorage, StorageService
+
+
+@pytest.fixture
+def backend():
+    previous = StorageService._backend
+    yield
+    StorageService.set_backend(previous)
+
+
+def test_presentation_is_built_in_memory():
+    from pptx import Presentation
+
+    data = PPTService.create_presentation([fake_png(1, (64, 36)), fake_png(2, (64, 36))])
+    assert data[:2] == b"PK"
+    assert len(Presentation(BytesIO(data)).slides) == 2
+
+
+def test_memory_backend_keeps_the_bytes(backend):
+    storage = MemoryStorage()
+    StorageService.set_backend(storage)
+    url = asyncio.run(StorageService.upload_ppt(b"pptx-bytes", "deck_1"))
+    assert url == "memory://presentations/deck_1.pptx"
+    assert storage.files == {"deck_1": b"pptx-bytes"}
+
+
+def test_local_backend_writes_the_file(backend, tmp_path):
+    StorageService.set_backend(LocalStorage(str(tmp_path)))
+    url = asyncio.run(StorageService.upload_ppt(b"pptx-bytes", "deck_2"))
+    path = Path(urlparse(url).path)
+    assert path == tmp_path / "deck_2.pptx"
+    assert path.read_bytes() == b"pptx-bytes"
+
+
+def test_unknown_backend_is_rejected(backend, monkeypatch):
+    StorageService.set_backend(None)
+    monkeypatch.setenv("STORAGE_BACKEND", "ftp")
+    with pytest.raises(ValueError, match="Unknown STORAGE_BACKEND"):
+        StorageService.get_backend()
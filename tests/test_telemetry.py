@@ -0,0 +1,56 @@
+import pytest
+
+from src.utils.telemetry import MetricsRegistry, registry, span
+
+
+def test_counter_gauge_and_histogram_render_in_prometheus_format():
+    metrics = MetricsRegistry()
+    requests = metrics.counter("test_requests_total", "Requests")
+    requests.inc(result="hit")
+    requests.inc(2, result="hit")
+    metrics.gauge("test_in_flight", "In flight").set(3)
+    latency = metrics.histogram("test_latency_seconds", "Latency", buckets=(0.1, 1))
+    latency.observe(0.05)
+    latency.observe(0.5)
+
+    text = metrics.render()
+    assert "# TYPE test_requests_total counter" in text
+    assert 'test_requests_total{result="hit"} 3.0' in text
+    assert "test_in_flight 3" in text
+    assert 'test_latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'test_latency_seconds_bucket{le="1"} 2' in text
+    assert 'test_latency_seconds_bucket{le="+Inf"} 2' in text
+    assert "test_latency_seconds_count 2" in text
+    assert text.endswith("\n")
+
+
+def test_registry_returns_the_same_metric_by_name():
+    metrics = MetricsRegistry()
+    assert metrics.counter("c", "help") is metrics.counter("c", "other help")
+
+
+def _series(stage: str):
+    text = registry.render()
+    count = next(
+        (float(line.split()[-1]) for line in text.splitlines()
+         if line.startswith(f'ppt_stage_duration_seconds_count{{stage="{stage}"}}')),
+        0.0,
+    )
+    errors = next(
+        (float(line.split()[-1]) for line in text.splitlines()
+         if line.startswith(f'ppt_stage_errors_total{{stage="{stage}"}}')),
+        0.0,
+    )
+    return count, errors
+
+
+def test_span_records_duration_and_errors():
+    with span("test.ok", slide_id=1) as current:
+        current.set_attribute("key", "value")
+    with pytest.raises(RuntimeError):
+        with span("test.failing"):
+            raise RuntimeError("boom")
+
+    assert _series("test.ok") == (1, 0)
+    assert _series("test.failing") == (1, 1)
+    assert 'ppt_stage_in_flight{stage="test.ok"} 0' in registry.render()
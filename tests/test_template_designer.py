@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from src.agents import template_designer
+from src.agents.template_designer import TemplateDesigner
+from src.orchestrator import Orchestrator
+from src.services.fake_providers import fake_plan, fake_slide_html
+from src.utils.disk_cache import DiskCache
+
+PLAN = fake_plan("4 slides")
+
+
+def test_fill_escapes_text_and_encodes_the_image_url():
+    slide = PLAN.slides[1].model_copy(update={
+        "title": "<b>Fast</b> & cheap",
+        "content_points": ["a < b"],
+        "image_action": "use_provided",
+        "image_url": "https://example.com/a b'c.png",
+    })
+    html = TemplateDesigner.fill("<h1>$title</h1><ul>$points</ul><img src='$image_url'> $5", slide)
+    assert html == (
+        "<h1>&lt;b&gt;Fast&lt;/b&gt; &amp; cheap</h1><ul><li>a &lt; b</li></ul>"
+        "<img src='https://example.com/a%20b%27c.png'> $5"
+    )
+
+
+def test_fake_designer_answers_template_prompts_with_placeholders():
+    with_image = fake_slide_html("Create a layout TEMPLATE ... The slide has an image: use $image_url")
+    assert not TemplateDesigner.missing_placeholders(with_image, with_image=True)
+    without_image = fake_slide_html("Create a layout TEMPLATE ... The slide has no image.")
+    assert not TemplateDesigner.missing_placeholders(without_image, with_image=False)
+    assert "$image_url" not in without_image
+
+
+@pytest.fixture
+def templates(tmp_path, monkeypatch, fakes):
+    """Empty template cache; design calls take a moment so concurrent decks overlap."""
+    monkeypatch.setattr(template_designer, "template_cache", DiskCache(str(tmp_path), max_bytes=1024 * 1024, suffix=".html"))
+    fakes.providers["gemini"].latency = 0.02
+    return fakes
+
+
+def test_concurrent_decks_share_template_designs(templates):
+    designed = []
+    original = TemplateDesigner.fill
+
+    def fill(template, slide):
+        designed.append(slide.id)
+        return original(template, slide)
+
+    async def run():
+        decks = [Orchestrator(design_mode="template", output_mode="image") for _ in range(3)]
+        for orchestrator in decks:
+            orchestrator.templates.fill = fill
+        return await asyncio.gather(*(orchestrator.run_workflow("Make 4 slides") for orchestrator in decks))
+
+    asyncio.run(run())
+    # 4 slide types (with / without image), one design call each for all 3 decks
+    assert templates.stats()["gemini"]["calls"] == 4
+    assert len(designed) == 12
+    assert not template_designer._inflight